@@ -0,0 +1,45 @@
+"""store_money_as_integer_cents
+
+Revision ID: 3f6b8d0c2a91
+Revises: 7a4c2e9b1d58
+Create Date: 2026-10-19 16:05:12.618203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f6b8d0c2a91'
+down_revision: Union[str, Sequence[str], None] = '7a4c2e9b1d58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# table -> (float column, integer cents column)
+MONEY_COLUMNS = {
+    'room_types': ('base_rate', 'base_rate_cents'),
+    'rate_adjustments': ('adjustment_amount', 'adjustment_amount_cents'),
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table, (amount, cents) in MONEY_COLUMNS.items():
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.add_column(sa.Column(cents, sa.BigInteger(), nullable=True))
+        op.execute(f'UPDATE {table} SET {cents} = CAST(ROUND({amount} * 100) AS BIGINT)')
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column(cents, existing_type=sa.BigInteger(), nullable=False)
+            batch_op.drop_column(amount)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, (amount, cents) in MONEY_COLUMNS.items():
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.add_column(sa.Column(amount, sa.Float(), nullable=True))
+        op.execute(f'UPDATE {table} SET {amount} = {cents} / 100.0')
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column(cents)
@@ -0,0 +1,33 @@
+"""add_rate_adjustment_lookup_index
+
+Revision ID: 4b2f8e1c9a7d
+Revises: 1772bee5ed69
+Create Date: 2026-10-19 09:12:40.218311
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b2f8e1c9a7d'
+down_revision: Union[str, Sequence[str], None] = '1772bee5ed69'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_rate_adjustments_room_type_id_effective_date',
+        'rate_adjustments',
+        ['room_type_id', 'effective_date'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_rate_adjustments_room_type_id_effective_date', table_name='rate_adjustments')
@@ -0,0 +1,43 @@
+"""add_hotel_full_text_search
+
+Revision ID: 5e81d2b4c6a3
+Revises: 9c3d5a7e2f10
+Create Date: 2026-10-19 13:41:05.992017
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e81d2b4c6a3'
+down_revision: Union[str, Sequence[str], None] = '9c3d5a7e2f10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        op.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS hotel_search "
+            "USING fts5(name, location, tokenize='unicode61 remove_diacritics 2')"
+        )
+        op.execute("INSERT INTO hotel_search (rowid, name, location) SELECT id, name, location FROM hotels")
+    elif dialect == 'postgresql':
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.execute("CREATE INDEX IF NOT EXISTS ix_hotels_name_trgm ON hotels USING gin (name gin_trgm_ops)")
+        op.execute("CREATE INDEX IF NOT EXISTS ix_hotels_location_trgm ON hotels USING gin (location gin_trgm_ops)")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        op.execute("DROP TABLE IF EXISTS hotel_search")
+    elif dialect == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_hotels_location_trgm")
+        op.execute("DROP INDEX IF EXISTS ix_hotels_name_trgm")
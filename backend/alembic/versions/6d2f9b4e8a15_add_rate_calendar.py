@@ -0,0 +1,34 @@
+"""add_rate_calendar
+
+Revision ID: 6d2f9b4e8a15
+Revises: c4a7e1d9f3b2
+Create Date: 2026-10-19 20:41:09.552816
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6d2f9b4e8a15'
+down_revision: Union[str, Sequence[str], None] = 'c4a7e1d9f3b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('rate_calendar',
+    sa.Column('room_type_id', sa.Integer(), nullable=False),
+    sa.Column('rate_date', sa.Date(), nullable=False),
+    sa.Column('effective_rate_cents', sa.BigInteger(), nullable=False),
+    sa.Column('built_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('room_type_id', 'rate_date')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('rate_calendar')
@@ -0,0 +1,37 @@
+"""add_rate_adjustment_date_range
+
+Revision ID: 7a4c2e9b1d58
+Revises: 5e81d2b4c6a3
+Create Date: 2026-10-19 15:20:41.204117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a4c2e9b1d58'
+down_revision: Union[str, Sequence[str], None] = '5e81d2b4c6a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Batch mode so SQLite can add the check constraint (table is recreated)
+    with op.batch_alter_table('rate_adjustments') as batch_op:
+        batch_op.add_column(sa.Column('end_date', sa.Date(), nullable=True))
+        batch_op.add_column(sa.Column('priority', sa.Integer(), server_default='0', nullable=False))
+        batch_op.create_check_constraint(
+            'ck_rate_adjustments_date_range', 'end_date IS NULL OR end_date >= effective_date'
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('rate_adjustments') as batch_op:
+        batch_op.drop_constraint('ck_rate_adjustments_date_range', type_='check')
+        batch_op.drop_column('priority')
+        batch_op.drop_column('end_date')
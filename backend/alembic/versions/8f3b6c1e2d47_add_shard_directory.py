@@ -0,0 +1,39 @@
+"""add_shard_directory
+
+Revision ID: 8f3b6c1e2d47
+Revises: 6d2f9b4e8a15
+Create Date: 2026-10-19 22:08:31.410276
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8f3b6c1e2d47'
+down_revision: Union[str, Sequence[str], None] = '6d2f9b4e8a15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('shard_buckets',
+    sa.Column('bucket', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('shard', sa.Integer(), nullable=False),
+    sa.Column('moving', sa.Boolean(), server_default='0', nullable=False),
+    sa.PrimaryKeyConstraint('bucket')
+    )
+    op.create_table('id_sequences',
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('next_id', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('id_sequences')
+    op.drop_table('shard_buckets')
@@ -0,0 +1,30 @@
+"""add_hotel_search_indexes
+
+Revision ID: 9c3d5a7e2f10
+Revises: 4b2f8e1c9a7d
+Create Date: 2026-10-19 11:02:17.530844
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c3d5a7e2f10'
+down_revision: Union[str, Sequence[str], None] = '4b2f8e1c9a7d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_hotels_location_is_active', 'hotels', ['location', 'is_active'], unique=False)
+    op.create_index(op.f('ix_room_types_hotel_id'), 'room_types', ['hotel_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_room_types_hotel_id'), table_name='room_types')
+    op.drop_index('ix_hotels_location_is_active', table_name='hotels')
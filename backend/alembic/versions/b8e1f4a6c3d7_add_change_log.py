@@ -0,0 +1,60 @@
+"""add_change_log
+
+Revision ID: b8e1f4a6c3d7
+Revises: 3f6b8d0c2a91
+Create Date: 2026-10-19 17:12:48.330951
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8e1f4a6c3d7'
+down_revision: Union[str, Sequence[str], None] = '3f6b8d0c2a91'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('change_log',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('entity', sa.String(), nullable=False),
+    sa.Column('entity_id', sa.Integer(), nullable=False),
+    sa.Column('action', sa.String(), nullable=False),
+    sa.Column('recorded_at', sa.DateTime(), nullable=False),
+    sa.Column('hotel_id', sa.Integer(), nullable=True),
+    sa.Column('room_type_id', sa.Integer(), nullable=True),
+    sa.Column('name', sa.String(), nullable=True),
+    sa.Column('base_rate_cents', sa.BigInteger(), nullable=True),
+    sa.Column('adjustment_amount_cents', sa.BigInteger(), nullable=True),
+    sa.Column('effective_date', sa.Date(), nullable=True),
+    sa.Column('end_date', sa.Date(), nullable=True),
+    sa.Column('priority', sa.Integer(), nullable=True),
+    sa.Column('reason', sa.String(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_change_log_entity_entity_id_recorded_at', 'change_log', ['entity', 'entity_id', 'recorded_at'], unique=False)
+    op.create_index('ix_change_log_entity_room_type_id_recorded_at', 'change_log', ['entity', 'room_type_id', 'recorded_at'], unique=False)
+
+    # Existing records start their history now; earlier states are unknown
+    op.execute(
+        "INSERT INTO change_log (entity, entity_id, action, recorded_at, hotel_id, name, base_rate_cents) "
+        "SELECT 'room_type', id, 'create', CURRENT_TIMESTAMP, hotel_id, name, base_rate_cents FROM room_types"
+    )
+    op.execute(
+        "INSERT INTO change_log (entity, entity_id, action, recorded_at, room_type_id, adjustment_amount_cents, "
+        "effective_date, end_date, priority, reason) "
+        "SELECT 'rate_adjustment', id, 'create', CURRENT_TIMESTAMP, room_type_id, adjustment_amount_cents, "
+        "effective_date, end_date, priority, reason FROM rate_adjustments"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_change_log_entity_room_type_id_recorded_at', table_name='change_log')
+    op.drop_index('ix_change_log_entity_entity_id_recorded_at', table_name='change_log')
+    op.drop_table('change_log')
@@ -0,0 +1,37 @@
+"""add_hotels_to_change_log
+
+Revision ID: e2d9c7a5b4f1
+Revises: b8e1f4a6c3d7
+Create Date: 2026-10-19 18:03:27.841562
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2d9c7a5b4f1'
+down_revision: Union[str, Sequence[str], None] = 'b8e1f4a6c3d7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('change_log', sa.Column('location', sa.String(), nullable=True))
+    op.add_column('change_log', sa.Column('is_active', sa.Boolean(), nullable=True))
+    # Existing hotels enter the feed as created now
+    op.execute(
+        "INSERT INTO change_log (entity, entity_id, action, recorded_at, name, location, is_active) "
+        "SELECT 'hotel', id, 'create', CURRENT_TIMESTAMP, name, location, is_active FROM hotels"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DELETE FROM change_log WHERE entity = 'hotel'")
+    with op.batch_alter_table('change_log') as batch_op:
+        batch_op.drop_column('is_active')
+        batch_op.drop_column('location')
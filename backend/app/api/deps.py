@@ -2,39 +2,88 @@
 API dependencies for dependency injection.
 
 This module provides FastAPI dependencies for:
-- Database session management
+- Database session management (primary for writes, replicas for reads)
 - User authentication and authorization
+- Login rate limiting
+- Idempotency keys on create endpoints
 """
+import hashlib
+import math
 from typing import Generator
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.orm import Session
-from app.core.database import SessionLocal
-from app.core import config
+from app.core.database import SessionLocal, read_replicas, tag_writer, wrote_recently
+from app.core import security
+from app.core.rate_limit import login_ip_limiter, login_username_limiter
 from app import services, models
-import jwt
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token")
 
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+MAX_IDEMPOTENCY_KEY_LENGTH = 255
 
-def get_db() -> Generator:
+# request.state attribute holding the idempotency Reservation
+# whose response app.api.middleware.IdempotencyMiddleware stores
+IDEMPOTENCY_STATE = "idempotency"
+
+
+def _client_key(request: Request) -> str:
+    """
+    Identify the caller for read-your-writes: its bearer token (hashed), else its address.
+    """
+    authorization = request.headers.get("authorization")
+    if authorization:
+        return hashlib.sha256(authorization.encode()).hexdigest()[:32]
+    return request.client.host if request.client else "unknown"
+
+
+def get_db(request: Request) -> Generator:
     """
     Database session dependency.
     
-    Yields a database session and ensures it's closed after use.
+    Yields a database session on the primary and ensures it's closed after use.
+    Its commits send the caller's reads to the primary for a while (see get_read_db).
     Use in route functions with: db: Session = Depends(get_db)
     
     Yields:
         Database session
     """
     db = SessionLocal()
+    tag_writer(db, _client_key(request))
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_read_db(request: Request) -> Generator:
+    """
+    Read-only database session dependency for GET routes.
+    
+    Yields a session on the next healthy read replica, or on the primary when
+    no replica is configured or available, or when the caller wrote within
+    READ_YOUR_WRITES_SECONDS. A replica whose query fails is taken out of
+    rotation until its next health check.
+    
+    Yields:
+        Database session
+    """
+    db = read_replicas.session(use_primary=wrote_recently(_client_key(request)))
     try:
         yield db
+    except DBAPIError:
+        replica = read_replicas.replica_of(db)
+        if replica is not None:
+            read_replicas.mark_failed(replica)
+        raise
     finally:
         db.close()
 
 
-async def get_current_user(
+def get_current_user(
     token: str = Depends(oauth2_scheme), 
     db: Session = Depends(get_db)
 ) -> models.User:
@@ -43,6 +92,8 @@ async def get_current_user(
     
     This dependency extracts and validates the JWT token,
     then retrieves the corresponding user from the database.
+    It is a plain function so FastAPI runs its blocking database
+    lookup in the threadpool instead of on the event loop.
     
     Args:
         token: JWT access token from Authorization header
@@ -60,17 +111,12 @@ async def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
     
-    try:
-        # Decode JWT token
-        payload = jwt.decode(
-            token, 
-            config.settings.SECRET_KEY, 
-            algorithms=[config.settings.ALGORITHM]
-        )
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
-    except jwt.PyJWTError:
+    # Decode JWT token (verified tokens are cached until they expire)
+    payload = security.decode_access_token(token)
+    if payload is None:
+        raise credentials_exception
+    username: str = payload.get("sub")
+    if username is None:
         raise credentials_exception
     
     # Retrieve user from database
@@ -79,3 +125,54 @@ async def get_current_user(
         raise credentials_exception
     
     return user
+
+
+def enforce_login_rate_limit(request: Request, username: str) -> None:
+    """
+    Throttle login attempts per client IP and per username.
+    
+    Raises:
+        HTTPException: 429 with Retry-After when either bucket is empty
+    """
+    client_ip = request.client.host if request.client else "unknown"
+    for limiter, key in (
+        (login_ip_limiter, client_ip),
+        (login_username_limiter, username.lower()),
+    ):
+        allowed, retry_after = limiter.acquire(key)
+        if not allowed:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many login attempts, try again later",
+                headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+            )
+
+
+async def idempotency_key(request: Request, current_user: models.User = Depends(get_current_user)) -> None:
+    """
+    Make a create endpoint safe to retry with an Idempotency-Key header.
+
+    The first request with a key reserves it and runs; its response is stored
+    by IdempotencyMiddleware. Retries of the same request (same method, path,
+    query and body) get the stored response back without running again.
+    Requests without the header run as usual.
+
+    Raises:
+        HTTPException: 422 if the key is empty or too long
+        IdempotencyKeyInUse: (409) while the first request still runs
+        IdempotencyKeyReused: (422) if the key was used for another request
+        IdempotentReplay: answered with the stored response
+    """
+    key = request.headers.get(IDEMPOTENCY_HEADER)
+    if key is None:
+        return
+    if not key or len(key) > MAX_IDEMPOTENCY_KEY_LENGTH:
+        raise HTTPException(
+            status_code=422,
+            detail=f"{IDEMPOTENCY_HEADER} must be 1 to {MAX_IDEMPOTENCY_KEY_LENGTH} characters",
+        )
+    fingerprint = hashlib.sha256(b"\0".join((
+        request.method.encode(), request.url.path.encode(), request.url.query.encode(), await request.body(),
+    ))).hexdigest()
+    reservation = await run_in_threadpool(services.idempotency_store.begin, current_user.id, key, fingerprint)
+    setattr(request.state, IDEMPOTENCY_STATE, reservation)
@@ -0,0 +1,62 @@
+"""
+ASGI middleware for the API.
+"""
+from fastapi.concurrency import run_in_threadpool
+from app.api.deps import IDEMPOTENCY_STATE
+from app.services.idempotency import Reservation, StoredResponse, idempotency_store
+
+
+class IdempotencyMiddleware:
+    """
+    Store the response of requests that reserved an idempotency key (see deps.idempotency_key).
+
+    Pure ASGI, so other responses stream through untouched. The response is
+    stored before its last body chunk is sent, so a client that received it
+    finds it when retrying. Server errors release the key instead, so the
+    request can be retried.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST":
+            await self.app(scope, receive, send)
+            return
+
+        response = {"done": False}
+
+        def reservation():
+            # Set on the request state by the dependency, once the route runs
+            return scope.get("state", {}).get(IDEMPOTENCY_STATE)
+
+        async def capture(message):
+            reserved = reservation()
+            if reserved is not None and not response["done"]:
+                if message["type"] == "http.response.start":
+                    headers = dict(message.get("headers", ()))
+                    content_type = headers.get(b"content-type")
+                    response.update(status=message["status"], body=[],
+                                    content_type=content_type.decode("latin-1") if content_type else None)
+                elif message["type"] == "http.response.body":
+                    response["body"].append(message.get("body", b""))
+                    if not message.get("more_body", False):
+                        response["done"] = True
+                        await run_in_threadpool(self._finish, reserved, response)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, capture)
+        finally:
+            reserved = reservation()
+            if reserved is not None and not response["done"]:
+                await run_in_threadpool(idempotency_store.release, reserved)
+
+    @staticmethod
+    def _finish(reservation: Reservation, response: dict) -> None:
+        if response["status"] >= 500:
+            idempotency_store.release(reservation)
+            return
+        idempotency_store.complete(
+            reservation, StoredResponse(response["status"], response["content_type"], b"".join(response["body"])),
+        )
@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.v1.routers import auth, users, hotels, rooms
+from app.api.v1.routers import auth, users, hotels, rooms, rates, batch, changes, jobs, exports
 
 # Main API router
 api_router = APIRouter()
@@ -9,3 +9,8 @@ api_router.include_router(auth.router, prefix="/auth", tags=["login"])
 api_router.include_router(users.router, prefix="/users", tags=["users"])
 api_router.include_router(hotels.router, tags=["hotels"])
 api_router.include_router(rooms.router, tags=["rooms"])
+api_router.include_router(rates.router, tags=["rates"])
+api_router.include_router(batch.router, tags=["batch"])
+api_router.include_router(changes.router, tags=["changes"])
+api_router.include_router(jobs.router, tags=["jobs"])
+api_router.include_router(exports.router, tags=["exports"])
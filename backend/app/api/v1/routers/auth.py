@@ -1,5 +1,6 @@
 from datetime import timedelta
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from app import schemas, services
@@ -9,14 +10,29 @@ from app.core import security, config
 router = APIRouter()
 
 @router.post("/token", response_model=schemas.Token)
-async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(deps.get_db)):
-    user = services.user.get_by_username(db, username=form_data.username)
-    if not user or not security.verify_password(form_data.password, user.password_hash):
+async def login_for_access_token(request: Request, form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(deps.get_db)):
+    deps.enforce_login_rate_limit(request, form_data.username)
+    user = await run_in_threadpool(services.user.get_by_username, db, username=form_data.username)
+    try:
+        # Unknown usernames are checked against a dummy hash to keep timing uniform
+        password_ok, new_hash = await security.password_hash_queue.run(
+            security.verify_and_update_password, form_data.password, user.password_hash if user else None
+        )
+    except security.HashingQueueFull:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts in progress, retry shortly",
+            headers={"Retry-After": "1"},
+        )
+    if not user or not password_ok:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    if new_hash:
+        # Hash used an outdated scheme or cost: upgrade it transparently
+        await run_in_threadpool(services.user.set_password_hash, db, user, new_hash)
     access_token_expires = timedelta(minutes=config.settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = security.create_access_token(
         data={"sub": user.username}, expires_delta=access_token_expires
@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from app import schemas, models, services
+from app.api import deps
+from app.services.batch_service import BatchConflictError, BatchValidationError
+
+router = APIRouter()
+
+
+@router.post("/batch/", response_model=schemas.BatchResponse, dependencies=[Depends(deps.idempotency_key)])
+def apply_batch(
+    batch_in: schemas.BatchRequest,
+    db: Session = Depends(deps.get_db),
+    current_user: models.User = Depends(deps.get_current_user),
+):
+    try:
+        results = services.batch_service.apply(db, batch_in.operations)
+    except BatchValidationError as exc:
+        raise HTTPException(status_code=422, detail=exc.errors)
+    except BatchConflictError:
+        raise HTTPException(status_code=409, detail="Batch conflicts with existing data")
+    return {"results": results}
@@ -0,0 +1,48 @@
+import asyncio
+from fastapi import APIRouter, Depends, Query
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+from app import schemas, models, services
+from app.api import deps
+from app.core.config import settings
+from app.services.sharding import shards
+
+router = APIRouter()
+
+
+@router.get("/changes/", response_model=schemas.ChangeFeed)
+async def read_changes(
+    since: int = Query(0, ge=0, description="Return changes after this sequence number"),
+    limit: int = Query(100, ge=1, le=1000),
+    wait: float = Query(0, ge=0, description="Seconds to long-poll when there are no changes yet"),
+    db: Session = Depends(deps.get_db),
+    current_user: models.User = Depends(deps.get_current_user),
+):
+    # Change log ids are sequence numbers of each shard: no single cursor covers them
+    shards.require_unsharded("The change feed")
+    loop = asyncio.get_running_loop()
+    written = asyncio.Event()
+
+    def wake() -> None:
+        loop.call_soon_threadsafe(written.set)
+
+    deadline = loop.time() + min(wait, settings.CHANGE_FEED_MAX_WAIT_SECONDS)
+    services.history.subscribe(wake)
+    try:
+        while True:
+            written.clear()
+            changes = await run_in_threadpool(services.history.changes_since, db, since, limit)
+            remaining = deadline - loop.time()
+            if changes or remaining <= 0:
+                break
+            # End the read transaction: the connection goes back to the pool
+            # while waiting and the next query sees new commits
+            await run_in_threadpool(db.rollback)
+            # Woken by commits in this worker; the poll interval catches other workers
+            try:
+                await asyncio.wait_for(written.wait(), min(remaining, settings.CHANGE_FEED_POLL_SECONDS))
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        services.history.unsubscribe(wake)
+    return {"changes": changes, "next_cursor": changes[-1].id if changes else since}
@@ -0,0 +1,41 @@
+import tempfile
+from typing import Literal
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from starlette.background import BackgroundTask
+from app import models, services
+from app.api import deps
+from app.core.config import settings
+from app.services.columnar_export import ExportFormatUnavailable
+
+router = APIRouter()
+
+# Size of the chunks the export file is streamed in
+_CHUNK_BYTES = 1 << 16
+
+
+@router.get("/exports/{table}")
+def export_table(
+    table: Literal["hotels", "room_types", "rate_adjustments", "rate_calendar"],
+    format: Literal["auto", "npz", "arrow", "parquet"] = "auto",
+    db: Session = Depends(deps.get_read_db),
+    current_user: models.User = Depends(deps.get_current_user),
+):
+    # Built in a temporary file (in memory while small), then streamed
+    spool = tempfile.SpooledTemporaryFile(max_size=settings.EXPORT_SPOOL_MAX_BYTES)
+    try:
+        format = services.columnar_export.export_table(db, table, spool, format)
+    except ExportFormatUnavailable as exc:
+        spool.close()
+        raise HTTPException(status_code=422, detail=str(exc))
+    except Exception:
+        spool.close()
+        raise
+    spool.seek(0)
+    return StreamingResponse(
+        iter(lambda: spool.read(_CHUNK_BYTES), b""),
+        media_type=services.columnar_export.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{table}.{format}"'},
+        background=BackgroundTask(spool.close),
+    )
@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from app import schemas, models, services
@@ -7,20 +7,26 @@ from app.api import deps
 router = APIRouter()
 
 
-@router.post("/hotels/", response_model=schemas.Hotel)
+@router.post("/hotels/", response_model=schemas.Hotel, dependencies=[Depends(deps.idempotency_key)])
 def create_hotel(hotel: schemas.HotelCreate, db: Session = Depends(deps.get_db), current_user: models.User = Depends(deps.get_current_user)):
     return services.hotel.create(db=db, obj_in=hotel)
 
 
 @router.get("/hotels/", response_model=List[schemas.Hotel])
-def read_hotels(skip: int = 0, limit: int = 100, db: Session = Depends(deps.get_db), current_user: models.User = Depends(deps.get_current_user)):
-    hotels = services.hotel.get_multi(db, skip=skip, limit=limit)
-    return hotels
+def read_hotels(q: Optional[str] = None, skip: int = 0, limit: int = 100, db: Session = Depends(deps.get_read_db), current_user: models.User = Depends(deps.get_current_user)):
+    if q:
+        return services.hotel.search(db, q, skip=skip, limit=limit)
+    if services.catalog.enabled:
+        return services.catalog.get_hotels(skip=skip, limit=limit)
+    return services.hotel.get_multi(db, skip=skip, limit=limit)
 
 
 @router.get("/hotels/{hotel_id}", response_model=schemas.Hotel)
-def read_hotel(hotel_id: int, db: Session = Depends(deps.get_db), current_user: models.User = Depends(deps.get_current_user)):
-    db_hotel = services.hotel.get(db, id=hotel_id)
+def read_hotel(hotel_id: int, db: Session = Depends(deps.get_read_db), current_user: models.User = Depends(deps.get_current_user)):
+    if services.catalog.enabled:
+        db_hotel = services.catalog.get_hotel(hotel_id)
+    else:
+        db_hotel = services.hotel.get(db, id=hotel_id)
     if db_hotel is None:
         raise HTTPException(status_code=404, detail="Hotel not found")
     return db_hotel
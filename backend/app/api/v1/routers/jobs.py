@@ -0,0 +1,58 @@
+from typing import Any, List
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+from app import schemas, models, services
+from app.api import deps
+from app.services.jobs import SUCCEEDED
+
+router = APIRouter()
+
+
+@router.post(
+    "/jobs/",
+    response_model=schemas.Job,
+    status_code=status.HTTP_202_ACCEPTED,
+    dependencies=[Depends(deps.idempotency_key)],
+)
+def submit_job(
+    job_in: schemas.JobCreate,
+    db: Session = Depends(deps.get_db),
+    current_user: models.User = Depends(deps.get_current_user),
+):
+    return services.job_runner.submit(db, job_in.kind, job_in.values, created_by=current_user.id)
+
+
+@router.get("/jobs/", response_model=List[schemas.Job])
+def read_jobs(
+    skip: int = 0,
+    limit: int = 100,
+    db: Session = Depends(deps.get_db),
+    current_user: models.User = Depends(deps.get_current_user),
+):
+    return services.job_runner.get_multi(db, skip=skip, limit=limit)
+
+
+@router.get("/jobs/{job_id}", response_model=schemas.Job)
+def read_job(
+    job_id: int,
+    db: Session = Depends(deps.get_db),
+    current_user: models.User = Depends(deps.get_current_user),
+):
+    job = services.job_runner.get(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/jobs/{job_id}/result")
+def read_job_result(
+    job_id: int,
+    db: Session = Depends(deps.get_db),
+    current_user: models.User = Depends(deps.get_current_user),
+) -> Any:
+    job = services.job_runner.get(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.status != SUCCEEDED:
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}")
+    return job.result
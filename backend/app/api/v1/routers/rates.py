@@ -0,0 +1,96 @@
+from datetime import date
+from typing import List, Literal
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from app import schemas, models, services
+from app.api import deps
+from app.core.config import settings
+from app.services.rate_stream import format_event
+
+router = APIRouter()
+
+
+@router.post("/stay-quotes/", response_model=schemas.StayQuote)
+def quote_stay(
+    quote_in: schemas.StayQuoteRequest,
+    db: Session = Depends(deps.get_read_db),
+    current_user: models.User = Depends(deps.get_current_user),
+):
+    result = services.rate_service.quote_stay(
+        db, quote_in.room_type_ids, quote_in.check_in, quote_in.check_out
+    )
+    if result is None:
+        raise HTTPException(status_code=404, detail="Room Type not found")
+    return result
+
+
+@router.post("/effective-rates/batch", response_model=schemas.EffectiveRateBatch)
+def get_effective_rates_batch(
+    batch_in: schemas.EffectiveRateBatchRequest,
+    db: Session = Depends(deps.get_read_db),
+    current_user: models.User = Depends(deps.get_current_user),
+):
+    items = [(item.room_type_id, item.date) for item in batch_in.items]
+    as_of = services.history.to_transaction_time(batch_in.as_of) if batch_in.as_of else None
+    rates = services.rate_service.calculate_effective_rates_batch(db, items, as_of=as_of)
+    results = []
+    for (room_type_id, target_date), rate in zip(items, rates):
+        if rate is None:
+            results.append({"room_type_id": room_type_id, "effective_date": target_date, "found": False})
+        else:
+            results.append({**rate, "found": True})
+    return {"results": results}
+
+
+@router.get("/lowest-rates/", response_model=List[schemas.HotelLowestRate])
+def search_lowest_rates(
+    location: str,
+    date_str: str = None,
+    sort: Literal["asc", "desc"] = "asc",
+    skip: int = 0,
+    limit: int = 20,
+    db: Session = Depends(deps.get_read_db),
+    current_user: models.User = Depends(deps.get_current_user),
+):
+    target_date = date.today()
+    if date_str:
+        try:
+            target_date = date.fromisoformat(date_str)
+        except ValueError:
+            raise HTTPException(status_code=422, detail="Invalid date format. Use YYYY-MM-DD")
+
+    return services.rate_service.search_lowest_rates(
+        db, location, target_date, skip=skip, limit=limit, descending=sort == "desc"
+    )
+
+
+@router.get("/hotels/{hotel_id}/rate-stream")
+async def stream_hotel_rates(
+    hotel_id: int,
+    db: Session = Depends(deps.get_db),
+    current_user: models.User = Depends(deps.get_current_user),
+):
+    hotel = await run_in_threadpool(services.hotel.get, db, hotel_id)
+    if hotel is None:
+        raise HTTPException(status_code=404, detail="Hotel not found")
+    # Long-lived stream: give the connection back to the pool now
+    await run_in_threadpool(db.close)
+
+    hub = services.rate_stream_hub
+    subscription = await hub.subscribe(hotel_id)
+
+    async def events():
+        try:
+            while True:
+                snapshot = await subscription.get(settings.RATE_STREAM_HEARTBEAT_SECONDS)
+                yield format_event(snapshot) if snapshot is not None else ": keep-alive\n\n"
+        finally:
+            hub.unsubscribe(subscription)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,5 +1,5 @@
-from datetime import date
-from typing import List
+from datetime import date, datetime
+from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from app import schemas, models, services
@@ -8,23 +8,28 @@ from app.api import deps
 router = APIRouter()
 
 
-@router.post("/room-types/", response_model=schemas.RoomType)
+@router.post("/room-types/", response_model=schemas.RoomType, dependencies=[Depends(deps.idempotency_key)])
 def create_room_type(room_type: schemas.RoomTypeCreate, db: Session = Depends(deps.get_db), current_user: models.User = Depends(deps.get_current_user)):
     return services.room_type.create(db=db, obj_in=room_type)
 
 
 @router.get("/hotels/{hotel_id}/room-types/", response_model=List[schemas.RoomType])
-def read_room_types(hotel_id: int, db: Session = Depends(deps.get_db), current_user: models.User = Depends(deps.get_current_user)):
+def read_room_types(hotel_id: int, db: Session = Depends(deps.get_read_db), current_user: models.User = Depends(deps.get_current_user)):
+    if services.catalog.enabled:
+        return services.catalog.get_room_types_by_hotel(hotel_id)
     return services.room_type.get_by_hotel(db, hotel_id=hotel_id)
 
 
 @router.get("/room-types/{room_type_id}", response_model=schemas.RoomType)
 def read_room_type(
     room_type_id: int,
-    db: Session = Depends(deps.get_db),
+    db: Session = Depends(deps.get_read_db),
     current_user: models.User = Depends(deps.get_current_user),
 ):
-    db_room_type = services.room_type.get(db, id=room_type_id)
+    if services.catalog.enabled:
+        db_room_type = services.catalog.get_room_type(room_type_id)
+    else:
+        db_room_type = services.room_type.get(db, id=room_type_id)
     if not db_room_type:
         raise HTTPException(status_code=404, detail="Room Type not found")
     return db_room_type
@@ -59,7 +64,7 @@ def delete_room_type(
     return db_room_type
 
 
-@router.post("/rate-adjustments/", response_model=schemas.RateAdjustment)
+@router.post("/rate-adjustments/", response_model=schemas.RateAdjustment, dependencies=[Depends(deps.idempotency_key)])
 def create_rate_adjustment(adjustment: schemas.RateAdjustmentCreate, db: Session = Depends(deps.get_db), current_user: models.User = Depends(deps.get_current_user)):
     room_type_obj = services.room_type.get(db, id=adjustment.room_type_id)
     if not room_type_obj:
@@ -70,10 +75,10 @@ def create_rate_adjustment(adjustment: schemas.RateAdjustmentCreate, db: Session
 @router.get("/rate-adjustments/{adjustment_id}", response_model=schemas.RateAdjustment)
 def read_rate_adjustment(
     adjustment_id: int,
-    db: Session = Depends(deps.get_db),
+    db: Session = Depends(deps.get_read_db),
     current_user: models.User = Depends(deps.get_current_user),
 ):
-    db_adjustment = services.rate_adjustment.get(db, id=adjustment_id)
+    db_adjustment = services.rate_adjustment.get_values(db, id=adjustment_id)
     if not db_adjustment:
         raise HTTPException(status_code=404, detail="Rate Adjustment not found")
     return db_adjustment
@@ -82,13 +87,13 @@ def read_rate_adjustment(
 @router.get("/room-types/{room_type_id}/rate-adjustments/", response_model=List[schemas.RateAdjustment])
 def read_rate_adjustments(
     room_type_id: int,
-    db: Session = Depends(deps.get_db),
+    db: Session = Depends(deps.get_read_db),
     current_user: models.User = Depends(deps.get_current_user),
 ):
-    room_type_obj = services.room_type.get(db, id=room_type_id)
-    if not room_type_obj:
+    adjustments = services.rate_adjustment.get_values_by_room_type(db, room_type_id=room_type_id)
+    if adjustments is None:
         raise HTTPException(status_code=404, detail="Room Type not found")
-    return services.rate_adjustment.get_by_room_type(db, room_type_id=room_type_id)
+    return adjustments
 
 
 @router.put("/rate-adjustments/{adjustment_id}", response_model=schemas.RateAdjustment)
@@ -105,6 +110,11 @@ def update_rate_adjustment(
         room_type_obj = services.room_type.get(db, id=adjustment_in.room_type_id)
         if not room_type_obj:
             raise HTTPException(status_code=404, detail="Room Type not found")
+    # The schema can only check the range when both dates are in the request
+    effective_date = adjustment_in.effective_date or db_adjustment.effective_date
+    end_date = adjustment_in.end_date if "end_date" in adjustment_in.model_fields_set else db_adjustment.end_date
+    if end_date is not None and end_date < effective_date:
+        raise HTTPException(status_code=422, detail="end_date must be on or after effective_date")
     return services.rate_adjustment.update(db=db, db_obj=db_adjustment, obj_in=adjustment_in)
 
 
@@ -121,15 +131,18 @@ def delete_rate_adjustment(
 
 
 @router.get("/room-types/{room_type_id}/effective-rate")
-def get_effective_rate(room_type_id: int, date_str: str = None, db: Session = Depends(deps.get_db), current_user: models.User = Depends(deps.get_current_user)):
+def get_effective_rate(room_type_id: int, date_str: str = None, as_of: Optional[datetime] = None, db: Session = Depends(deps.get_read_db), current_user: models.User = Depends(deps.get_current_user)):
     target_date = date.today()
     if date_str:
         try:
             target_date = date.fromisoformat(date_str)
         except ValueError:
             raise HTTPException(status_code=422, detail="Invalid date format. Use YYYY-MM-DD")
+    if as_of is not None:
+        # Rate as it was quoted at that moment, rebuilt from the change log
+        as_of = services.history.to_transaction_time(as_of)
             
-    result = services.rate_service.calculate_effective_rate(db, room_type_id, target_date)
+    result = services.rate_service.calculate_effective_rate(db, room_type_id, target_date, as_of=as_of)
     if not result:
         raise HTTPException(status_code=404, detail="Room Type not found")
     return result
@@ -12,7 +12,7 @@ async def read_users_me(current_user: models.User = Depends(deps.get_current_use
     return {"username": current_user.username, "id": current_user.id}
 
 
-@router.post("/", response_model=schemas.User)
+@router.post("/", response_model=schemas.User, dependencies=[Depends(deps.idempotency_key)])
 def create_user(
     user_in: schemas.UserCreate,
     db: Session = Depends(deps.get_db),
@@ -28,19 +28,19 @@ def create_user(
 def read_users(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(deps.get_db),
+    db: Session = Depends(deps.get_read_db),
     current_user: models.User = Depends(deps.get_current_user),
 ):
-    return services.user.get_multi(db, skip=skip, limit=limit)
+    return services.user.get_multi_values(db, skip=skip, limit=limit)
 
 
 @router.get("/{user_id}", response_model=schemas.User)
 def read_user(
     user_id: int,
-    db: Session = Depends(deps.get_db),
+    db: Session = Depends(deps.get_read_db),
     current_user: models.User = Depends(deps.get_current_user),
 ):
-    db_user = services.user.get(db, id=user_id)
+    db_user = services.user.get_values(db, id=user_id)
     if not db_user:
         raise HTTPException(status_code=404, detail="User not found")
     return db_user
@@ -0,0 +1,421 @@
+"""
+Pluggable cache backends with cross-worker invalidation.
+
+Hot reads are always served from a bounded in-process LRU. With the "sqlite"
+backend, local misses fall through to a store shared by every worker on the
+host, and invalidations are appended to a shared log that each worker polls
+at most every CACHE_INVALIDATION_POLL_SECONDS, so a write made in one worker
+is visible to all others within that delay.
+
+Entries carry a tag (e.g. a room type id) so that all entries derived from
+one record can be invalidated together. A reader filling the cache from the
+database takes the tag's `generation` before reading and passes it to `set`:
+if an invalidation of the tag arrives in between, the value may predate a
+write and is dropped instead of being served until it expires.
+"""
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Set, Tuple
+
+from app.core.config import settings
+
+# Sentinel returned by backends on a cache miss (None is a valid cached value)
+MISS = object()
+
+InvalidationCallback = Callable[[str, Optional[str]], None]
+
+
+class CacheBackend:
+    """
+    Interface implemented by cache stores.
+    """
+
+    def get(self, namespace: str, key: str) -> Any:
+        return self.get_entry(namespace, key)[0]
+
+    def get_entry(self, namespace: str, key: str) -> Tuple[Any, Optional[str]]:
+        """
+        Return (value, tag) for a key, or (MISS, None).
+        """
+        raise NotImplementedError
+
+    def set(self, namespace: str, key: str, value: Any, tag: Optional[str] = None, ttl: Optional[float] = None) -> None:
+        raise NotImplementedError
+
+    def invalidate(self, namespace: str, tag: Optional[str] = None) -> None:
+        """
+        Drop every entry with the given tag, or the whole namespace if tag is None.
+        """
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+
+class LocalCache(CacheBackend):
+    """
+    Thread-safe, size-bounded LRU cache with per-entry expiry.
+    """
+
+    def __init__(self, max_entries: int, default_ttl: float):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, Optional[str], Any]]" = OrderedDict()
+        self._tags: Dict[Tuple[str, Optional[str]], Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def get_entry(self, namespace: str, key: str) -> Tuple[Any, Optional[str]]:
+        with self._lock:
+            entry = self._entries.get((namespace, key))
+            if entry is None:
+                return MISS, None
+            expires_at, tag, value = entry
+            if expires_at < time.monotonic():
+                self._discard(namespace, key)
+                return MISS, None
+            self._entries.move_to_end((namespace, key))
+            return value, tag
+
+    def set(self, namespace: str, key: str, value: Any, tag: Optional[str] = None, ttl: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + (self.default_ttl if ttl is None else ttl)
+        with self._lock:
+            self._discard(namespace, key)
+            self._entries[(namespace, key)] = (expires_at, tag, value)
+            self._tags.setdefault((namespace, tag), set()).add(key)
+            while len(self._entries) > self.max_entries:
+                (old_namespace, old_key), _ = next(iter(self._entries.items()))
+                self._discard(old_namespace, old_key)
+
+    def invalidate(self, namespace: str, tag: Optional[str] = None) -> None:
+        with self._lock:
+            if tag is None:
+                keys = [key for entry_namespace, key in self._entries if entry_namespace == namespace]
+            else:
+                keys = list(self._tags.get((namespace, tag), ()))
+            for key in keys:
+                self._discard(namespace, key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+
+    def items(self) -> List[Tuple[str, str, Optional[str], Any]]:
+        """
+        Snapshot of the live entries as (namespace, key, tag, value).
+        """
+        now = time.monotonic()
+        with self._lock:
+            return [
+                (namespace, key, tag, value)
+                for (namespace, key), (expires_at, tag, value) in self._entries.items()
+                if expires_at >= now
+            ]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _discard(self, namespace: str, key: str) -> None:
+        entry = self._entries.pop((namespace, key), None)
+        if entry is None:
+            return
+        tagged = self._tags.get((namespace, entry[1]))
+        if tagged is not None:
+            tagged.discard(key)
+            if not tagged:
+                del self._tags[(namespace, entry[1])]
+
+
+class _SQLiteStore:
+    """
+    Per-thread connections to a SQLite file shared between worker processes.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+
+    def connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None or getattr(self._local, "pid", None) != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+
+class SQLiteCache(CacheBackend):
+    """
+    Cache stored in a SQLite file, shared by every worker on the host.
+    """
+
+    def __init__(self, path: str, default_ttl: float):
+        self.default_ttl = default_ttl
+        self._store = _SQLiteStore(path)
+        self._store.connection().executescript(
+            """
+            CREATE TABLE IF NOT EXISTS cache_entries (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                tag TEXT,
+                value BLOB NOT NULL,
+                expires_at REAL NOT NULL,
+                PRIMARY KEY (namespace, key)
+            );
+            CREATE INDEX IF NOT EXISTS ix_cache_entries_tag ON cache_entries (namespace, tag);
+            """
+        )
+
+    def get_entry(self, namespace: str, key: str) -> Tuple[Any, Optional[str]]:
+        row = self._store.connection().execute(
+            "SELECT value, tag, expires_at FROM cache_entries WHERE namespace = ? AND key = ?",
+            (namespace, key),
+        ).fetchone()
+        if row is None or row[2] < time.time():
+            return MISS, None
+        return pickle.loads(row[0]), row[1]
+
+    def set(self, namespace: str, key: str, value: Any, tag: Optional[str] = None, ttl: Optional[float] = None) -> None:
+        expires_at = time.time() + (self.default_ttl if ttl is None else ttl)
+        self._store.connection().execute(
+            "INSERT OR REPLACE INTO cache_entries (namespace, key, tag, value, expires_at) VALUES (?, ?, ?, ?, ?)",
+            (namespace, key, tag, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), expires_at),
+        )
+
+    def invalidate(self, namespace: str, tag: Optional[str] = None) -> None:
+        if tag is None:
+            self._store.connection().execute("DELETE FROM cache_entries WHERE namespace = ?", (namespace,))
+        else:
+            self._store.connection().execute(
+                "DELETE FROM cache_entries WHERE namespace = ? AND tag = ?", (namespace, tag)
+            )
+
+    def clear(self) -> None:
+        self._store.connection().execute("DELETE FROM cache_entries")
+
+
+class InvalidationBus:
+    """
+    In-process invalidation bus: subscribers are notified synchronously.
+    """
+
+    def __init__(self):
+        self._subscribers: List[InvalidationCallback] = []
+
+    def subscribe(self, callback: InvalidationCallback) -> None:
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: InvalidationCallback) -> None:
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    def publish(self, namespace: str, tag: Optional[str] = None) -> None:
+        self._notify(namespace, tag)
+
+    def poll(self, force: bool = False) -> None:
+        """
+        Deliver invalidations published by other workers (none for the in-process bus).
+        """
+        pass
+
+    def _notify(self, namespace: str, tag: Optional[str]) -> None:
+        for callback in list(self._subscribers):
+            callback(namespace, tag)
+
+
+class SQLiteInvalidationBus(InvalidationBus):
+    """
+    Invalidation bus backed by an append-only table in a shared SQLite file.
+
+    Local subscribers are notified immediately; other workers pick the message
+    up on their next poll.
+    """
+
+    # Messages older than this are pruned; workers poll far more often
+    RETENTION_SECONDS = 3600
+
+    def __init__(self, path: str, poll_interval: float):
+        super().__init__()
+        self.poll_interval = poll_interval
+        self._store = _SQLiteStore(path)
+        self._lock = threading.Lock()
+        self._next_poll = 0.0
+        connection = self._store.connection()
+        connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS cache_invalidations (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                origin TEXT NOT NULL,
+                namespace TEXT NOT NULL,
+                tag TEXT,
+                created_at REAL NOT NULL
+            );
+            """
+        )
+        self._last_seq = connection.execute("SELECT COALESCE(MAX(seq), 0) FROM cache_invalidations").fetchone()[0]
+
+    @property
+    def origin(self) -> str:
+        # Recomputed on use so forked workers get their own identity
+        return f"{os.getpid()}:{id(self)}"
+
+    def publish(self, namespace: str, tag: Optional[str] = None) -> None:
+        now = time.time()
+        connection = self._store.connection()
+        connection.execute(
+            "INSERT INTO cache_invalidations (origin, namespace, tag, created_at) VALUES (?, ?, ?, ?)",
+            (self.origin, namespace, tag, now),
+        )
+        connection.execute(
+            "DELETE FROM cache_invalidations WHERE created_at < ?", (now - self.RETENTION_SECONDS,)
+        )
+        self._notify(namespace, tag)
+
+    def poll(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and now < self._next_poll:
+            return
+        with self._lock:
+            self._next_poll = now + self.poll_interval
+            rows = self._store.connection().execute(
+                "SELECT seq, origin, namespace, tag FROM cache_invalidations WHERE seq > ? ORDER BY seq",
+                (self._last_seq,),
+            ).fetchall()
+            if rows:
+                self._last_seq = rows[-1][0]
+        origin = self.origin
+        for _, message_origin, namespace, tag in rows:
+            if message_origin != origin:
+                self._notify(namespace, tag)
+
+
+class TieredCache:
+    """
+    Cache facade used by the services: local LRU in front of an optional
+    shared backend, kept coherent through an invalidation bus.
+    """
+
+    def __init__(self, local: LocalCache, bus: InvalidationBus, shared: Optional[CacheBackend] = None):
+        self.local = local
+        self.shared = shared
+        self.bus = bus
+        # Invalidations seen per (namespace, tag); tag None counts whole-namespace ones
+        self._generations: Dict[Tuple[str, Optional[str]], int] = {}
+        self._generation_lock = threading.Lock()
+        bus.subscribe(self._evict_local)
+
+    def get(self, namespace: str, key: Hashable) -> Any:
+        self.bus.poll()
+        key = str(key)
+        value = self.local.get(namespace, key)
+        if value is MISS and self.shared is not None:
+            value, tag = self.shared.get_entry(namespace, key)
+            if value is not MISS:
+                self.local.set(namespace, key, value, tag=tag)
+        return value
+
+    def generation(self, namespace: str, tag: Optional[Hashable] = None) -> Tuple[int, int]:
+        """
+        Token that changes whenever this worker sees an invalidation of `tag` (or of the whole namespace).
+        """
+        tag = None if tag is None else str(tag)
+        with self._generation_lock:
+            return self._generations.get((namespace, None), 0), self._generations.get((namespace, tag), 0)
+
+    def set(
+        self,
+        namespace: str,
+        key: Hashable,
+        value: Any,
+        tag: Optional[Hashable] = None,
+        ttl: Optional[float] = None,
+        generation: Optional[Tuple[int, int]] = None,
+    ) -> None:
+        """
+        Cache a value; with `generation` (taken before the value was read), only
+        if the tag has not been invalidated since.
+        """
+        key = str(key)
+        tag = None if tag is None else str(tag)
+        self.local.set(namespace, key, value, tag=tag, ttl=ttl)
+        if self.shared is not None:
+            self.shared.set(namespace, key, value, tag=tag, ttl=ttl)
+        if generation is None:
+            return
+        # Checked after storing: an invalidation published later evicts the entry itself
+        self.bus.poll(force=True)
+        if self.generation(namespace, tag) != generation:
+            self.local.invalidate(namespace, tag)
+            if self.shared is not None:
+                self.shared.invalidate(namespace, tag)
+
+    def invalidate(self, namespace: str, tag: Optional[Hashable] = None) -> None:
+        """
+        Invalidate entries in this worker and the shared store, and tell other workers.
+
+        The shared store is cleared again after publishing, in case a worker
+        stored a stale value before the message reached it (see `set`).
+        """
+        tag = None if tag is None else str(tag)
+        if self.shared is not None:
+            self.shared.invalidate(namespace, tag)
+        self.bus.publish(namespace, tag)
+        if self.shared is not None:
+            self.shared.invalidate(namespace, tag)
+
+    def subscribe(self, callback: InvalidationCallback) -> None:
+        """
+        Register a callback run for every invalidation, local or from another worker.
+        """
+        self.bus.subscribe(callback)
+
+    def unsubscribe(self, callback: InvalidationCallback) -> None:
+        self.bus.unsubscribe(callback)
+
+    def clear(self) -> None:
+        self.local.clear()
+        if self.shared is not None:
+            self.shared.clear()
+
+    def _evict_local(self, namespace: str, tag: Optional[str]) -> None:
+        with self._generation_lock:
+            self._generations[(namespace, tag)] = self._generations.get((namespace, tag), 0) + 1
+        self.local.invalidate(namespace, tag)
+
+
+def build_cache() -> TieredCache:
+    """
+    Build the cache configured by CACHE_BACKEND ("local" or "sqlite").
+    """
+    local = LocalCache(max_entries=settings.CACHE_MAX_ENTRIES, default_ttl=settings.CACHE_TTL_SECONDS)
+    if settings.CACHE_BACKEND == "sqlite":
+        return TieredCache(
+            local,
+            bus=SQLiteInvalidationBus(settings.CACHE_SQLITE_PATH, settings.CACHE_INVALIDATION_POLL_SECONDS),
+            shared=SQLiteCache(settings.CACHE_SQLITE_PATH, default_ttl=settings.CACHE_TTL_SECONDS),
+        )
+    if settings.CACHE_BACKEND != "local":
+        raise ValueError(f"Unknown CACHE_BACKEND: {settings.CACHE_BACKEND}")
+    return TieredCache(local, bus=InvalidationBus())
+
+
+_cache: Optional[TieredCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> TieredCache:
+    """
+    Return the process-wide cache, creating it on first use.
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = build_cache()
+    return _cache
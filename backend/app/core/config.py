@@ -3,7 +3,9 @@ This module uses Pydantic's BaseSettings to manage configuration values.
 Settings can be overridden using environment variables defined in a .env file.
 
 """
-from pydantic import ConfigDict
+import os
+from typing import Literal, Optional
+from pydantic import ConfigDict, Field, model_validator
 from pydantic_settings import BaseSettings
 
 
@@ -19,12 +21,137 @@ class Settings(BaseSettings):
     
     # Database configuration
     SQLALCHEMY_DATABASE_URL: str = "sqlite:///./hotel.db"
-    
+
+    # Read replicas serving GET endpoints in round-robin order, e.g.
+    # ["postgresql://replica-1/hotel", "sqlite:///file:replica.db?mode=ro&uri=true"].
+    # Unhealthy replicas are re-checked every REPLICA_HEALTH_CHECK_SECONDS; a
+    # client's reads stay on the primary for READ_YOUR_WRITES_SECONDS after its
+    # own write (set it above the replication lag). With several workers this
+    # needs CACHE_BACKEND=sqlite, which shares the "wrote recently" markers.
+    SQLALCHEMY_REPLICA_URLS: list[str] = []
+    REPLICA_HEALTH_CHECK_SECONDS: float = 5.0
+    READ_YOUR_WRITES_SECONDS: float = 5.0
+
+    # Hotel data shards (see app.services.sharding). Hotels, room types and
+    # adjustments live on the shard owning bucket hotel_id % SHARD_BUCKETS;
+    # users, jobs and the bucket map stay in SQLALCHEMY_DATABASE_URL. Ids are
+    # reserved SHARD_ID_BLOCK_SIZE at a time, and every process re-reads the
+    # bucket map at least every SHARD_MAP_TTL_SECONDS.
+    SQLALCHEMY_SHARD_URLS: list[str] = []
+    SHARD_BUCKETS: int = 256
+    SHARD_ID_BLOCK_SIZE: int = 100
+    SHARD_MAP_TTL_SECONDS: float = 5.0
+
+    # Production server configuration (see gunicorn.conf.py)
+    HOST: str = "0.0.0.0"
+    PORT: int = 8000
+    WORKERS: int = Field(default_factory=lambda: os.cpu_count() or 1)
+    WORKER_TIMEOUT_SECONDS: int = 60
+    GRACEFUL_TIMEOUT_SECONDS: int = 30
+
+
+    # Cache configuration: "local" keeps caches per process, "sqlite" shares
+    # entries and invalidations between workers through CACHE_SQLITE_PATH
+    CACHE_BACKEND: Literal["local", "sqlite"] = "local"
+    CACHE_SQLITE_PATH: str = "./cache.db"
+    CACHE_MAX_ENTRIES: int = 100_000
+    CACHE_TTL_SECONDS: float = 300.0
+    CACHE_INVALIDATION_POLL_SECONDS: float = 1.0
+
+    # Cache warm-up at worker start (see app.services.cache_warmup): effective
+    # rates of active hotels' room types for CACHE_WARM_DAYS days from today
+    # (0 disables), at most CACHE_WARM_MAX_ENTRIES of them. With
+    # CACHE_SNAPSHOT_PATH set, workers save their cached rates there on
+    # shutdown and the next worker restores them instead, unless the file is
+    # older than CACHE_SNAPSHOT_MAX_AGE_SECONDS.
+    CACHE_WARM_DAYS: int = 7
+    CACHE_WARM_MAX_ENTRIES: int = 50_000
+    CACHE_SNAPSHOT_PATH: Optional[str] = None
+    CACHE_SNAPSHOT_MAX_AGE_SECONDS: float = 3600.0
+
+    # The in-memory hotel and room type catalog (see app.services.catalog)
+    # follows writes through the invalidation bus and is fully re-read at
+    # least this often. It serves reads only with CACHE_BACKEND=sqlite or a
+    # single worker, so that every worker's writes reach it
+    CATALOG_REFRESH_SECONDS: float = 300.0
+
+    # Idempotency-Key support on create endpoints (see app.services.idempotency):
+    # responses are replayed to retries for IDEMPOTENCY_KEY_TTL_SECONDS; a
+    # request still running after IDEMPOTENCY_LOCK_SECONDS is presumed dead and
+    # its key may be reused; expired keys are swept at most every
+    # IDEMPOTENCY_SWEEP_SECONDS
+    IDEMPOTENCY_KEY_TTL_SECONDS: float = 86400.0
+    IDEMPOTENCY_LOCK_SECONDS: float = 120.0
+    IDEMPOTENCY_SWEEP_SECONDS: float = 300.0
 
     # This value is hardcoded only for the assignment
     SECRET_KEY: str = "supersecretkey"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+
+    # Keys for asymmetric algorithms (RS256, ES256, EdDSA, ...), as PEM text or
+    # a path to a PEM file. Workers that only verify tokens need just the public
+    # key. Asymmetric algorithms require the `pyjwt[crypto]` extra.
+    JWT_PRIVATE_KEY: Optional[str] = None
+    JWT_PUBLIC_KEY: Optional[str] = None
+
+    # Maximum number of verified tokens remembered per worker
+    TOKEN_CACHE_SIZE: int = 10_000
+
+    # Login throttling: token buckets per client IP and per username
+    LOGIN_IP_BURST: int = 20
+    LOGIN_IP_PER_MINUTE: float = 30.0
+    LOGIN_USERNAME_BURST: int = 10
+    LOGIN_USERNAME_PER_MINUTE: float = 10.0
+    LOGIN_LIMITER_MAX_KEYS: int = 100_000
+
+    # Password hashing. The first scheme hashes new passwords; hashes in the
+    # other schemes, or with cost outside the settings below, still verify and
+    # are rehashed on the next successful login. Cost settings left unset use
+    # passlib defaults; tune them with scripts/calibrate_password_hash.py.
+    # argon2 requires `argon2-cffi`, bcrypt requires `bcrypt`.
+    PASSWORD_SCHEMES: list[str] = ["pbkdf2_sha256"]
+    PASSWORD_PBKDF2_ROUNDS: Optional[int] = None
+    PASSWORD_BCRYPT_ROUNDS: Optional[int] = None
+    PASSWORD_ARGON2_TIME_COST: Optional[int] = None
+    PASSWORD_ARGON2_MEMORY_COST_KIB: Optional[int] = None
+    PASSWORD_ARGON2_PARALLELISM: Optional[int] = None
+
+    # Password hashing runs on a small dedicated pool; attempts beyond
+    # PASSWORD_HASH_QUEUE_SIZE (running + waiting) are rejected with 429
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_QUEUE_SIZE: int = 16
+    
+    # Change feed long-polling: longest wait a client may ask for, and how
+    # often a waiting request re-checks the log for writes by other workers
+    CHANGE_FEED_MAX_WAIT_SECONDS: float = 30.0
+    CHANGE_FEED_POLL_SECONDS: float = 1.0
+    
+    # Live rate streams: days after today included in each snapshot, queued
+    # snapshots per client (oldest dropped when full), keep-alive interval and
+    # how long a burst of writes is coalesced into one push
+    RATE_STREAM_HORIZON_DAYS: int = 6
+    RATE_STREAM_QUEUE_SIZE: int = 4
+    RATE_STREAM_HEARTBEAT_SECONDS: float = 15.0
+    RATE_STREAM_DEBOUNCE_SECONDS: float = 0.05
+    
+    # Background jobs: worker threads per process, how often idle workers
+    # look for jobs queued by other processes, work items per committed
+    # chunk, when a running job without progress counts as stalled and how
+    # often each process looks for stalled jobs
+    JOB_WORKERS: int = 2
+    JOB_POLL_SECONDS: float = 1.0
+    JOB_CHUNK_SIZE: int = 200
+    JOB_STALE_SECONDS: float = 300.0
+    JOB_REQUEUE_CHECK_SECONDS: float = 30.0
+    JOB_MAX_ATTEMPTS: int = 3
+
+    # Portfolio rate calendar builds: worker processes and default window
+    RATE_CALENDAR_WORKERS: int = Field(default_factory=lambda: os.cpu_count() or 1)
+    RATE_CALENDAR_DAYS: int = 730
+
+    # Columnar exports are built in memory up to this size, then in a temporary file
+    EXPORT_SPOOL_MAX_BYTES: int = 64 * 1024 * 1024
     
     # CORS Configuration
     BACKEND_CORS_ORIGINS: list[str] = [
@@ -33,5 +160,12 @@ class Settings(BaseSettings):
         "http://frontend"  # Docker service name
     ]
 
+    @model_validator(mode="after")
+    def check_read_your_writes(self):
+        # A per-process cache would send a writer's next read on another worker to a lagging replica
+        if self.SQLALCHEMY_REPLICA_URLS and self.CACHE_BACKEND == "local" and self.WORKERS > 1:
+            raise ValueError("SQLALCHEMY_REPLICA_URLS with several WORKERS requires CACHE_BACKEND=sqlite")
+        return self
+
 # Global settings instance
 settings = Settings()
@@ -1,9 +1,32 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+"""
+Database engines and sessions.
+
+Writes always go to the primary (`SessionLocal`). Reads that tolerate a
+little replication lag can use `read_replicas`, which hands out sessions on
+the configured replicas in round-robin order, skipping replicas that fail a
+health check, and falls back to the primary when none is available.
+
+Read-your-writes: a session tagged with a client key (see
+`tag_writer`) records each commit, and for READ_YOUR_WRITES_SECONDS
+afterwards that client's reads go to the primary. The marker lives in the
+cache, so with CACHE_BACKEND=sqlite it holds across workers (settings refuse
+replicas with several workers otherwise).
+
+Replica sessions are marked (`is_replica`): what they read may lag behind the
+primary, so it must not be put in shared caches.
+"""
+import itertools
+import threading
+import time
+from typing import List, Optional
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+from .cache import MISS, get_cache
 from .config import settings
 
 engine = create_engine(
-    settings.SQLALCHEMY_DATABASE_URL, 
+    settings.SQLALCHEMY_DATABASE_URL,
     connect_args={"check_same_thread": False}
 )
 
@@ -12,3 +35,126 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 # Base class for all SQLAlchemy models
 Base = declarative_base()
+
+# Cache namespace of "client wrote recently" markers
+RECENT_WRITES = "recent_writes"
+
+_WRITER_KEY = "read_your_writes_key"
+
+# Session.info flag of sessions on a read replica
+_REPLICA_KEY = "replica"
+
+
+def _connect_args(url: str) -> dict:
+    return {"check_same_thread": False} if url.startswith("sqlite") else {}
+
+
+class Replica:
+    """
+    One read replica with its last health check result.
+    """
+
+    def __init__(self, url: str):
+        self.engine = create_engine(url, connect_args=_connect_args(url), pool_pre_ping=True)
+        self.session_factory = sessionmaker(
+            autocommit=False, autoflush=False, bind=self.engine, info={_REPLICA_KEY: True}
+        )
+        self.healthy = True
+        self.checked_at = float("-inf")
+
+
+class ReplicaSet:
+    """
+    Round-robin routing of read sessions across healthy replicas.
+
+    A replica is pinged (SELECT 1) at most every `check_interval` seconds,
+    when its turn comes; one that fails is skipped until a later check
+    succeeds. SQLite replicas should be opened read-only
+    ("sqlite:///file:replica.db?mode=ro&uri=true") so a missing file fails
+    the check instead of being created empty.
+    """
+
+    def __init__(self, urls: List[str], check_interval: float, primary: sessionmaker = SessionLocal):
+        self.replicas = [Replica(url) for url in urls]
+        self.check_interval = check_interval
+        self.primary = primary
+        self._turns = itertools.count()
+        self._lock = threading.Lock()
+
+    def session(self, use_primary: bool = False) -> Session:
+        """
+        A session on the next healthy replica, or on the primary.
+        """
+        replica = None if use_primary else self._next_healthy()
+        return (replica.session_factory if replica is not None else self.primary)()
+
+    def dispose(self, close: bool = True) -> None:
+        """
+        Drop the replicas' pooled connections (see Engine.dispose).
+        """
+        for replica in self.replicas:
+            replica.engine.dispose(close=close)
+
+    def replica_of(self, db: Session) -> Optional[Replica]:
+        bind = db.get_bind()
+        return next((replica for replica in self.replicas if replica.engine is bind), None)
+
+    def mark_failed(self, replica: Replica) -> None:
+        """
+        Take a replica out of rotation until its next health check.
+        """
+        replica.healthy = False
+        replica.checked_at = time.monotonic()
+
+    def _next_healthy(self) -> Optional[Replica]:
+        for _ in range(len(self.replicas)):
+            with self._lock:
+                replica = self.replicas[next(self._turns) % len(self.replicas)]
+            if self._check(replica):
+                return replica
+        return None
+
+    def _check(self, replica: Replica) -> bool:
+        now = time.monotonic()
+        if now - replica.checked_at < self.check_interval:
+            return replica.healthy
+        # Claim the check first so concurrent requests do not all ping
+        replica.checked_at = now
+        try:
+            with replica.engine.connect() as connection:
+                connection.execute(text("SELECT 1"))
+            replica.healthy = True
+        except SQLAlchemyError:
+            replica.healthy = False
+        return replica.healthy
+
+
+read_replicas = ReplicaSet(settings.SQLALCHEMY_REPLICA_URLS, settings.REPLICA_HEALTH_CHECK_SECONDS)
+
+
+def is_replica(db: Session) -> bool:
+    """
+    True for sessions on a read replica.
+    """
+    return db.info.get(_REPLICA_KEY, False)
+
+
+def tag_writer(db: Session, client_key: str) -> None:
+    """
+    Remember commits of `db` as writes by `client_key`.
+    """
+    db.info[_WRITER_KEY] = client_key
+
+
+def wrote_recently(client_key: str) -> bool:
+    """
+    True while `client_key`'s last write may not have reached the replicas.
+    """
+    return get_cache().get(RECENT_WRITES, client_key) is not MISS
+
+
+@event.listens_for(Session, "after_commit")
+def _note_write(session: Session) -> None:
+    client_key = session.info.get(_WRITER_KEY)
+    if client_key is not None and read_replicas.replicas:
+        get_cache().set(RECENT_WRITES, client_key, True, ttl=settings.READ_YOUR_WRITES_SECONDS)
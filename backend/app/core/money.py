@@ -0,0 +1,55 @@
+"""
+Money helpers: amounts are stored and summed as integer minor units (cents).
+
+Floats are only accepted at the API boundary and converted once with
+banker's rounding; everything the rate engine adds up is an exact integer,
+and values handed back out are `Decimal`s with two places.
+"""
+from decimal import ROUND_HALF_EVEN, Decimal
+from typing import Union
+
+from sqlalchemy import BigInteger
+from sqlalchemy.types import TypeDecorator
+
+# Minor units per major unit (two decimal places)
+MINOR_UNITS = 100
+
+_CENT = Decimal("0.01")
+
+
+def to_cents(value: Union[int, float, str, Decimal]) -> int:
+    """
+    Convert an amount to integer cents, rounding half to even.
+
+    Floats go through their shortest repr so 19.99 becomes 1999, not 1998.
+    """
+    if isinstance(value, float):
+        value = repr(value)
+    return int((Decimal(value) * MINOR_UNITS).quantize(Decimal(1), rounding=ROUND_HALF_EVEN))
+
+
+def from_cents(cents: int) -> Decimal:
+    """
+    Convert integer cents back to an exact two-place Decimal.
+    """
+    return (Decimal(cents) / MINOR_UNITS).quantize(_CENT)
+
+
+class Money(TypeDecorator):
+    """
+    Column type storing amounts as BIGINT cents and loading them as Decimal.
+
+    Use `type_coerce(column, BigInteger)` to read the raw cents in bulk queries.
+    """
+    impl = BigInteger
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return to_cents(value)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return from_cents(value)
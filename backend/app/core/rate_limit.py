@@ -0,0 +1,66 @@
+"""
+In-process rate limiting with per-key token buckets.
+
+Used to throttle login attempts per client IP and per username. Memory is
+bounded: once `max_keys` buckets exist, the least recently used are evicted
+(an evicted key simply starts again with a full bucket).
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Hashable, Tuple
+
+from app.core.config import settings
+
+
+class TokenBucketLimiter:
+    """
+    Token bucket per key: `capacity` requests in a burst, refilled at `rate` per second.
+    """
+
+    def __init__(self, rate: float, capacity: float, max_keys: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[Hashable, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def acquire(self, key: Hashable, cost: float = 1.0) -> Tuple[bool, float]:
+        """
+        Take `cost` tokens for `key`.
+
+        Returns (allowed, retry_after_seconds); retry_after is 0 when allowed.
+        """
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.pop(key, (self.capacity, now))
+            tokens = min(self.capacity, tokens + (now - updated_at) * self.rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        if allowed:
+            return True, 0.0
+        return False, (cost - tokens) / self.rate if self.rate > 0 else float("inf")
+
+    def reset(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+# Login throttles shared by all requests in this worker
+login_ip_limiter = TokenBucketLimiter(
+    rate=settings.LOGIN_IP_PER_MINUTE / 60,
+    capacity=settings.LOGIN_IP_BURST,
+    max_keys=settings.LOGIN_LIMITER_MAX_KEYS,
+)
+login_username_limiter = TokenBucketLimiter(
+    rate=settings.LOGIN_USERNAME_PER_MINUTE / 60,
+    capacity=settings.LOGIN_USERNAME_BURST,
+    max_keys=settings.LOGIN_LIMITER_MAX_KEYS,
+)
@@ -1,11 +1,65 @@
+import asyncio
+import hashlib
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Optional
-from passlib.context import CryptContext
-import jwt
+from functools import lru_cache
+from typing import Any, Callable, List, NamedTuple, Optional, Tuple
 from app.core import config
 
-# Password hashing context using pbkdf2_sha256 algorithm
-pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
+# passlib and PyJWT are imported on first use rather than at module import,
+# keeping them off the worker cold-start path (see scripts/profile_startup.py).
+
+
+# Settings name -> (passlib scheme, option) for the tunable hashing costs
+_PASSWORD_COST_OPTIONS = {
+    "PASSWORD_PBKDF2_ROUNDS": ("pbkdf2_sha256", "rounds"),
+    "PASSWORD_BCRYPT_ROUNDS": ("bcrypt", "rounds"),
+    "PASSWORD_ARGON2_TIME_COST": ("argon2", "rounds"),
+    "PASSWORD_ARGON2_MEMORY_COST_KIB": ("argon2", "memory_cost"),
+    "PASSWORD_ARGON2_PARALLELISM": ("argon2", "parallelism"),
+}
+
+
+@lru_cache(maxsize=4)
+def _build_pwd_context(schemes: Tuple[str, ...], costs: Tuple[Tuple[str, Optional[int]], ...]):
+    from passlib.context import CryptContext
+
+    options = {}
+    for setting, value in costs:
+        scheme, option = _PASSWORD_COST_OPTIONS[setting]
+        if value is None or scheme not in schemes:
+            continue
+        if option == "rounds":
+            # Pin rounds exactly so hashes made with any other cost get upgraded
+            options[f"{scheme}__default_rounds"] = value
+            options[f"{scheme}__min_rounds"] = value
+            options[f"{scheme}__max_rounds"] = value
+        else:
+            options[f"{scheme}__{option}"] = value
+    return CryptContext(schemes=list(schemes), deprecated="auto", **options)
+
+
+def get_pwd_context():
+    """
+    Password hashing context for the configured schemes and costs, built on first use.
+    
+    """
+    settings = config.settings
+    return _build_pwd_context(
+        tuple(settings.PASSWORD_SCHEMES),
+        tuple((name, getattr(settings, name)) for name in _PASSWORD_COST_OPTIONS),
+    )
+
+
+def __getattr__(name: str):
+    # Backwards-compatible access to the lazily built `pwd_context`
+    if name == "pwd_context":
+        return get_pwd_context()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -13,15 +67,204 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     Verify a plain text password against a hashed password.
     
     """
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
     """
-    Hash a password using pbkdf2_sha256.
+    Hash a password with the default (first) configured scheme.
     
     """
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
+
+
+@lru_cache(maxsize=4)
+def _dummy_password_hash(pwd_context) -> str:
+    return pwd_context.hash(secrets.token_urlsafe(16))
+
+
+def verify_and_update_password(
+    plain_password: str, hashed_password: Optional[str]
+) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password and return a replacement hash if the stored one is outdated.
+
+    Returns (verified, new_hash); new_hash is set when the hash uses a deprecated
+    scheme or cost and should be saved. A missing hash (unknown user) is checked
+    against a dummy hash so response time does not reveal which usernames exist.
+    """
+    pwd_context = get_pwd_context()
+    if hashed_password is None:
+        pwd_context.verify(plain_password, _dummy_password_hash(pwd_context))
+        return False, None
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+class HashingQueueFull(Exception):
+    """
+    Raised when the password hashing queue has no free slot.
+    """
+    pass
+
+
+class HashingQueue:
+    """
+    Bounded work queue for CPU-heavy password hashing.
+
+    At most `workers` hashes run at once and at most `max_pending` are running
+    or waiting; further submissions fail fast instead of piling up, so a burst
+    of login attempts cannot starve the rest of the API of CPU.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def submit(self, fn: Callable, *args) -> Future:
+        if not self._slots.acquire(blocking=False):
+            raise HashingQueueFull()
+        try:
+            return self._get_executor().submit(self._call, fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def _call(self, fn: Callable, *args):
+        # Free the slot before the future resolves so callers see it immediately
+        try:
+            return fn(*args)
+        finally:
+            self._slots.release()
+
+    async def run(self, fn: Callable, *args):
+        """
+        Run `fn(*args)` on the hashing pool without blocking the event loop.
+        """
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="password-hash")
+        return self._executor
+
+
+password_hash_queue = HashingQueue(
+    workers=config.settings.PASSWORD_HASH_WORKERS,
+    max_pending=config.settings.PASSWORD_HASH_QUEUE_SIZE,
+)
+
+
+class TokenCache:
+    """
+    Bounded LRU of verified token claims, keyed by a hash of the token.
+
+    Entries are only served until the token's `exp` claim, so a cached token
+    expires exactly when its signature check would start failing.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: "OrderedDict[bytes, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> Optional[dict]:
+        digest = hashlib.sha256(token.encode()).digest()
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                return None
+            expires_at, payload = entry
+            if expires_at <= time.time():
+                del self._entries[digest]
+                return None
+            self._entries.move_to_end(digest)
+            return payload
+
+    def put(self, token: str, payload: dict) -> None:
+        expires_at = payload.get("exp")
+        if not isinstance(expires_at, (int, float)) or self.max_size <= 0:
+            return
+        digest = hashlib.sha256(token.encode()).digest()
+        with self._lock:
+            self._entries[digest] = (expires_at, payload)
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class KeyMaterial(NamedTuple):
+    """
+    Parsed signing/verification keys for the configured algorithm.
+    """
+    algorithm: str
+    algorithms: List[str]
+    signing_key: Any
+    verification_key: Any
+    token_cache: TokenCache
+
+
+def _read_pem(value: str) -> str:
+    """
+    Accept PEM text directly or a path to a PEM file.
+    """
+    if value.lstrip().startswith("-----BEGIN"):
+        return value
+    with open(value) as pem_file:
+        return pem_file.read()
+
+
+@lru_cache(maxsize=4)
+def _load_key_material(
+    algorithm: str,
+    secret_key: str,
+    private_key: Optional[str],
+    public_key: Optional[str],
+    token_cache_size: int,
+) -> KeyMaterial:
+    import jwt
+
+    try:
+        implementation = jwt.get_algorithm_by_name(algorithm)
+    except NotImplementedError as exc:
+        raise RuntimeError(
+            f"JWT algorithm {algorithm} is unavailable; asymmetric algorithms need `pip install pyjwt[crypto]`"
+        ) from exc
+
+    if algorithm.startswith("HS"):
+        signing_key = verification_key = implementation.prepare_key(secret_key)
+    else:
+        signing_key = implementation.prepare_key(_read_pem(private_key)) if private_key else None
+        if public_key:
+            verification_key = implementation.prepare_key(_read_pem(public_key))
+        elif signing_key is not None:
+            verification_key = signing_key.public_key()
+        else:
+            raise RuntimeError(f"JWT_PUBLIC_KEY or JWT_PRIVATE_KEY must be set for {algorithm}")
+
+    # A fresh token cache per key set: rotating keys drops previously verified tokens
+    return KeyMaterial(algorithm, [algorithm], signing_key, verification_key, TokenCache(token_cache_size))
+
+
+def get_key_material() -> KeyMaterial:
+    """
+    Keys for the current settings, parsed once and reused across requests.
+    """
+    settings = config.settings
+    return _load_key_material(
+        settings.ALGORITHM,
+        settings.SECRET_KEY,
+        settings.JWT_PRIVATE_KEY,
+        settings.JWT_PUBLIC_KEY,
+        settings.TOKEN_CACHE_SIZE,
+    )
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -29,21 +272,38 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     Create a JWT access token.
     
     """
-    to_encode = data.copy()
-    
-    if expires_delta:
-        expire = datetime.now(timezone.utc) + expires_delta
-    else:
-        expire = datetime.now(timezone.utc) + timedelta(
-            minutes=config.settings.ACCESS_TOKEN_EXPIRE_MINUTES
-        )
+    import jwt
+
+    keys = get_key_material()
+    if keys.signing_key is None:
+        raise RuntimeError("JWT_PRIVATE_KEY must be set to issue tokens")
+
+    if expires_delta is None:
+        expires_delta = timedelta(minutes=config.settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     # Add expiration claim to the token
-    to_encode.update({"exp": expire})
+    to_encode = {**data, "exp": datetime.now(timezone.utc) + expires_delta}
     
     # Encode and return the JWT
-    encoded_jwt = jwt.encode(
-        to_encode, 
-        config.settings.SECRET_KEY, 
-        algorithm=config.settings.ALGORITHM
-    )
-    return encoded_jwt
+    return jwt.encode(to_encode, keys.signing_key, algorithm=keys.algorithm)
+
+
+def decode_access_token(token: str) -> Optional[dict]:
+    """
+    Verify a JWT access token and return its claims, or None if it is invalid.
+
+    Verified claims are cached until the token expires, so repeated requests
+    with the same token skip signature verification.
+    """
+    keys = get_key_material()
+    payload = keys.token_cache.get(token)
+    if payload is not None:
+        return payload
+
+    import jwt
+
+    try:
+        payload = jwt.decode(token, keys.verification_key, algorithms=keys.algorithms)
+    except jwt.PyJWTError:
+        return None
+    keys.token_cache.put(token, payload)
+    return payload
@@ -1,13 +1,33 @@
-from fastapi import FastAPI
+import math
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response
 from app.core.config import settings
 from app.api.v1.routers import api_router
+from app.api.middleware import IdempotencyMiddleware
+from app.services import cache_warmer, job_runner
+from app.services.idempotency import IdempotencyKeyInUse, IdempotencyKeyReused, IdempotentReplay
+from app.services.sharding import CrossShardWrite, ShardingUnsupported, ShardMoving
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Serve the first requests from a warm cache (see app.services.cache_warmup)
+    cache_warmer.start(settings.CACHE_SNAPSHOT_PATH)
+    # Background job workers run alongside the API in every worker process
+    job_runner.start()
+    yield
+    job_runner.shutdown(timeout=settings.GRACEFUL_TIMEOUT_SECONDS)
+    cache_warmer.stop(settings.CACHE_SNAPSHOT_PATH)
+
 
 # Initialize FastAPI application
 app = FastAPI(
     title="Basic Hotel Platform",
     description="Internal hotel admin tool for managing hotels, room types, and rate adjustments",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
 # Configure CORS for frontend access
@@ -20,4 +40,49 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_headers=["*"],  
     )
 
+# Stores responses of create requests sent with an Idempotency-Key header
+app.add_middleware(IdempotencyMiddleware)
+
+
+@app.exception_handler(ShardMoving)
+async def shard_moving_handler(request: Request, exc: ShardMoving):
+    # The hotel is writable again once its bucket has moved
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(max(1, math.ceil(settings.SHARD_MAP_TTL_SECONDS)))},
+    )
+
+
+@app.exception_handler(CrossShardWrite)
+async def cross_shard_write_handler(request: Request, exc: CrossShardWrite):
+    return JSONResponse(status_code=status.HTTP_409_CONFLICT, content={"detail": str(exc)})
+
+
+@app.exception_handler(ShardingUnsupported)
+async def sharding_unsupported_handler(request: Request, exc: ShardingUnsupported):
+    return JSONResponse(status_code=status.HTTP_501_NOT_IMPLEMENTED, content={"detail": str(exc)})
+
+
+@app.exception_handler(IdempotentReplay)
+async def idempotent_replay_handler(request: Request, exc: IdempotentReplay):
+    # A retried create request: answer with the first attempt's response
+    return Response(
+        content=exc.response.body,
+        status_code=exc.response.status_code,
+        media_type=exc.response.content_type,
+        headers={"Idempotent-Replayed": "true"},
+    )
+
+
+@app.exception_handler(IdempotencyKeyInUse)
+async def idempotency_key_in_use_handler(request: Request, exc: IdempotencyKeyInUse):
+    return JSONResponse(status_code=status.HTTP_409_CONFLICT, content={"detail": str(exc)}, headers={"Retry-After": "1"})
+
+
+@app.exception_handler(IdempotencyKeyReused)
+async def idempotency_key_reused_handler(request: Request, exc: IdempotencyKeyReused):
+    return JSONResponse(status_code=422, content={"detail": str(exc)})
+
+
 app.include_router(api_router)
@@ -6,3 +6,8 @@ This package exports all SQLAlchemy ORM models for database tables.
 from .base import Base
 from .user import User
 from .hotel import Hotel, RoomType, RateAdjustment
+from .change_log import ChangeLog
+from .job import Job
+from .rate_calendar import RateCalendar
+from .shard import ShardBucket, IdSequence
+from .idempotency import IdempotencyKey
@@ -0,0 +1,43 @@
+"""
+This module defines the append-only change log of hotel, room type and rate adjustment writes.
+
+Each row is a snapshot of one record right after a create or update (right
+before a remove), stamped with the transaction time. Rows are never updated
+or deleted, so the state of any record at a past moment is the latest
+snapshot recorded at or before it, and the row id is a monotonic change
+sequence, visible in commit order (see app.services.history), that feed
+consumers use as their cursor.
+"""
+from sqlalchemy import Column, Integer, String, Boolean, Date, DateTime, Index
+from app.core.database import Base
+from app.core.money import Money
+
+
+class ChangeLog(Base):
+    __tablename__ = "change_log"
+
+    id = Column(Integer, primary_key=True)
+    entity = Column(String, nullable=False)  # "hotel", "room_type" or "rate_adjustment"
+    entity_id = Column(Integer, nullable=False)
+    action = Column(String, nullable=False)  # "create", "update" or "remove"
+    recorded_at = Column(DateTime, nullable=False)  # transaction time, naive UTC
+
+    # Snapshot columns; only those of the logged entity are set
+    hotel_id = Column(Integer)
+    room_type_id = Column(Integer)
+    name = Column(String)
+    location = Column(String)
+    is_active = Column(Boolean)
+    base_rate = Column("base_rate_cents", Money)
+    adjustment_amount = Column("adjustment_amount_cents", Money)
+    effective_date = Column(Date)
+    end_date = Column(Date)
+    priority = Column(Integer)
+    reason = Column(String)
+
+    __table_args__ = (
+        # Latest snapshot of a record as of a time
+        Index("ix_change_log_entity_entity_id_recorded_at", "entity", "entity_id", "recorded_at"),
+        # Adjustments that belonged to a room type as of a time
+        Index("ix_change_log_entity_room_type_id_recorded_at", "entity", "room_type_id", "recorded_at"),
+    )
@@ -2,11 +2,12 @@
 This module defines the core domain models:
 - Hotel: Represents a hotel property
 - RoomType: Represents a room type within a hotel
-- RateAdjustment: Represents date-specific rate adjustments for room types
+- RateAdjustment: Represents date-specific or date-range rate adjustments for room types
 """
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, Float, Date
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, Date, Index, CheckConstraint, DDL, event
 from sqlalchemy.orm import relationship
 from app.core.database import Base
+from app.core.money import Money
 
 
 class Hotel(Base):
@@ -20,14 +21,46 @@ class Hotel(Base):
     # Relationship: one hotel has many room types
     room_types = relationship("RoomType", back_populates="hotel")
 
+    # Covers location searches restricted to active hotels
+    __table_args__ = (
+        Index("ix_hotels_location_is_active", "location", "is_active"),
+    )
+
+
+# Name/location search index, created alongside the hotels table.
+# SQLite uses an FTS5 table (rowid = hotel id) that CRUDHotel keeps in sync;
+# PostgreSQL uses trigram indexes maintained by the database itself.
+HOTEL_SEARCH_TABLE = "hotel_search"
+
+event.listen(
+    Hotel.__table__,
+    "after_create",
+    DDL(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {HOTEL_SEARCH_TABLE} "
+        "USING fts5(name, location, tokenize='unicode61 remove_diacritics 2')"
+    ).execute_if(dialect="sqlite"),
+)
+event.listen(
+    Hotel.__table__,
+    "before_drop",
+    DDL(f"DROP TABLE IF EXISTS {HOTEL_SEARCH_TABLE}").execute_if(dialect="sqlite"),
+)
+for _ddl in (
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_hotels_name_trgm ON hotels USING gin (name gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_hotels_location_trgm ON hotels USING gin (location gin_trgm_ops)",
+):
+    event.listen(Hotel.__table__, "after_create", DDL(_ddl).execute_if(dialect="postgresql"))
+
 
 class RoomType(Base):
     __tablename__ = "room_types"
 
     id = Column(Integer, primary_key=True, index=True)
-    hotel_id = Column(Integer, ForeignKey("hotels.id"), nullable=False)
+    hotel_id = Column(Integer, ForeignKey("hotels.id"), nullable=False, index=True)
     name = Column(String, nullable=False)  
-    base_rate = Column(Float, nullable=False) 
+    # Money columns hold integer cents (see app.core.money)
+    base_rate = Column("base_rate_cents", Money, nullable=False)
 
     # Relationships
     hotel = relationship("Hotel", back_populates="room_types")
@@ -39,9 +72,19 @@ class RateAdjustment(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     room_type_id = Column(Integer, ForeignKey("room_types.id"), nullable=False)
-    adjustment_amount = Column(Float, nullable=False)
+    adjustment_amount = Column("adjustment_amount_cents", Money, nullable=False)
     effective_date = Column(Date, nullable=False)
+    # Last date the adjustment applies (inclusive); NULL means open-ended
+    end_date = Column(Date, nullable=True)
+    # Among adjustments covering a date, the highest priority wins
+    priority = Column(Integer, nullable=False, default=0, server_default="0")
     reason = Column(String, nullable=False) 
 
     # Relationship: each adjustment belongs to one room type
     room_type = relationship("RoomType", back_populates="adjustments")
+
+    # Covers "adjustments for room type X on or before date D" lookups
+    __table_args__ = (
+        Index("ix_rate_adjustments_room_type_id_effective_date", "room_type_id", "effective_date"),
+        CheckConstraint("end_date IS NULL OR end_date >= effective_date", name="ck_rate_adjustments_date_range"),
+    )
@@ -0,0 +1,31 @@
+"""
+This module defines the idempotency key store (see app.services.idempotency).
+
+Each row remembers the response to a create request sent with an
+Idempotency-Key header, so a retried request gets the same response instead
+of writing again. A row without a status code is a request still running.
+"""
+from sqlalchemy import Column, Integer, String, DateTime, LargeBinary, Index
+from app.core.database import Base
+
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+
+    # Keys are chosen by clients, so they are scoped to the user sending them
+    user_id = Column(Integer, primary_key=True, autoincrement=False)
+    key = Column(String, primary_key=True)
+    fingerprint = Column(String, nullable=False)  # hash of method, path, query and body
+
+    status_code = Column(Integer)  # NULL while the request runs
+    content_type = Column(String)
+    body = Column(LargeBinary)
+
+    # Naive UTC
+    created_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        # The sweeper deletes expired keys
+        Index("ix_idempotency_keys_expires_at", "expires_at"),
+    )
@@ -0,0 +1,38 @@
+"""
+This module defines background jobs: long-running rate work queued by the API
+and executed by the job runner's worker threads (see app.services.jobs).
+
+The table is the queue: workers claim the oldest queued row, record progress
+and a resumable checkpoint with every chunk they commit, and store the result
+on the row when done.
+"""
+from sqlalchemy import Column, Integer, String, DateTime, JSON, Index
+from app.core.database import Base
+
+
+class Job(Base):
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True)
+    kind = Column(String, nullable=False)  # registered handler, e.g. "rate_calendar"
+    status = Column(String, nullable=False, default="queued")  # queued, running, succeeded, failed
+    params = Column(JSON, nullable=False)
+    created_by = Column(Integer)  # id of the submitting user
+
+    progress = Column(Integer, nullable=False, default=0)  # work items done
+    total = Column(Integer)  # work items overall, once known
+    checkpoint = Column(JSON)  # handler state committed with the last chunk
+    attempts = Column(Integer, nullable=False, default=0)  # also identifies the current claim
+    result = Column(JSON)
+    error = Column(String)
+
+    # Naive UTC; heartbeat_at advances with every committed chunk and while the job runs
+    created_at = Column(DateTime, nullable=False)
+    started_at = Column(DateTime)
+    heartbeat_at = Column(DateTime)
+    finished_at = Column(DateTime)
+
+    __table_args__ = (
+        # Workers claim the oldest queued job and look for stalled running ones
+        Index("ix_jobs_status_id", "status", "id"),
+    )
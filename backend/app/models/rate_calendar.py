@@ -0,0 +1,25 @@
+"""
+This module defines the materialised rate calendar: the effective rate of
+every room type for each date of a window, as computed by a calendar build
+(see app.services.rate_calendar).
+
+The table is a snapshot taken at `built_at`; later writes to room types or
+adjustments are not reflected until the next build.
+"""
+from sqlalchemy import Column, Integer, Date, DateTime, PrimaryKeyConstraint
+from app.core.database import Base
+from app.core.money import Money
+
+
+class RateCalendar(Base):
+    __tablename__ = "rate_calendar"
+
+    room_type_id = Column(Integer, nullable=False)
+    rate_date = Column(Date, nullable=False)
+    effective_rate = Column("effective_rate_cents", Money, nullable=False)
+    built_at = Column(DateTime, nullable=False)  # naive UTC
+
+    # Rows are clustered by room type; no secondary indexes to keep rebuilds fast
+    __table_args__ = (
+        PrimaryKeyConstraint("room_type_id", "rate_date"),
+    )
@@ -0,0 +1,27 @@
+"""
+This module defines the shard directory kept on the primary database (see
+app.services.sharding):
+
+- ShardBucket: which shard owns each bucket of hotels (hotel_id % SHARD_BUCKETS).
+  Buckets without a row belong to shard 0.
+- IdSequence: the next free id of each sharded table, so ids are unique
+  across shards.
+"""
+from sqlalchemy import Column, Integer, String, Boolean
+from app.core.database import Base
+
+
+class ShardBucket(Base):
+    __tablename__ = "shard_buckets"
+
+    bucket = Column(Integer, primary_key=True, autoincrement=False)
+    shard = Column(Integer, nullable=False)
+    # Writes to the bucket's hotels are refused while it is copied to another shard
+    moving = Column(Boolean, nullable=False, default=False, server_default="0")
+
+
+class IdSequence(Base):
+    __tablename__ = "id_sequences"
+
+    name = Column(String, primary_key=True)  # table name
+    next_id = Column(Integer, nullable=False)
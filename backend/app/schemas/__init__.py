@@ -13,3 +13,22 @@ from .room import (
     RateAdjustmentUpdate,
     RateAdjustment,
 )
+from .rate import (
+    StayQuoteRequest,
+    NightlyRate,
+    RoomTypeQuote,
+    StayQuote,
+    EffectiveRateQuery,
+    EffectiveRateBatchRequest,
+    EffectiveRateResult,
+    EffectiveRateBatch,
+    HotelLowestRate,
+)
+from .batch import (
+    BatchOperation,
+    BatchRequest,
+    BatchResult,
+    BatchResponse,
+)
+from .change import ChangeEntry, ChangeFeed
+from .job import JobCreate, Job
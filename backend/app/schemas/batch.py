@@ -0,0 +1,89 @@
+"""
+Unit-of-work batch schemas: many create/update/delete operations applied together.
+"""
+from typing import Any, Dict, List, Literal, Optional
+from pydantic import BaseModel, Field, PrivateAttr, ValidationError, model_validator
+from app.schemas.hotel import HotelCreate, HotelUpdate
+from app.schemas.room import RateAdjustmentCreate, RateAdjustmentUpdate, RoomTypeCreate, RoomTypeUpdate
+
+# Upper bound on operations per batch, keeping one transaction reasonably short
+MAX_BATCH_OPERATIONS = 1000
+
+BatchEntity = Literal["hotel", "room_type", "rate_adjustment"]
+BatchAction = Literal["create", "update", "delete"]
+
+_PAYLOAD_SCHEMAS = {
+    ("hotel", "create"): HotelCreate,
+    ("hotel", "update"): HotelUpdate,
+    ("room_type", "create"): RoomTypeCreate,
+    ("room_type", "update"): RoomTypeUpdate,
+    ("rate_adjustment", "create"): RateAdjustmentCreate,
+    ("rate_adjustment", "update"): RateAdjustmentUpdate,
+}
+
+
+class BatchOperation(BaseModel):
+    """
+    One operation of a batch.
+
+    `data` is validated against the entity's create or update schema; `id` is
+    required for update and delete and must be omitted for create.
+    """
+    op: BatchAction
+    entity: BatchEntity
+    id: Optional[int] = Field(None, description="Record to update or delete")
+    data: Optional[Dict[str, Any]] = Field(None, description="Fields to create or update")
+
+    _values: Dict[str, Any] = PrivateAttr(default_factory=dict)
+
+    @model_validator(mode="after")
+    def check_payload(self):
+        if self.op == "create" and self.id is not None:
+            raise ValueError("id must not be set when creating")
+        if self.op != "create" and self.id is None:
+            raise ValueError(f"id is required to {self.op}")
+        if self.op == "delete":
+            if self.data is not None:
+                raise ValueError("data must not be set when deleting")
+            return self
+        schema = _PAYLOAD_SCHEMAS[(self.entity, self.op)]
+        try:
+            payload = schema.model_validate(self.data or {})
+        except ValidationError as exc:
+            details = "; ".join(
+                f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in exc.errors()
+            )
+            raise ValueError(f"invalid data: {details}")
+        self._values = payload.model_dump(exclude_unset=self.op == "update")
+        return self
+
+    @property
+    def values(self) -> Dict[str, Any]:
+        """
+        Validated column values (only the fields provided, for updates).
+        """
+        return self._values
+
+
+class BatchRequest(BaseModel):
+    """
+    Operations to apply in a single transaction.
+    """
+    operations: List[BatchOperation] = Field(..., min_length=1, max_length=MAX_BATCH_OPERATIONS)
+
+
+class BatchResult(BaseModel):
+    """
+    Outcome of one operation, in request order.
+    """
+    index: int
+    op: BatchAction
+    entity: BatchEntity
+    id: int
+
+
+class BatchResponse(BaseModel):
+    """
+    Results of an applied batch.
+    """
+    results: List[BatchResult]
@@ -0,0 +1,47 @@
+"""
+Change feed schemas for incremental sync.
+"""
+from pydantic import BaseModel, ConfigDict, Field
+from datetime import date, datetime
+from typing import List, Literal, Optional
+
+
+class ChangeEntry(BaseModel):
+    """
+    One logged write with a snapshot of the record.
+
+    Only the snapshot fields of the entity are set; for removals the snapshot
+    is the record's last state.
+    """
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int = Field(..., description="Change sequence number")
+    entity: Literal["hotel", "room_type", "rate_adjustment"]
+    entity_id: int
+    action: Literal["create", "update", "remove"]
+    recorded_at: datetime
+    name: Optional[str] = None
+    location: Optional[str] = None
+    is_active: Optional[bool] = None
+    hotel_id: Optional[int] = None
+    room_type_id: Optional[int] = None
+    base_rate: Optional[float] = None
+    adjustment_amount: Optional[float] = None
+    effective_date: Optional[date] = None
+    end_date: Optional[date] = None
+    priority: Optional[int] = None
+    reason: Optional[str] = None
+
+
+class ChangeFeed(BaseModel):
+    """
+    A page of the change feed; pass `next_cursor` as `since` to continue.
+
+    Changes are returned in sequence order, and a change never commits with a
+    sequence number at or below one already served, so following
+    `next_cursor` sees every change exactly once.
+    """
+    changes: List[ChangeEntry]
+    next_cursor: int = Field(
+        ..., description="Sequence number of the last change returned; no change at or below it can appear later"
+    )
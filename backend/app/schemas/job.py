@@ -0,0 +1,116 @@
+"""
+Background job schemas: submitting long-running rate work and following it.
+"""
+from datetime import date, datetime
+from typing import Any, Dict, List, Literal, Optional
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr, ValidationError, model_validator
+from app.core.config import settings
+from app.schemas.room import _check_date_range
+
+# Longest date range a calendar job may cover
+MAX_CALENDAR_DAYS = 731
+
+JobKind = Literal["rate_calendar", "bulk_rate_adjustment", "portfolio_rate_calendar"]
+JobStatus = Literal["queued", "running", "succeeded", "failed"]
+
+
+class RateCalendarParams(BaseModel):
+    """
+    Effective rates of every room type of the selected hotels, for each date
+    from start_date to end_date inclusive.
+    """
+    hotel_ids: Optional[List[int]] = Field(None, min_length=1, description="Hotels to include, all active hotels if omitted")
+    start_date: date
+    end_date: date
+
+    @model_validator(mode="after")
+    def check_date_range(self):
+        _check_date_range(self.start_date, self.end_date)
+        if (self.end_date - self.start_date).days >= MAX_CALENDAR_DAYS:
+            raise ValueError(f"a calendar covers at most {MAX_CALENDAR_DAYS} days")
+        return self
+
+
+class BulkRateAdjustmentParams(BaseModel):
+    """
+    One new rate adjustment for each selected room type.
+    """
+    hotel_ids: Optional[List[int]] = Field(None, min_length=1, description="Adjust every room type of these hotels")
+    room_type_ids: Optional[List[int]] = Field(None, min_length=1, description="Adjust these room types")
+    adjustment_amount: float
+    effective_date: date
+    end_date: Optional[date] = None
+    priority: int = 0
+    reason: str = Field(..., min_length=1)
+
+    @model_validator(mode="after")
+    def check_targets(self):
+        if self.hotel_ids is None and self.room_type_ids is None:
+            raise ValueError("hotel_ids or room_type_ids is required")
+        _check_date_range(self.effective_date, self.end_date)
+        return self
+
+
+class PortfolioRateCalendarParams(BaseModel):
+    """
+    Rebuild of the stored rate calendar for every room type, from start_date
+    for `days` dates, across `workers` processes.
+    """
+    start_date: date = Field(default_factory=date.today)
+    days: int = Field(default_factory=lambda: settings.RATE_CALENDAR_DAYS, ge=1, le=MAX_CALENDAR_DAYS)
+    workers: Optional[int] = Field(None, ge=1, description="Worker processes, RATE_CALENDAR_WORKERS if omitted")
+
+
+PARAM_SCHEMAS = {
+    "rate_calendar": RateCalendarParams,
+    "bulk_rate_adjustment": BulkRateAdjustmentParams,
+    "portfolio_rate_calendar": PortfolioRateCalendarParams,
+}
+
+
+class JobCreate(BaseModel):
+    """
+    A job to queue; `params` is validated against the kind's parameter schema.
+    """
+    kind: JobKind
+    params: Dict[str, Any] = Field(default_factory=dict)
+
+    _values: Dict[str, Any] = PrivateAttr(default_factory=dict)
+
+    @model_validator(mode="after")
+    def check_params(self):
+        try:
+            payload = PARAM_SCHEMAS[self.kind].model_validate(self.params)
+        except ValidationError as exc:
+            details = "; ".join(
+                f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in exc.errors()
+            )
+            raise ValueError(f"invalid params: {details}")
+        self._values = payload.model_dump(mode="json")
+        return self
+
+    @property
+    def values(self) -> Dict[str, Any]:
+        """
+        Validated parameters in their JSON form, as stored on the job.
+        """
+        return self._values
+
+
+class Job(BaseModel):
+    """
+    Job status for API responses; the result is fetched separately.
+    """
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    kind: JobKind
+    status: JobStatus
+    params: Dict[str, Any]
+    progress: int = Field(..., description="Work items done")
+    total: Optional[int] = Field(None, description="Work items overall, once known")
+    attempts: int
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
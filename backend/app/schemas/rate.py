@@ -0,0 +1,107 @@
+"""
+Rate calculation schemas for request/response validation.
+"""
+from pydantic import BaseModel, Field, model_validator
+from datetime import date, datetime
+from typing import List, Optional
+
+# Longest stay that can be quoted in a single request
+MAX_STAY_NIGHTS = 365
+
+# Largest number of (room type, date) pairs accepted by the batch endpoint
+MAX_BATCH_ITEMS = 10000
+
+
+class StayQuoteRequest(BaseModel):
+    """
+    Schema for requesting the price of a stay for one or more room types.
+    """
+    room_type_ids: List[int] = Field(..., min_length=1, max_length=200, description="Room types to quote")
+    check_in: date = Field(..., description="First night of the stay")
+    check_out: date = Field(..., description="Departure date (not charged)")
+
+    @model_validator(mode="after")
+    def check_stay_length(self):
+        nights = (self.check_out - self.check_in).days
+        if nights < 1:
+            raise ValueError("check_out must be after check_in")
+        if nights > MAX_STAY_NIGHTS:
+            raise ValueError(f"Stays longer than {MAX_STAY_NIGHTS} nights cannot be quoted")
+        return self
+
+
+class NightlyRate(BaseModel):
+    """
+    Effective rate for a single night of a stay.
+    """
+    date: date
+    effective_rate: float
+    adjustment_applied: float
+
+
+class RoomTypeQuote(BaseModel):
+    """
+    Stay total and nightly breakdown for one room type.
+    """
+    room_type_id: int
+    base_rate: float
+    total: float
+    nightly_rates: List[NightlyRate]
+
+
+class StayQuote(BaseModel):
+    """
+    Stay quote response covering every requested room type.
+    """
+    check_in: date
+    check_out: date
+    nights: int
+    quotes: List[RoomTypeQuote]
+
+
+class EffectiveRateQuery(BaseModel):
+    """
+    A single (room type, date) pair in a batch lookup.
+    """
+    room_type_id: int
+    date: date
+
+
+class EffectiveRateBatchRequest(BaseModel):
+    """
+    Schema for resolving many effective rates in one request.
+    """
+    items: List[EffectiveRateQuery] = Field(..., min_length=1, max_length=MAX_BATCH_ITEMS)
+    as_of: Optional[datetime] = Field(None, description="Resolve rates as they stood at this time (UTC if no offset)")
+
+
+class EffectiveRateResult(BaseModel):
+    """
+    Effective rate for one batch item.
+
+    Rate fields are null and `found` is false when the room type does not exist.
+    """
+    room_type_id: int
+    effective_date: date
+    found: bool
+    base_rate: Optional[float] = None
+    effective_rate: Optional[float] = None
+    adjustment_applied: Optional[float] = None
+
+
+class EffectiveRateBatch(BaseModel):
+    """
+    Batch lookup response, in the same order as the request items.
+    """
+    results: List[EffectiveRateResult]
+
+
+class HotelLowestRate(BaseModel):
+    """
+    Cheapest effective rate offered by a hotel on a given date.
+    """
+    hotel_id: int
+    name: str
+    location: str
+    lowest_rate: float
+    room_type_count: int
@@ -1,7 +1,7 @@
 """
 Room type and rate adjustment schemas for request/response validation.
 """
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
 from datetime import date
 from typing import Optional
 
@@ -40,6 +40,11 @@ class RoomType(RoomTypeBase):
     id: int
 
 
+def _check_date_range(effective_date: Optional[date], end_date: Optional[date]) -> None:
+    if effective_date is not None and end_date is not None and end_date < effective_date:
+        raise ValueError("end_date must be on or after effective_date")
+
+
 class RateAdjustmentBase(BaseModel):
     """
     Base rate adjustment schema with validation.
@@ -47,8 +52,15 @@ class RateAdjustmentBase(BaseModel):
     room_type_id: int = Field(..., description="ID of the room type")
     adjustment_amount: float = Field(..., description="Amount to adjust (positive or negative)")
     effective_date: date = Field(..., description="Date when this adjustment takes effect")
+    end_date: Optional[date] = Field(None, description="Last date the adjustment applies (inclusive), open-ended if omitted")
+    priority: int = Field(0, description="Higher priority wins where adjustments overlap")
     reason: str = Field(..., min_length=1, description="Business reason for the adjustment")
 
+    @model_validator(mode="after")
+    def check_date_range(self):
+        _check_date_range(self.effective_date, self.end_date)
+        return self
+
 
 class RateAdjustmentCreate(RateAdjustmentBase):
     """
@@ -60,12 +72,28 @@ class RateAdjustmentCreate(RateAdjustmentBase):
 class RateAdjustmentUpdate(BaseModel):
     """
     Schema for updating rate adjustment information.
+
+    Fields left out are kept; only end_date can be cleared with null.
     """
     room_type_id: Optional[int] = None
     adjustment_amount: Optional[float] = None
     effective_date: Optional[date] = None
+    end_date: Optional[date] = None
+    priority: Optional[int] = None
     reason: Optional[str] = Field(None, min_length=1)
 
+    @field_validator("room_type_id", "adjustment_amount", "effective_date", "priority", "reason")
+    @classmethod
+    def reject_null(cls, value):
+        if value is None:
+            raise ValueError("may be omitted, but not null")
+        return value
+
+    @model_validator(mode="after")
+    def check_date_range(self):
+        _check_date_range(self.effective_date, self.end_date)
+        return self
+
 
 class RateAdjustment(RateAdjustmentBase):
     """
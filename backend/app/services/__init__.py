@@ -4,3 +4,11 @@ Services package for business logic and database operations.
 from .user_service import user
 from .hotel_service import hotel, room_type, rate_adjustment
 from .rate_service import rate_service
+from .batch_service import batch_service
+from .rate_stream import hub as rate_stream_hub
+from .jobs import job_runner
+from .catalog import catalog
+from .cache_warmup import cache_warmer
+from .idempotency import idempotency_store
+from . import rate_jobs  # registers the rate job handlers
+from . import history, invalidation, columnar_export
@@ -4,10 +4,16 @@ Base CRUD service for generic database operations.
 This module provides a generic CRUD (Create, Read, Update, Delete) base class
 that can be inherited by specific model services.
 """
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
+from contextlib import nullcontext
+from itertools import chain
+from operator import attrgetter, itemgetter
+from typing import Any, ContextManager, Dict, Generic, List, Optional, Type, TypeVar, Union
+from sqlalchemy import inspect, select
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from app.models.base import Base
+from app.services import history
+from app.services.sharding import CrossShardWrite, shards
 
 # Type variables for generic CRUD operations
 ModelType = TypeVar("ModelType", bound=Base)
@@ -16,35 +22,94 @@ UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
 
 class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
+
+    # Change log entity name; writes of models that set it are logged
+    # (see app.services.history) and appear in the change feed
+    change_entity: Optional[str] = None
+
+    # Records of sharded models live on the shard of their hotel when
+    # sharding is enabled (see app.services.sharding); `_hotel_id` finds it
+    sharded: bool = False
+
+    # Attributes left out of the plain-dict reads (`get_values`, ...), e.g. secrets
+    private_columns: tuple = ()
     
     def __init__(self, model: Type[ModelType]):
         """
         Initialize CRUD object with a specific model.
         """
         self.model = model
+        # Mapped columns labelled with their attribute names, for Core selects
+        self.value_columns = [
+            attribute.columns[0].label(attribute.key)
+            for attribute in inspect(model).column_attrs
+            if attribute.key not in self.private_columns
+        ]
 
     def get(self, db: Session, id: Any) -> Optional[ModelType]:
         """
         Retrieve a single record by ID.
         """
-        return db.query(self.model).filter(self.model.id == id).first()
+        with self._record_session(db, id) as db:
+            if db is None:
+                return None
+            return db.query(self.model).filter(self.model.id == id).first()
 
     def get_multi(self, db: Session, skip: int = 0, limit: int = 100) -> List[ModelType]:
         """
         Retrieve multiple records with pagination.
         """
+        if self.sharded and shards.enabled:
+            # The first skip + limit records of each shard, merged by id
+            pages = shards.scatter(
+                db, lambda shard_db: shard_db.query(self.model).order_by(self.model.id).limit(skip + limit).all()
+            )
+            return sorted(chain.from_iterable(pages), key=attrgetter("id"))[skip:skip + limit]
         return db.query(self.model).offset(skip).limit(limit).all()
 
+    def get_values(self, db: Session, id: Any) -> Optional[Dict[str, Any]]:
+        """
+        Retrieve a single record as a dict of its columns.
+
+        A Core select: no ORM instance, identity map entry or change tracking
+        is set up for a record that is only going to be serialized.
+        """
+        with self._record_session(db, id) as db:
+            if db is None:
+                return None
+            row = db.execute(select(*self.value_columns).where(self.model.id == id)).mappings().first()
+            return None if row is None else dict(row)
+
+    def get_multi_values(self, db: Session, skip: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
+        """
+        Retrieve multiple records with pagination, as dicts of their columns.
+        """
+        if self.sharded and shards.enabled:
+            statement = select(*self.value_columns).order_by(self.model.id).limit(skip + limit)
+            pages = shards.scatter(db, lambda shard_db: self._values(shard_db, statement))
+            return sorted(chain.from_iterable(pages), key=itemgetter("id"))[skip:skip + limit]
+        return self._values(db, select(*self.value_columns).offset(skip).limit(limit))
+
+    @staticmethod
+    def _values(db: Session, statement) -> List[Dict[str, Any]]:
+        result = db.execute(statement)
+        keys = tuple(result.keys())
+        return [dict(zip(keys, row)) for row in result]
+
     def create(self, db: Session, obj_in: CreateSchemaType) -> ModelType:
         """
         Create a new record.
         """
         obj_in_data = obj_in.model_dump()
-        db_obj = self.model(**obj_in_data)
-        db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
-        return db_obj
+        with self._new_record_session(db, obj_in_data) as db:
+            db_obj = self.model(**obj_in_data)
+            db.add(db_obj)
+            db.flush()
+            self._after_write(db, "create", db_obj)
+            self._record_change(db, "create", db_obj)
+            db.commit()
+            db.refresh(db_obj)
+            return db_obj
 
     def update(
         self,
@@ -59,23 +124,87 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         if isinstance(obj_in, BaseModel):
             update_data = obj_in.model_dump(exclude_unset=True)
         
-        # Update only provided fields
-        for field in update_data:
-            if hasattr(db_obj, field):
-                setattr(db_obj, field, update_data[field])
-        
-        db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
-        return db_obj
+        with self._record_session(db, db_obj.id, values=update_data) as db:
+            if db is None:
+                raise CrossShardWrite(f"{self.model.__name__} {db_obj.id} no longer exists")
+            if db_obj not in db:
+                # Loaded from a shard session that has since closed
+                db_obj = db.merge(db_obj)
+
+            # Update only provided fields
+            for field in update_data:
+                if hasattr(db_obj, field):
+                    setattr(db_obj, field, update_data[field])
+            
+            db.add(db_obj)
+            db.flush()
+            self._after_write(db, "update", db_obj)
+            self._record_change(db, "update", db_obj)
+            db.commit()
+            db.refresh(db_obj)
+            return db_obj
 
     def remove(self, db: Session, id: Any) -> Optional[ModelType]:
         """
         Delete a record by ID.
         """
-        obj = db.query(self.model).filter(self.model.id == id).first()
-        if not obj:
-            return None
-        db.delete(obj)
-        db.commit()
-        return obj
+        with self._record_session(db, id, values={}) as db:
+            if db is None:
+                return None
+            obj = db.query(self.model).filter(self.model.id == id).first()
+            if not obj:
+                return None
+            db.delete(obj)
+            db.flush()
+            self._after_write(db, "remove", obj)
+            self._record_change(db, "remove", obj)
+            db.commit()
+            return obj
+
+    def _hotel_id(self, values: Dict[str, Any]) -> Optional[int]:
+        """
+        Hotel that `values` place a record of a sharded model in, None if they do not say.
+        """
+        raise NotImplementedError
+
+    def _record_session(
+        self, db: Session, id: Any, values: Optional[Dict[str, Any]] = None
+    ) -> ContextManager[Optional[Session]]:
+        """
+        Session holding record `id`: its hotel's shard, or `db` itself.
+
+        Passing the written `values` (even empty) marks a write; a write may
+        not move the record to a hotel on another shard.
+        """
+        if not (self.sharded and shards.enabled):
+            return nullcontext(db)
+        return shards.record_session(
+            db, self.model, id, write=values is not None, moved_to=self._hotel_id(values) if values else None
+        )
+
+    def _new_record_session(self, db: Session, values: Dict[str, Any]) -> ContextManager[Session]:
+        """
+        Session to create a record from `values` in; assigns its id when sharded.
+        """
+        if not (self.sharded and shards.enabled):
+            return nullcontext(db)
+        values["id"] = shards.allocate_id(self.model)
+        hotel_id = self._hotel_id(values)
+        if hotel_id is None:
+            raise CrossShardWrite(f"No shard holds the parent of the new {self.model.__name__}")
+        return shards.session(db, hotel_id, write=True)
+
+    def _after_write(self, db: Session, action: str, db_obj: ModelType) -> None:
+        """
+        Hook run after a create/update/remove is flushed, before it is committed.
+
+        Subclasses override it to keep derived data in the same transaction.
+        """
+        pass
+
+    def _record_change(self, db: Session, action: str, db_obj: ModelType) -> None:
+        """
+        Append the written record's snapshot to the change log.
+        """
+        if self.change_entity is not None:
+            history.record(db, [history.entry(self.change_entity, action, db_obj.id, db_obj)])
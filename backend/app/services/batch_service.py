@@ -0,0 +1,231 @@
+"""
+Unit-of-work service applying batches of hotel, room type and rate adjustment writes.
+
+Instead of a lookup, existence check, write and commit per record, a batch is
+validated with one query per table and applied with one executemany statement
+per table and operation, all in a single transaction.
+"""
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.models.hotel import Hotel, RoomType, RateAdjustment
+from app.schemas.batch import BatchOperation
+from app.services import history, invalidation
+from app.services.hotel_service import hotel
+from app.services.sharding import shards
+
+MODELS = {"hotel": Hotel, "room_type": RoomType, "rate_adjustment": RateAdjustment}
+
+NOT_FOUND = {
+    "hotel": "Hotel not found",
+    "room_type": "Room Type not found",
+    "rate_adjustment": "Rate Adjustment not found",
+}
+
+# Foreign key each entity carries: entity -> (column, referenced entity)
+PARENTS = {"room_type": ("hotel_id", "hotel"), "rate_adjustment": ("room_type_id", "room_type")}
+
+# Parents are written before children; deletes run in the reverse order
+WRITE_ORDER = ("hotel", "room_type", "rate_adjustment")
+
+
+class BatchValidationError(Exception):
+    """
+    Raised when operations reference missing records; nothing is written.
+    """
+
+    def __init__(self, errors: List[dict]):
+        super().__init__(errors)
+        self.errors = errors
+
+
+class BatchConflictError(Exception):
+    """
+    Raised when the database rejects the batch (e.g. a duplicate hotel name).
+    """
+    pass
+
+
+class BatchService:
+    """
+    Applies a list of operations atomically.
+    """
+
+    def apply(self, db: Session, operations: List[BatchOperation]) -> List[dict]:
+        """
+        Validate and apply `operations` in one transaction.
+
+        Creates run before updates and deletes, parents before children, so a
+        record may only appear in one update or delete operation per batch.
+
+        Returns one result per operation, in request order.
+
+        Raises:
+            BatchValidationError: a target or referenced record does not exist
+            BatchConflictError: the database rejected the writes
+            ShardingUnsupported: hotel data is sharded
+        """
+        shards.require_unsharded("Batch writes")
+        parents = self._validate(db, operations)
+
+        results: List[Optional[dict]] = [None] * len(operations)
+        try:
+            for entity in WRITE_ORDER:
+                self._create(db, entity, operations, results)
+            for entity in WRITE_ORDER:
+                self._update(db, entity, operations, results)
+            # Snapshots of removed records must be taken before they are gone
+            history_entries = self._history_entries(db, operations, results, ("delete",))
+            for entity in reversed(WRITE_ORDER):
+                self._delete(db, entity, operations, results)
+            history_entries += self._history_entries(db, operations, results, ("create", "update"))
+            history.record(db, history_entries)
+            self._mark_invalidations(db, operations, results, parents)
+            hotel.sync_search_index(db, [
+                result["id"] for result in results if result["entity"] == "hotel"
+            ])
+            db.commit()
+        except IntegrityError as exc:
+            db.rollback()
+            raise BatchConflictError(str(exc.orig)) from exc
+        return results
+
+    def _validate(self, db: Session, operations: List[BatchOperation]) -> Dict[str, Dict[int, Optional[int]]]:
+        """
+        Check targets and references with one query per table.
+
+        Returns entity -> {id: current parent id} for every update/delete target.
+        """
+        errors = []
+        targets: Dict[str, Dict[int, int]] = defaultdict(dict)
+        deleted: Dict[str, Set[int]] = defaultdict(set)
+        references: Dict[str, Set[int]] = defaultdict(set)
+        for index, operation in enumerate(operations):
+            if operation.op != "create":
+                if operation.id in targets[operation.entity]:
+                    errors.append({"index": index, "detail": "Record appears in more than one operation"})
+                targets[operation.entity][operation.id] = index
+                if operation.op == "delete":
+                    deleted[operation.entity].add(operation.id)
+            parent = PARENTS.get(operation.entity)
+            if parent and operation.values.get(parent[0]) is not None:
+                references[parent[1]].add(operation.values[parent[0]])
+
+        current = {entity: self._load(db, entity, set(ids)) for entity, ids in targets.items()}
+        for entity, ids in targets.items():
+            for record_id, index in ids.items():
+                if record_id not in current[entity]:
+                    errors.append({"index": index, "detail": NOT_FOUND[entity]})
+
+        existing_parents = {
+            entity: set(self._load(db, entity, ids)) - deleted[entity] for entity, ids in references.items()
+        }
+        for index, operation in enumerate(operations):
+            parent = PARENTS.get(operation.entity)
+            if not parent:
+                continue
+            value = operation.values.get(parent[0])
+            if value is not None and value not in existing_parents[parent[1]]:
+                errors.append({"index": index, "detail": NOT_FOUND[parent[1]]})
+
+        if errors:
+            raise BatchValidationError(sorted(errors, key=lambda error: error["index"]))
+        return current
+
+    def _load(self, db: Session, entity: str, ids: Set[int]) -> Dict[int, Optional[int]]:
+        """
+        Map the ids that exist to their parent id (None for hotels).
+        """
+        if not ids:
+            return {}
+        model = MODELS[entity]
+        parent = PARENTS.get(entity)
+        columns = [model.id, getattr(model, parent[0])] if parent else [model.id]
+        rows = db.execute(select(*columns).where(model.id.in_(ids))).all()
+        return {row[0]: row[1] if parent else None for row in rows}
+
+    def _create(self, db: Session, entity: str, operations: List[BatchOperation], results: List) -> None:
+        pending = [(index, op) for index, op in enumerate(operations) if op.entity == entity and op.op == "create"]
+        if not pending:
+            return
+        model = MODELS[entity]
+        ids = db.scalars(
+            insert(model).returning(model.id, sort_by_parameter_order=True),
+            [op.values for _, op in pending],
+        ).all()
+        for (index, op), record_id in zip(pending, ids):
+            results[index] = {"index": index, "op": op.op, "entity": entity, "id": record_id}
+
+    def _update(self, db: Session, entity: str, operations: List[BatchOperation], results: List) -> None:
+        pending = [(index, op) for index, op in enumerate(operations) if op.entity == entity and op.op == "update"]
+        rows = [{"id": op.id, **op.values} for _, op in pending if op.values]
+        if rows:
+            # ORM bulk UPDATE by primary key: one executemany per set of columns
+            db.execute(update(MODELS[entity]), rows)
+        for index, op in pending:
+            results[index] = {"index": index, "op": op.op, "entity": entity, "id": op.id}
+
+    def _delete(self, db: Session, entity: str, operations: List[BatchOperation], results: List) -> None:
+        pending = [(index, op) for index, op in enumerate(operations) if op.entity == entity and op.op == "delete"]
+        if not pending:
+            return
+        model = MODELS[entity]
+        db.execute(delete(model).where(model.id.in_([op.id for _, op in pending])))
+        for index, op in pending:
+            results[index] = {"index": index, "op": op.op, "entity": entity, "id": op.id}
+
+    def _history_entries(
+        self, db: Session, operations: List[BatchOperation], results: List, actions: Tuple[str, ...]
+    ) -> List[dict]:
+        """
+        Change log entries for the logged entities, one snapshot query per table.
+        """
+        entries = []
+        for entity, fields in history.SNAPSHOT_FIELDS.items():
+            pending = [
+                ("remove" if op.op == "delete" else op.op, op.id if op.id is not None else result["id"])
+                for op, result in zip(operations, results)
+                if op.entity == entity and op.op in actions
+            ]
+            if not pending:
+                continue
+            model = MODELS[entity]
+            statement = select(model.id, *(getattr(model, field) for field in fields)).where(
+                model.id.in_({record_id for _, record_id in pending})
+            )
+            snapshots = {row.id: row._mapping for row in db.execute(statement)}
+            entries.extend(
+                history.entry(entity, action, record_id, snapshots[record_id]) for action, record_id in pending
+            )
+        return entries
+
+    def _mark_invalidations(
+        self,
+        db: Session,
+        operations: List[BatchOperation],
+        results: List[dict],
+        parents: Dict[str, Dict[int, Optional[int]]],
+    ) -> None:
+        """
+        Register cache invalidations: bulk statements bypass the ORM flush events.
+        """
+        for operation, result in zip(operations, results):
+            record_id = result["id"]
+            parent_ids = {operation.values.get(PARENTS[operation.entity][0])} if operation.entity in PARENTS else set()
+            parent_ids.add(parents.get(operation.entity, {}).get(record_id))
+            parent_ids.discard(None)
+            if operation.entity == "hotel":
+                invalidation.mark(db, invalidation.HOTELS, record_id)
+            elif operation.entity == "room_type":
+                invalidation.mark(db, invalidation.ROOM_TYPES, record_id)
+                invalidation.mark(db, invalidation.RATES, record_id)
+                for hotel_id in parent_ids:
+                    invalidation.mark(db, invalidation.HOTELS, hotel_id)
+            else:
+                for room_type_id in parent_ids:
+                    invalidation.mark(db, invalidation.RATES, room_type_id)
+
+
+batch_service = BatchService()
@@ -0,0 +1,272 @@
+"""
+Cache warm-up at worker start, and cache snapshots kept across restarts.
+
+A fresh worker loads the hotel and room type catalog (see
+app.services.catalog) and fills its cache with the effective rates of active
+hotels' room types for the next CACHE_WARM_DAYS days, computed in bulk: one
+query for the room types and one pair for their base rates and adjustments
+(per shard), instead of one query pair per rate on first use.
+
+With CACHE_SNAPSHOT_PATH set, a worker shutting down saves the rates in its
+cache to that file and the next worker restores them instead, so it starts
+with what was actually in demand. The file is a small header followed by
+parallel little-endian int64 arrays (change log marks, then room type id,
+date ordinal, base rate and adjustment in cents per entry), read back with a
+few array.frombytes calls. The marks are the last change log id of each
+database when the snapshot was saved; rates of room types written since are
+dropped on restore.
+"""
+import logging
+import os
+import struct
+import sys
+import time
+from array import array
+from datetime import date, timedelta
+from heapq import merge
+from operator import itemgetter
+from typing import List, Optional, Set
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+from app.core.cache import get_cache
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.money import to_cents
+from app.models.change_log import ChangeLog
+from app.models.hotel import Hotel, RoomType
+from app.services import history, invalidation
+from app.services.catalog import catalog
+from app.services.rate_service import RateService, _cache_key, _daily_rates, _rate_result
+from app.services.sharding import shards
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_MAGIC = b"HPRC"
+SNAPSHOT_VERSION = 1
+# magic, version, saved at (unix time), number of change log marks, number of entries
+_HEADER = struct.Struct("<4sHdII")
+_ITEM_SIZE = array("q").itemsize
+
+
+def _little_endian(values: array) -> array:
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values
+
+
+class _RateInvalidations:
+    """
+    Room types whose rates are invalidated while the cache is being filled.
+
+    Values computed before such a write commits must not be cached after it.
+    """
+
+    def __enter__(self) -> "_RateInvalidations":
+        self.room_type_ids: Set[str] = set()
+        self.everything = False
+        get_cache().subscribe(self._note)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        get_cache().unsubscribe(self._note)
+
+    def __contains__(self, room_type_id: int) -> bool:
+        return self.everything or str(room_type_id) in self.room_type_ids
+
+    def _note(self, namespace: str, tag: Optional[str]) -> None:
+        if namespace != invalidation.RATES:
+            return
+        if tag is None:
+            self.everything = True
+        else:
+            self.room_type_ids.add(tag)
+
+
+class CacheWarmer:
+    """
+    Fills this worker's local cache tier at start and snapshots it at shutdown.
+    """
+
+    def __init__(self, session_factory=None):
+        self.session_factory = session_factory or SessionLocal
+
+    def start(self, snapshot_path: Optional[str] = None) -> int:
+        """
+        Load the catalog (when it serves reads), then warm the rate cache from the snapshot if usable,
+        else from the database.
+
+        Returns the number of rates cached. Failures are logged, not raised:
+        a worker with a cold cache still serves.
+        """
+        try:
+            if catalog.enabled:
+                catalog.load()
+        except Exception:
+            logger.exception("Loading the catalog failed")
+        try:
+            if snapshot_path:
+                restored = self.restore(snapshot_path)
+                if restored is not None:
+                    return restored
+            if settings.CACHE_WARM_DAYS <= 0:
+                return 0
+            return self.warm(date.today(), settings.CACHE_WARM_DAYS, settings.CACHE_WARM_MAX_ENTRIES)
+        except Exception:
+            logger.exception("Cache warm-up failed")
+            return 0
+
+    def stop(self, snapshot_path: Optional[str] = None) -> None:
+        """
+        Save the snapshot for the next worker, if configured; failures are logged.
+        """
+        if not snapshot_path:
+            return
+        try:
+            self.save_snapshot(snapshot_path)
+        except Exception:
+            logger.exception("Saving the cache snapshot failed")
+
+    def warm(self, start_date: date, days: int, max_entries: int) -> int:
+        """
+        Cache the rates of active hotels' room types for `days` dates from `start_date`.
+
+        Room types are taken in id order until `max_entries` rates; returns the
+        number cached.
+        """
+        limit = max_entries // days if days > 0 else 0
+        if limit <= 0:
+            return 0
+        end_date = start_date + timedelta(days=days - 1)
+        active_room_types = (
+            select(RoomType.id, RoomType.hotel_id)
+            .join(Hotel, Hotel.id == RoomType.hotel_id)
+            .where(Hotel.is_active.is_(True))
+            .order_by(RoomType.id)
+            .limit(limit)
+        )
+
+        cache = get_cache().local
+        cached = 0
+        with self.session_factory() as db, _RateInvalidations() as changed:
+            per_shard = shards.scatter(db, lambda shard_db: shard_db.execute(active_room_types).all())
+            hotel_ids = dict(list(merge(*per_shard, key=itemgetter(0)))[:limit])
+            base_rates, timelines = RateService._load_rates(db, hotel_ids, end_date, start_date)
+
+            dates = [start_date + timedelta(days=offset) for offset in range(days)]
+            for room_type_id, base_rate in base_rates.items():
+                if room_type_id in changed:
+                    continue
+                rates = _daily_rates(base_rate, *timelines.get(room_type_id, ([], [])), start_date, days)
+                tag = str(room_type_id)
+                for target_date, rate in zip(dates, rates):
+                    cache.set(invalidation.RATES, _cache_key(room_type_id, target_date),
+                              _rate_result(room_type_id, base_rate, rate - base_rate, target_date), tag=tag)
+                cached += days
+                if shards.enabled:
+                    cache.set(invalidation.ROOM_TYPES, f"hotel_id:{room_type_id}", hotel_ids[room_type_id], tag=tag)
+        return cached
+
+    def save_snapshot(self, path: str) -> int:
+        """
+        Write the rates in this worker's cache to `path` (atomically); returns their number.
+        """
+        entries = [
+            value for namespace, _, _, value in get_cache().local.items()
+            if namespace == invalidation.RATES
+        ]
+        with self.session_factory() as db:
+            marks = array("q", self._change_marks(db))
+
+        room_type_ids, ordinals, base_rates, adjustments = (array("q") for _ in range(4))
+        for value in entries:
+            room_type_ids.append(value["room_type_id"])
+            ordinals.append(value["effective_date"].toordinal())
+            base_rates.append(to_cents(value["base_rate"]))
+            adjustments.append(to_cents(value["adjustment_applied"]))
+
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        with open(temporary_path, "wb") as snapshot:
+            snapshot.write(_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, time.time(), len(marks), len(entries)))
+            for values in (marks, room_type_ids, ordinals, base_rates, adjustments):
+                _little_endian(values).tofile(snapshot)
+        # Several workers may shut down at once: the last complete file wins
+        os.replace(temporary_path, path)
+        return len(entries)
+
+    def restore(self, path: str) -> Optional[int]:
+        """
+        Cache the rates saved in the snapshot at `path`; returns their number.
+
+        Returns None, caching nothing, when there is no usable snapshot: none
+        saved, a different format, older than CACHE_SNAPSHOT_MAX_AGE_SECONDS,
+        or saved against other databases (change log marks ahead of them).
+        """
+        try:
+            with open(path, "rb") as snapshot:
+                data = snapshot.read()
+        except FileNotFoundError:
+            return None
+        if len(data) < _HEADER.size:
+            return None
+        magic, version, saved_at, mark_count, count = _HEADER.unpack_from(data)
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            return None
+        if len(data) != _HEADER.size + (mark_count + 4 * count) * _ITEM_SIZE:
+            return None
+        if time.time() - saved_at > settings.CACHE_SNAPSHOT_MAX_AGE_SECONDS:
+            return None
+
+        columns: List[array] = []
+        offset = _HEADER.size
+        for size in (mark_count, count, count, count, count):
+            values = array("q")
+            values.frombytes(data[offset:offset + size * _ITEM_SIZE])
+            columns.append(_little_endian(values))
+            offset += size * _ITEM_SIZE
+        marks, room_type_ids, ordinals, base_rates, adjustments = columns
+
+        cache = get_cache().local
+        cached = 0
+        with self.session_factory() as db, _RateInvalidations() as changed:
+            current = self._change_marks(db)
+            if len(current) != len(marks) or any(now < then for now, then in zip(current, marks)):
+                return None
+            written = self._written_since(db, min(marks, default=0))
+
+            for room_type_id, ordinal, base_rate, adjustment_amount in zip(
+                room_type_ids, ordinals, base_rates, adjustments
+            ):
+                if room_type_id in written or room_type_id in changed:
+                    continue
+                target_date = date.fromordinal(ordinal)
+                cache.set(invalidation.RATES, _cache_key(room_type_id, target_date),
+                          _rate_result(room_type_id, base_rate, adjustment_amount, target_date),
+                          tag=str(room_type_id))
+                cached += 1
+        return cached
+
+    @staticmethod
+    def _change_marks(db: Session) -> List[int]:
+        """
+        Last change log id of each database (each shard, with shards).
+        """
+        return shards.scatter(db, lambda shard_db: shard_db.scalar(select(func.max(ChangeLog.id))) or 0)
+
+    @staticmethod
+    def _written_since(db: Session, mark: int) -> Set[int]:
+        """
+        Room types written, or with adjustments written, after change log id `mark`.
+
+        With shards, the lowest mark is used on every shard: a superset is safe.
+        """
+        statement = select(
+            case((ChangeLog.entity == history.ROOM_TYPE, ChangeLog.entity_id), else_=ChangeLog.room_type_id)
+        ).where(ChangeLog.id > mark, ChangeLog.entity != history.HOTEL).distinct()
+        written: Set[int] = set()
+        for room_type_ids in shards.scatter(db, lambda shard_db: shard_db.scalars(statement).all()):
+            written.update(room_type_ids)
+        return written
+
+
+cache_warmer = CacheWarmer()
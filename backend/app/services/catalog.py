@@ -0,0 +1,369 @@
+"""
+Read-optimized in-memory catalog of hotels and room types.
+
+Hotels and room types are small, read-mostly reference data. The catalog
+loads them in bulk as plain column tuples (no ORM instances) into slotted
+records, indexed by id, with each hotel's room type ids as an adjacency list
+and hotel ids kept sorted for paging. The hotel and room type read endpoints
+are served from it without a database session when it is `enabled`, that is
+when every worker's writes reach it through the invalidation bus.
+
+Writes are picked up through the cache invalidation bus: invalidated ids are
+marked stale and re-read in one query on the next read, so a worker sees
+its own writes immediately and other workers' (CACHE_BACKEND=sqlite) within
+CACHE_INVALIDATION_POLL_SECONDS. Everything is re-read at least every
+CATALOG_REFRESH_SECONDS, which bounds staleness left by writes that publish
+no invalidation, and ids the catalog does not know are looked up once before
+giving up.
+"""
+import sys
+import threading
+import time
+from bisect import bisect_left, insort
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Set
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.core.cache import get_cache
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.money import from_cents
+from app.models.hotel import Hotel, RoomType
+from app.services import invalidation
+from app.services.rate_service import _BASE_RATE_CENTS
+from app.services.sharding import shards
+
+# Beyond this many stale records a full reload is cheaper than an IN list
+_FULL_RELOAD_AFTER = 1000
+
+_HOTEL_COLUMNS = (Hotel.id, Hotel.name, Hotel.location, Hotel.is_active)
+_ROOM_TYPE_COLUMNS = (RoomType.id, RoomType.hotel_id, RoomType.name, _BASE_RATE_CENTS)
+
+
+class HotelRecord:
+    """
+    Read-only hotel, with the attributes of the Hotel response schema.
+    """
+    __slots__ = ("id", "name", "location", "is_active")
+
+    def __init__(self, id: int, name: str, location: str, is_active: bool):
+        self.id = id
+        self.name = name
+        self.location = location
+        self.is_active = is_active
+
+
+class RoomTypeRecord:
+    """
+    Read-only room type, with the attributes of the RoomType response schema.
+    """
+    __slots__ = ("id", "hotel_id", "name", "base_rate_cents")
+
+    def __init__(self, id: int, hotel_id: int, name: str, base_rate_cents: int):
+        self.id = id
+        self.hotel_id = hotel_id
+        self.name = name
+        self.base_rate_cents = base_rate_cents
+
+    @property
+    def base_rate(self) -> Decimal:
+        return from_cents(self.base_rate_cents)
+
+
+def _hotel_record(row) -> HotelRecord:
+    hotel_id, name, location, is_active = row
+    return HotelRecord(hotel_id, name, sys.intern(location), is_active)
+
+
+def _room_type_record(row) -> RoomTypeRecord:
+    # Room type names repeat across hotels ("Double", "Suite"): share the strings
+    room_type_id, hotel_id, name, base_rate_cents = row
+    return RoomTypeRecord(room_type_id, hotel_id, sys.intern(name), base_rate_cents)
+
+
+class Catalog:
+    """
+    Hotels and room types of all shards, kept in sync with writes.
+
+    Readers take no lock. Loads and refreshes read the database outside
+    `_lock` and swap or patch the maps under it, copying the sorted lists they
+    change; one full load runs at a time (`_load_lock`) and refreshes of
+    written records are serialized (`_refresh_lock`).
+    """
+
+    def __init__(self, session_factory=None):
+        self.session_factory = session_factory or SessionLocal
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._subscribed = False
+        self.reset()
+
+    @property
+    def enabled(self) -> bool:
+        """
+        Whether reads may be served from the catalog.
+
+        Only when every write reaches it through the invalidation bus: with a
+        shared bus (CACHE_BACKEND=sqlite) or a single worker. Otherwise another
+        worker's writes would show only after CATALOG_REFRESH_SECONDS.
+        """
+        return settings.CACHE_BACKEND == "sqlite" or settings.WORKERS == 1
+
+    def reset(self) -> None:
+        """
+        Forget everything; the next read loads the catalog again.
+        """
+        with self._lock:
+            self._hotels: Dict[int, HotelRecord] = {}
+            self._hotel_ids: List[int] = []
+            self._room_types: Dict[int, RoomTypeRecord] = {}
+            self._room_types_by_hotel: Dict[int, List[int]] = {}
+            self._stale_hotels: Set[int] = set()
+            self._stale_room_types: Set[int] = set()
+            # Records refreshed while a full load runs, re-read after it
+            self._touched_hotels: Set[int] = set()
+            self._touched_room_types: Set[int] = set()
+            self._loading = False
+            self._loaded = False
+            # Bumped by full invalidations, so a load that started before one is not trusted
+            self._generation = 0
+            self._expires_at = 0.0
+            self._next_poll = 0.0
+
+    def get_hotel(self, hotel_id: int) -> Optional[HotelRecord]:
+        self._sync()
+        record = self._hotels.get(hotel_id)
+        if record is None:
+            self._look_up(hotel_ids=[hotel_id])
+            record = self._hotels.get(hotel_id)
+        return record
+
+    def get_hotels(self, skip: int = 0, limit: int = 100) -> List[HotelRecord]:
+        """
+        Hotels in id order, paginated.
+        """
+        self._sync()
+        hotels = self._hotels
+        return [hotels[hotel_id] for hotel_id in self._hotel_ids[skip:skip + limit] if hotel_id in hotels]
+
+    def get_room_type(self, room_type_id: int) -> Optional[RoomTypeRecord]:
+        self._sync()
+        record = self._room_types.get(room_type_id)
+        if record is None:
+            self._look_up(room_type_ids=[room_type_id])
+            record = self._room_types.get(room_type_id)
+        return record
+
+    def get_room_types_by_hotel(self, hotel_id: int) -> List[RoomTypeRecord]:
+        """
+        Room types of a hotel in id order.
+        """
+        self._sync()
+        room_types = self._room_types
+        return [
+            room_types[room_type_id]
+            for room_type_id in self._room_types_by_hotel.get(hotel_id, ())
+            if room_type_id in room_types
+        ]
+
+    def load(self) -> int:
+        """
+        Load the catalog now instead of on the first read; returns the number of records.
+        """
+        self._sync()
+        return len(self)
+
+    def __len__(self) -> int:
+        return len(self._hotels) + len(self._room_types)
+
+    def _sync(self) -> None:
+        """
+        Load the catalog, or re-read the records written since the last read.
+
+        A periodic reload runs in one reader while the others keep reading the
+        current maps; readers only wait for the first load and for reloads
+        forced by a full invalidation.
+        """
+        if not self._subscribed:
+            with self._lock:
+                if not self._subscribed:
+                    get_cache().subscribe(self._invalidate)
+                    self._subscribed = True
+        now = time.monotonic()
+        if now >= self._next_poll:
+            # Deliver other workers' invalidations, at most once per poll interval
+            self._next_poll = now + settings.CACHE_INVALIDATION_POLL_SECONDS
+            get_cache().bus.poll()
+        if self._stale_hotels or self._stale_room_types:
+            self._refresh_stale()
+        if time.monotonic() >= self._expires_at:
+            self._reload(wait=not self._loaded or self._expires_at == 0.0)
+
+    def _reload(self, wait: bool) -> None:
+        if not self._load_lock.acquire(blocking=wait):
+            # Another reader is reloading; serve the current maps meanwhile
+            return
+        try:
+            # Loaded by another reader while this one waited
+            if self._loaded and time.monotonic() < self._expires_at:
+                return
+            self._load_all()
+        finally:
+            self._load_lock.release()
+
+    def _refresh_stale(self) -> None:
+        with self._refresh_lock:
+            with self._lock:
+                hotel_ids, self._stale_hotels = self._stale_hotels, set()
+                room_type_ids, self._stale_room_types = self._stale_room_types, set()
+            if len(hotel_ids) + len(room_type_ids) > _FULL_RELOAD_AFTER:
+                with self._lock:
+                    self._expires_at = 0.0
+                return
+            if not (hotel_ids or room_type_ids):
+                return
+            try:
+                self._refresh(hotel_ids, room_type_ids)
+            except Exception:
+                # Re-read them on the next read
+                with self._lock:
+                    self._stale_hotels |= hotel_ids
+                    self._stale_room_types |= room_type_ids
+                raise
+
+    def _look_up(self, hotel_ids: Iterable[int] = (), room_type_ids: Iterable[int] = ()) -> None:
+        """
+        Read unknown ids (written by a worker not sharing our bus).
+        """
+        with self._refresh_lock:
+            self._refresh(set(hotel_ids), set(room_type_ids))
+
+    def _invalidate(self, namespace: str, tag: Optional[str]) -> None:
+        if namespace not in (invalidation.HOTELS, invalidation.ROOM_TYPES):
+            return
+        with self._lock:
+            if tag is None:
+                self._generation += 1
+                self._expires_at = 0.0
+            elif namespace == invalidation.HOTELS:
+                self._stale_hotels.add(int(tag))
+            else:
+                self._stale_room_types.add(int(tag))
+
+    def _load_all(self) -> None:
+        """
+        Bulk-load every hotel and room type and swap them in (caller holds the load lock).
+
+        Records invalidated or refreshed during the load are re-read afterwards.
+        """
+        with self._lock:
+            generation = self._generation
+            self._stale_hotels, self._stale_room_types = set(), set()
+            self._touched_hotels, self._touched_room_types = set(), set()
+            self._loading = True
+        try:
+            expires_at = time.monotonic() + settings.CATALOG_REFRESH_SECONDS
+            with self.session_factory() as db:
+                hotel_rows = self._select(db, select(*_HOTEL_COLUMNS))
+                room_type_rows = self._select(db, select(*_ROOM_TYPE_COLUMNS))
+
+            hotels = {row[0]: _hotel_record(row) for row in hotel_rows}
+            room_types = {row[0]: _room_type_record(row) for row in room_type_rows}
+            room_types_by_hotel: Dict[int, List[int]] = {}
+            for room_type_id in sorted(room_types):
+                room_types_by_hotel.setdefault(room_types[room_type_id].hotel_id, []).append(room_type_id)
+            hotel_ids = sorted(hotels)
+        except Exception:
+            with self._lock:
+                self._loading = False
+                # Stale ids were dropped: start over on the next read
+                self._expires_at = 0.0
+            raise
+
+        with self._lock:
+            self._hotels, self._hotel_ids = hotels, hotel_ids
+            self._room_types, self._room_types_by_hotel = room_types, room_types_by_hotel
+            self._stale_hotels |= self._touched_hotels
+            self._stale_room_types |= self._touched_room_types
+            self._loading = False
+            self._loaded = True
+            self._expires_at = expires_at if self._generation == generation else 0.0
+
+    def _refresh(self, hotel_ids: Set[int], room_type_ids: Set[int]) -> None:
+        """
+        Re-read the given records (caller holds the refresh lock); missing ones are removed.
+        """
+        with self.session_factory() as db:
+            hotel_rows = self._select(db, select(*_HOTEL_COLUMNS).where(Hotel.id.in_(hotel_ids))) if hotel_ids else []
+            room_type_rows = self._select(
+                db, select(*_ROOM_TYPE_COLUMNS).where(RoomType.id.in_(room_type_ids))
+            ) if room_type_ids else []
+        found_hotels = {row[0]: _hotel_record(row) for row in hotel_rows}
+        found_room_types = {row[0]: _room_type_record(row) for row in room_type_rows}
+
+        with self._lock:
+            # Dict updates are atomic for readers; sorted lists are copied before changing
+            hotels = self._hotels
+            sorted_ids = None
+            for hotel_id in hotel_ids:
+                record = found_hotels.get(hotel_id)
+                if record is None:
+                    if hotels.pop(hotel_id, None) is not None:
+                        sorted_ids = list(self._hotel_ids) if sorted_ids is None else sorted_ids
+                        _discard_sorted(sorted_ids, hotel_id)
+                    continue
+                if hotel_id not in hotels:
+                    sorted_ids = list(self._hotel_ids) if sorted_ids is None else sorted_ids
+                    insort(sorted_ids, hotel_id)
+                hotels[hotel_id] = record
+            if sorted_ids is not None:
+                self._hotel_ids = sorted_ids
+
+            room_types, by_hotel = self._room_types, self._room_types_by_hotel
+            changed: Dict[int, List[int]] = {}
+
+            def members(hotel_id: int) -> List[int]:
+                if hotel_id not in changed:
+                    changed[hotel_id] = list(by_hotel.get(hotel_id, ()))
+                return changed[hotel_id]
+
+            for room_type_id in room_type_ids:
+                record = found_room_types.get(room_type_id)
+                previous = room_types.get(room_type_id)
+                if previous is not None and (record is None or record.hotel_id != previous.hotel_id):
+                    _discard_sorted(members(previous.hotel_id), room_type_id)
+                if record is None:
+                    room_types.pop(room_type_id, None)
+                    continue
+                if previous is None or record.hotel_id != previous.hotel_id:
+                    insort(members(record.hotel_id), room_type_id)
+                room_types[room_type_id] = record
+            for hotel_id, members_of_hotel in changed.items():
+                if members_of_hotel:
+                    by_hotel[hotel_id] = members_of_hotel
+                else:
+                    by_hotel.pop(hotel_id, None)
+
+            if self._loading:
+                self._touched_hotels |= hotel_ids
+                self._touched_room_types |= room_type_ids
+
+    @staticmethod
+    def _select(db: Session, statement) -> List:
+        """
+        Rows of `statement` from every shard.
+        """
+        rows: List = []
+        for shard_rows in shards.scatter(db, lambda shard_db: shard_db.execute(statement).all()):
+            rows.extend(shard_rows)
+        return rows
+
+
+def _discard_sorted(values: List[int], value: int) -> None:
+    position = bisect_left(values, value)
+    if position < len(values) and values[position] == value:
+        del values[position]
+
+
+catalog = Catalog()
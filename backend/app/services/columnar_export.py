@@ -0,0 +1,301 @@
+"""
+Columnar export of rate data for analytics.
+
+Each table is read in one streamed query into typed column buffers (stdlib
+`array`s): integers and cents as int64, dates as date32 (int32 days since
+1970-01-01), repeated strings such as adjustment reasons dictionary-encoded
+as int32 codes plus a dictionary. The buffers are then written as:
+
+- "parquet" or "arrow" (Arrow IPC file) when `pyarrow` is installed;
+- "npz", NumPy's zip of .npy arrays, always available: it is written with
+  the standard library, so numpy is only needed to load it. A column `x`
+  is stored as `x`; dictionary columns add `x.dictionary` and nullable
+  columns add a boolean `x.valid` mask (null values are stored as 0).
+
+"auto" picks parquet when pyarrow is available and npz otherwise.
+"""
+import ast
+import importlib.util
+import struct
+import sys
+import zipfile
+from array import array
+from datetime import date
+from typing import BinaryIO, Dict, List, Optional
+from sqlalchemy import BigInteger, select, type_coerce
+from sqlalchemy.orm import Session
+from app.models.hotel import Hotel, RoomType, RateAdjustment
+from app.models.rate_calendar import RateCalendar
+from app.services.rate_service import _ADJUSTMENT_CENTS, _BASE_RATE_CENTS
+from app.services.sharding import shards
+
+INT64 = "int64"
+INT32 = "int32"
+BOOL = "bool"
+DATE32 = "date32"
+STRING = "string"
+DICTIONARY = "dictionary"
+
+FORMATS = ("npz", "arrow", "parquet")
+
+MEDIA_TYPES = {
+    "npz": "application/zip",
+    "arrow": "application/vnd.apache.arrow.file",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+# Rows fetched per round trip while reading a table
+READ_BATCH_SIZE = 10_000
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+# Exported tables: name -> (ordering, [(column, SQL expression, kind)])
+TABLES = {
+    "hotels": ((Hotel.id,), [
+        ("id", Hotel.id, INT64),
+        ("name", Hotel.name, STRING),
+        ("location", Hotel.location, DICTIONARY),
+        ("is_active", Hotel.is_active, BOOL),
+    ]),
+    "room_types": ((RoomType.id,), [
+        ("id", RoomType.id, INT64),
+        ("hotel_id", RoomType.hotel_id, INT64),
+        ("name", RoomType.name, DICTIONARY),
+        ("base_rate_cents", _BASE_RATE_CENTS, INT64),
+    ]),
+    "rate_adjustments": ((RateAdjustment.id,), [
+        ("id", RateAdjustment.id, INT64),
+        ("room_type_id", RateAdjustment.room_type_id, INT64),
+        ("adjustment_amount_cents", _ADJUSTMENT_CENTS, INT64),
+        ("effective_date", RateAdjustment.effective_date, DATE32),
+        ("end_date", RateAdjustment.end_date, DATE32),
+        ("priority", RateAdjustment.priority, INT32),
+        ("reason", RateAdjustment.reason, DICTIONARY),
+    ]),
+    "rate_calendar": ((RateCalendar.room_type_id, RateCalendar.rate_date), [
+        ("room_type_id", RateCalendar.room_type_id, INT64),
+        ("rate_date", RateCalendar.rate_date, DATE32),
+        ("effective_rate_cents", type_coerce(RateCalendar.effective_rate, BigInteger), INT64),
+    ]),
+}
+
+
+class ExportFormatUnavailable(Exception):
+    """
+    Raised when a format needs a library that is not installed.
+    """
+    pass
+
+
+class Column:
+    """
+    One exported column: typed values plus optional validity mask and dictionary.
+    """
+
+    def __init__(self, name: str, kind: str, values, valid: Optional[array] = None,
+                 dictionary: Optional[List[str]] = None):
+        self.name = name
+        self.kind = kind
+        self.values = values  # array, or a list of str for STRING columns
+        self.valid = valid  # array("B") of 0/1, None when there are no nulls
+        self.dictionary = dictionary
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+_TYPECODES = {INT64: "q", INT32: "i", BOOL: "B", DATE32: "i", DICTIONARY: "i"}
+
+
+class _ColumnBuilder:
+    def __init__(self, name: str, kind: str):
+        self.name = name
+        self.kind = kind
+        self.values = [] if kind == STRING else array(_TYPECODES[kind])
+        self.valid: Optional[array] = None
+        self.codes: Dict[str, int] = {}
+
+    def append(self, value) -> None:
+        if value is None:
+            if self.valid is None:
+                self.valid = array("B", [1]) * len(self.values)
+            self.valid.append(0)
+            self.values.append("" if self.kind == STRING else 0)
+            return
+        if self.valid is not None:
+            self.valid.append(1)
+        if self.kind == DATE32:
+            value = value.toordinal() - _EPOCH_ORDINAL
+        elif self.kind == DICTIONARY:
+            value = self.codes.setdefault(value, len(self.codes))
+        self.values.append(value)
+
+    def finish(self) -> Column:
+        dictionary = list(self.codes) if self.kind == DICTIONARY else None
+        return Column(self.name, self.kind, self.values, self.valid, dictionary)
+
+
+def read_table(db: Session, table: str) -> List[Column]:
+    """
+    Read a whole table into columns with one streamed query.
+    """
+    ordering, columns = TABLES[table]
+    builders = [_ColumnBuilder(name, kind) for name, _, kind in columns]
+    statement = (
+        select(*(expression for _, expression, _ in columns))
+        .order_by(*ordering)
+        .execution_options(yield_per=READ_BATCH_SIZE)
+    )
+    appenders = [builder.append for builder in builders]
+    for row in db.execute(statement):
+        for append, value in zip(appenders, row):
+            append(value)
+    return [builder.finish() for builder in builders]
+
+
+def pyarrow_available() -> bool:
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def resolve_format(requested: str) -> str:
+    """
+    Map "auto" to the best available format; reject formats that cannot be written.
+    """
+    if requested == "auto":
+        return "parquet" if pyarrow_available() else "npz"
+    if requested in ("arrow", "parquet") and not pyarrow_available():
+        raise ExportFormatUnavailable(f"The {requested} format requires pyarrow; use npz")
+    return requested
+
+
+def export_table(db: Session, table: str, output: BinaryIO, format: str = "auto") -> str:
+    """
+    Write `table` to the binary file object `output`; returns the format used.
+
+    Refused (ShardingUnsupported) while hotel data is sharded.
+    """
+    shards.require_unsharded("Exports")
+    format = resolve_format(format)
+    columns = read_table(db, table)
+    if format == "npz":
+        write_npz(columns, output)
+    else:
+        write_arrow(columns, output, format)
+    return format
+
+
+# NumPy .npy / .npz -------------------------------------------------------
+
+_BYTE_ORDER = "<" if sys.byteorder == "little" else ">"
+
+_NPY_DESCR = {"q": _BYTE_ORDER + "i8", "i": _BYTE_ORDER + "i4", "B": "|b1"}
+
+
+def _npy_header(descr: str, length: int) -> bytes:
+    header = repr({"descr": descr, "fortran_order": False, "shape": (length,)}).encode("latin1")
+    # Format 1.0: magic, version, header length; data starts at a multiple of 64
+    header += b" " * (-(10 + len(header) + 1) % 64) + b"\n"
+    return b"\x93NUMPY\x01\x00" + struct.pack("<H", len(header)) + header
+
+
+def _write_npy(archive: zipfile.ZipFile, name: str, values) -> None:
+    with archive.open(f"{name}.npy", "w", force_zip64=True) as member:
+        if isinstance(values, array):
+            member.write(_npy_header(_NPY_DESCR[values.typecode], len(values)))
+            member.write(values.tobytes())
+            return
+        # Fixed-width UTF-32 strings ("<U{width}")
+        width = max((len(value) for value in values), default=0) or 1
+        member.write(_npy_header(f"<U{width}", len(values)))
+        for value in values:
+            member.write(value.encode("utf-32-le").ljust(4 * width, b"\0"))
+
+
+def write_npz(columns: List[Column], output: BinaryIO, compress: bool = True) -> None:
+    compression = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+    with zipfile.ZipFile(output, "w", compression=compression, allowZip64=True) as archive:
+        for column in columns:
+            _write_npy(archive, column.name, column.values)
+            if column.dictionary is not None:
+                _write_npy(archive, f"{column.name}.dictionary", column.dictionary)
+            if column.valid is not None:
+                _write_npy(archive, f"{column.name}.valid", column.valid)
+
+
+def load_npz(source: BinaryIO) -> Dict[str, object]:
+    """
+    Read an export written by `write_npz` without numpy.
+
+    Returns name -> array for numeric arrays and name -> list of str for
+    string arrays. With numpy installed, `numpy.load` reads the same file.
+    """
+    loaded: Dict[str, object] = {}
+    with zipfile.ZipFile(source) as archive:
+        for name in archive.namelist():
+            data = archive.read(name)
+            header_length = struct.unpack("<H", data[8:10])[0]
+            header = ast.literal_eval(data[10:10 + header_length].decode("latin1"))
+            body = data[10 + header_length:]
+            descr = header["descr"]
+            if descr[1] == "U":
+                width = int(descr[2:]) * 4
+                loaded[name[:-4]] = [
+                    body[offset:offset + width].decode("utf-32-le").rstrip("\0")
+                    for offset in range(0, len(body), width)
+                ]
+                continue
+            typecode = {"i8": "q", "i4": "i", "b1": "B"}[descr.lstrip("<>|")]
+            values = array(typecode)
+            values.frombytes(body)
+            if descr[0] in "<>" and (descr[0] == "<") != (sys.byteorder == "little"):
+                values.byteswap()
+            loaded[name[:-4]] = values
+    return loaded
+
+
+# Arrow / Parquet -----------------------------------------------------------
+
+def _validity_bitmap(valid: array) -> bytes:
+    """
+    Pack a 0/1 mask into Arrow's little-endian validity bitmap.
+    """
+    bitmap = bytearray((len(valid) + 7) // 8)
+    for index, flag in enumerate(valid):
+        if flag:
+            bitmap[index >> 3] |= 1 << (index & 7)
+    return bytes(bitmap)
+
+
+def to_arrow_table(columns: List[Column]):
+    import pyarrow as pa
+
+    arrays, names = [], []
+    for column in columns:
+        validity = pa.py_buffer(_validity_bitmap(column.valid)) if column.valid is not None else None
+        if column.kind == STRING:
+            mask = [not flag for flag in column.valid] if column.valid is not None else None
+            values = pa.array(column.values, type=pa.string(), mask=mask)
+        elif column.kind == BOOL:
+            values = pa.array([bool(value) for value in column.values], type=pa.bool_(),
+                              mask=[not flag for flag in column.valid] if column.valid is not None else None)
+        else:
+            arrow_type = {INT64: pa.int64(), INT32: pa.int32(), DATE32: pa.date32(), DICTIONARY: pa.int32()}[column.kind]
+            values = pa.Array.from_buffers(arrow_type, len(column), [validity, pa.py_buffer(column.values)])
+            if column.kind == DICTIONARY:
+                values = pa.DictionaryArray.from_arrays(values, pa.array(column.dictionary, type=pa.string()))
+        arrays.append(values)
+        names.append(column.name)
+    return pa.Table.from_arrays(arrays, names=names)
+
+
+def write_arrow(columns: List[Column], output: BinaryIO, format: str = "parquet") -> None:
+    import pyarrow as pa
+
+    table = to_arrow_table(columns)
+    if format == "parquet":
+        import pyarrow.parquet as pq
+
+        pq.write_table(table, output, compression="zstd")
+        return
+    with pa.ipc.new_file(output, table.schema) as writer:
+        writer.write_table(table)
@@ -0,0 +1,125 @@
+"""
+Append-only change history for hotels, room types and rate adjustments.
+
+Services call `record` with snapshots of the records they wrote; all entries
+of a call go to the database in one executemany, inside the caller's
+transaction. The log doubles as a change feed: `changes_since` pages through
+it by sequence number and `subscribe` callbacks run after every commit that
+added entries in this process. Point-in-time rate reads live in RateService.
+
+Sequence numbers must become visible in order, or a feed consumer whose
+cursor passed a number would never see a lower one committed later. SQLite
+serialises writers; on PostgreSQL, transactions take a transaction-scoped
+advisory lock before their first entry, so logging writers commit one at a
+time from that point on.
+"""
+import threading
+from datetime import datetime, timezone
+from typing import Any, Callable, Iterable, List, Mapping, Optional
+from sqlalchemy import event, insert, text
+from sqlalchemy.orm import Session
+from app.models.change_log import ChangeLog
+
+HOTEL = "hotel"
+ROOM_TYPE = "room_type"
+RATE_ADJUSTMENT = "rate_adjustment"
+
+# Action logged for removals (creates and updates log "create"/"update")
+REMOVE = "remove"
+
+# PostgreSQL advisory lock serialising transactions that append to the log
+CHANGE_LOG_LOCK_KEY = 0x63686C67
+
+# Columns snapshotted for each logged entity
+SNAPSHOT_FIELDS = {
+    HOTEL: ("name", "location", "is_active"),
+    ROOM_TYPE: ("hotel_id", "name", "base_rate"),
+    RATE_ADJUSTMENT: ("room_type_id", "adjustment_amount", "effective_date", "end_date", "priority", "reason"),
+}
+
+
+def utcnow() -> datetime:
+    """
+    Current transaction time as stored in the log (naive UTC).
+    """
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def to_transaction_time(value: datetime) -> datetime:
+    """
+    Normalise an "as of" timestamp to naive UTC; naive values are taken as UTC.
+    """
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def entry(entity: str, action: str, entity_id: int, values: Any) -> dict:
+    """
+    Build a log entry from a model instance or a mapping of its columns.
+    """
+    get = values.get if isinstance(values, Mapping) else lambda field: getattr(values, field)
+    row = {"entity": entity, "entity_id": entity_id, "action": action}
+    for field in SNAPSHOT_FIELDS[entity]:
+        row[field] = get(field)
+    return row
+
+
+def record(db: Session, entries: Iterable[dict], recorded_at: Optional[datetime] = None) -> None:
+    """
+    Append entries to the change log, stamped with one transaction time.
+
+    On PostgreSQL the transaction holds the change log lock from its first
+    entry until it ends (see the module docstring).
+    """
+    recorded_at = recorded_at or utcnow()
+    rows: List[dict] = [{**row, "recorded_at": recorded_at} for row in entries]
+    if rows:
+        if not db.info.get(_WRITTEN_KEY) and db.get_bind().dialect.name == "postgresql":
+            db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": CHANGE_LOG_LOCK_KEY})
+        db.execute(insert(ChangeLog), rows)
+        db.info[_WRITTEN_KEY] = True
+
+
+def changes_since(db: Session, cursor: int = 0, limit: int = 100) -> List[ChangeLog]:
+    """
+    Log entries with a sequence number above `cursor`, oldest first.
+
+    Sequence numbers become visible in order (see `record`), so no entry
+    with a number at or below the last one returned can appear later.
+    """
+    return db.query(ChangeLog).filter(ChangeLog.id > cursor).order_by(ChangeLog.id).limit(limit).all()
+
+
+_WRITTEN_KEY = "change_log_written"
+_listeners: List[Callable[[], None]] = []
+_listeners_lock = threading.Lock()
+
+
+def subscribe(callback: Callable[[], None]) -> None:
+    """
+    Call `callback` (from the committing thread) after each commit that logged changes.
+    """
+    with _listeners_lock:
+        _listeners.append(callback)
+
+
+def unsubscribe(callback: Callable[[], None]) -> None:
+    with _listeners_lock:
+        if callback in _listeners:
+            _listeners.remove(callback)
+
+
+@event.listens_for(Session, "after_commit")
+def _notify_listeners(session: Session) -> None:
+    if not session.info.pop(_WRITTEN_KEY, False):
+        return
+    with _listeners_lock:
+        listeners = list(_listeners)
+    for callback in listeners:
+        callback()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_written(session: Session) -> None:
+    session.info.pop(_WRITTEN_KEY, None)
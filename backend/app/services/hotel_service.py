@@ -1,43 +1,204 @@
 """
 Hotel-related services for CRUD operations.
 """
-from typing import List
+import re
+from itertools import chain
+from typing import Iterable, List, Optional
+from sqlalchemy import and_, case, column, func, literal_column, or_, select, table, text
 from sqlalchemy.orm import Session
-from app.models.hotel import Hotel, RoomType, RateAdjustment
+from app.models.hotel import Hotel, RoomType, RateAdjustment, HOTEL_SEARCH_TABLE
 from app.schemas.hotel import HotelCreate, HotelUpdate
 from app.schemas.room import RoomTypeCreate, RoomTypeUpdate, RateAdjustmentCreate, RateAdjustmentUpdate
+from app.services import history
 from app.services.base import CRUDBase
+from app.services.sharding import shards
+
+# Lightweight handle on the SQLite FTS5 table (rowid mirrors hotels.id)
+hotel_search_table = table(HOTEL_SEARCH_TABLE, column("rowid"), column("name"), column("location"))
+
+
+def _escape_like(term: str) -> str:
+    """
+    Escape LIKE wildcards so a search term is matched literally.
+    """
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _word_prefix(column, term: str, dialect: str):
+    """
+    SQL condition: a word of `column` starts with `term` (a run of word characters), ignoring case.
+    """
+    if dialect == "postgresql":
+        # \m matches the start of a word; served by the trigram indexes
+        return column.op("~*")(f"\\m{term}")
+    pattern = _escape_like(term)
+    # At the start, or after the separators common in hotel names and locations
+    return or_(*(
+        column.ilike(f"{before}{pattern}%", escape="\\")
+        for before in ("", "% ", "%-", "%(", "%/", "%,")
+    ))
 
 
 class CRUDHotel(CRUDBase[Hotel, HotelCreate, HotelUpdate]):
     """
     Hotel-specific CRUD operations.
     """
-    pass
+    change_entity = history.HOTEL
+    sharded = True
+
+    def search(self, db: Session, query: str, skip: int = 0, limit: int = 100) -> List[Hotel]:
+        """
+        Search hotels by name or location, best matches first.
+
+        Every word of the query must match (case-insensitively) the start of a
+        word in the name or location. SQLite uses the FTS5 index ranked by bm25;
+        PostgreSQL matches word starts with regular expressions backed by
+        trigram indexes, and other dialects with ILIKE patterns. With shards,
+        each shard's best matches are merged on their ranking, made comparable
+        across shards first (see `_comparable`).
+        """
+        terms = re.findall(r"\w+", query)
+        if not terms:
+            return []
+        if shards.enabled:
+            pages = shards.scatter(
+                db, lambda shard_db: self._comparable(shard_db, self._search(shard_db, query, terms, 0, skip + limit))
+            )
+            rows = sorted(chain.from_iterable(pages), key=lambda row: tuple(row[1:]))
+            return [row[0] for row in rows[skip:skip + limit]]
+        return [row[0] for row in self._search(db, query, terms, skip, limit)]
+
+    def _search(self, db: Session, query: str, terms: List[str], skip: int, limit: int) -> List[tuple]:
+        """
+        Matching (hotel, *ranking keys) rows, ordered by the keys (ascending).
+        """
+        dialect = db.get_bind().dialect.name
+        if dialect == "sqlite":
+            match = " ".join(f'"{term}"*' for term in terms)
+            # Name matches weigh more than location matches
+            ranking = [literal_column(f"bm25({HOTEL_SEARCH_TABLE}, 10.0, 5.0)"), Hotel.id]
+            return (
+                db.query(Hotel, *ranking)
+                .join(hotel_search_table, hotel_search_table.c.rowid == Hotel.id)
+                .filter(text(f"{HOTEL_SEARCH_TABLE} MATCH :match").bindparams(match=match))
+                .order_by(*ranking)
+                .offset(skip)
+                .limit(limit)
+                .all()
+            )
+
+        conditions = [
+            or_(_word_prefix(Hotel.name, term, dialect), _word_prefix(Hotel.location, term, dialect))
+            for term in terms
+        ]
+        prefix = f"{_escape_like(' '.join(terms))}%"
+        ranking = [case(
+            (Hotel.name.ilike(prefix, escape="\\"), 0),
+            (Hotel.location.ilike(prefix, escape="\\"), 1),
+            else_=2,
+        )]
+        if dialect == "postgresql":
+            ranking.append(-func.similarity(Hotel.name, query))
+        ranking.append(Hotel.name)
+        return (
+            db.query(Hotel, *ranking)
+            .filter(and_(*conditions))
+            .order_by(*ranking)
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
+
+    @staticmethod
+    def _comparable(db: Session, rows: List[tuple]) -> List[tuple]:
+        """
+        One shard's `_search` rows with ranking keys comparable to other shards'.
+
+        bm25 depends on the term statistics of the index it comes from, so
+        SQLite scores are scaled by the shard's best one: -1.0 for each shard's
+        best match, closer to 0 for weaker ones. The other dialects' keys
+        depend on the row alone and are kept.
+        """
+        if not rows or db.get_bind().dialect.name != "sqlite":
+            return rows
+        best = rows[0][1]
+        return [(hotel, -score / best if best else 0.0, hotel_id) for hotel, score, hotel_id in rows]
+
+    def sync_search_index(self, db: Session, hotel_ids: Iterable[int]) -> None:
+        """
+        Refresh the SQLite full-text rows of `hotel_ids` from the hotels table.
+
+        Hotels that no longer exist are dropped from the index.
+        """
+        hotel_ids = list(set(hotel_ids))
+        if not hotel_ids or db.get_bind().dialect.name != "sqlite":
+            return
+        db.execute(hotel_search_table.delete().where(hotel_search_table.c.rowid.in_(hotel_ids)))
+        db.execute(hotel_search_table.insert().from_select(
+            ["rowid", "name", "location"],
+            select(Hotel.id, Hotel.name, Hotel.location).where(Hotel.id.in_(hotel_ids)),
+        ))
+
+    def _after_write(self, db: Session, action: str, db_obj: Hotel) -> None:
+        """
+        Keep the SQLite full-text index in step with hotel writes.
+        """
+        self.sync_search_index(db, [db_obj.id])
+
+    def _hotel_id(self, values: dict) -> Optional[int]:
+        return values.get("id")
 
 
 class CRUDRoomType(CRUDBase[RoomType, RoomTypeCreate, RoomTypeUpdate]):
     """
     Room Type-specific CRUD operations.
     """
+    change_entity = history.ROOM_TYPE
+    sharded = True
     
     def get_by_hotel(self, db: Session, hotel_id: int) -> List[RoomType]:
         """
         Get all room types for a specific hotel.
         """
-        return db.query(RoomType).filter(RoomType.hotel_id == hotel_id).all()
+        with shards.session(db, hotel_id) as db:
+            return db.query(RoomType).filter(RoomType.hotel_id == hotel_id).all()
+
+    def _hotel_id(self, values: dict) -> Optional[int]:
+        return values.get("hotel_id")
 
 
 class CRUDRateAdjustment(CRUDBase[RateAdjustment, RateAdjustmentCreate, RateAdjustmentUpdate]):
     """
     Rate Adjustment-specific CRUD operations.
     """
+    change_entity = history.RATE_ADJUSTMENT
+    sharded = True
     
     def get_by_room_type(self, db: Session, room_type_id: int) -> List[RateAdjustment]:
         """
         Get all rate adjustments for a specific room type
         """
-        return db.query(RateAdjustment).filter(RateAdjustment.room_type_id == room_type_id).all()
+        with shards.record_session(db, RoomType, room_type_id) as db:
+            if db is None:
+                return []
+            return db.query(RateAdjustment).filter(RateAdjustment.room_type_id == room_type_id).all()
+
+    def get_values_by_room_type(self, db: Session, room_type_id: int) -> Optional[List[dict]]:
+        """
+        Rate adjustments of a room type as dicts of their columns (see `get_values`).
+
+        None when the room type does not exist, checked on the same session.
+        """
+        with shards.record_session(db, RoomType, room_type_id) as db:
+            if db is None or db.scalar(select(RoomType.id).where(RoomType.id == room_type_id)) is None:
+                return None
+            return self._values(
+                db, select(*self.value_columns).where(RateAdjustment.room_type_id == room_type_id)
+            )
+
+    def _hotel_id(self, values: dict) -> Optional[int]:
+        room_type_id = values.get("room_type_id")
+        return None if room_type_id is None else shards.hotel_of(RoomType, room_type_id)
 
 # Service instances for dependency injection
 hotel = CRUDHotel(Hotel)
@@ -0,0 +1,220 @@
+"""
+Idempotency keys for create requests.
+
+A client retrying a create request (after a timeout, say) sends it again with
+the same Idempotency-Key header and gets the first request's response back
+instead of a second write. `begin` reserves the key in its own committed
+transaction before the request runs, so a retry arriving while the first
+attempt still runs is refused (IdempotencyKeyInUse) rather than run twice.
+`complete` stores the response; `release` drops the reservation of a request
+that failed on the server, so that it can be retried. Both only touch the
+row of their own reservation (same fingerprint and created_at), not one a
+retry took over after IDEMPOTENCY_LOCK_SECONDS.
+
+Completed responses are cached (IDEMPOTENCY namespace) in front of the
+`idempotency_keys` table. Keys expire after IDEMPOTENCY_KEY_TTL_SECONDS and
+expired rows are swept at most every IDEMPOTENCY_SWEEP_SECONDS by the next
+request that reserves a key. A reservation older than IDEMPOTENCY_LOCK_SECONDS
+belongs to a request that died with its worker and may be taken over.
+"""
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import NamedTuple, Optional
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import IntegrityError
+from app.core.cache import MISS, get_cache
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.idempotency import IdempotencyKey
+from app.services.history import utcnow
+
+# Cache namespace of completed responses, keyed by "user_id:key"
+IDEMPOTENCY = "idempotency"
+
+
+class StoredResponse(NamedTuple):
+    status_code: int
+    content_type: Optional[str]
+    body: bytes
+
+
+class Reservation(NamedTuple):
+    """
+    A key reserved by a running request.
+    """
+    user_id: int
+    key: str
+    fingerprint: str
+    created_at: datetime
+    expires_at: datetime
+
+
+class IdempotencyError(Exception):
+    """
+    Base class for requests that cannot be run under their idempotency key.
+    """
+
+
+class IdempotencyKeyInUse(IdempotencyError):
+    """
+    Another request with the same key is still running.
+    """
+
+
+class IdempotencyKeyReused(IdempotencyError):
+    """
+    The key was already used for a different request.
+    """
+
+
+class IdempotentReplay(Exception):
+    """
+    Raised to answer a retried request with the stored response.
+    """
+
+    def __init__(self, response: StoredResponse):
+        super().__init__(response.status_code)
+        self.response = response
+
+
+def _cache_key(user_id: int, key: str) -> str:
+    return f"{user_id}:{key}"
+
+
+def _held_by(reservation: Reservation) -> tuple:
+    """
+    Conditions matching the row of a reservation that is still in progress.
+    """
+    return (
+        IdempotencyKey.user_id == reservation.user_id,
+        IdempotencyKey.key == reservation.key,
+        IdempotencyKey.fingerprint == reservation.fingerprint,
+        IdempotencyKey.created_at == reservation.created_at,
+        IdempotencyKey.status_code.is_(None),
+    )
+
+
+class IdempotencyStore:
+    """
+    Reservations and stored responses of idempotency keys, per user.
+    """
+
+    def __init__(self, session_factory=None):
+        self.session_factory = session_factory or SessionLocal
+        self._sweep_lock = threading.Lock()
+        self._next_sweep = 0.0
+
+    def begin(self, user_id: int, key: str, fingerprint: str) -> Reservation:
+        """
+        Reserve `key` for a request.
+
+        `fingerprint` identifies the request; a key is only replayed for the
+        same request. Raises IdempotentReplay with the stored response,
+        IdempotencyKeyInUse or IdempotencyKeyReused.
+        """
+        cached = get_cache().get(IDEMPOTENCY, _cache_key(user_id, key))
+        if cached is not MISS:
+            stored_fingerprint, response = cached
+            raise IdempotentReplay(self._replay(fingerprint, stored_fingerprint, response))
+
+        self.sweep_if_due()
+        now = utcnow()
+        with self.session_factory() as db:
+            row = db.scalars(
+                select(IdempotencyKey).where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key)
+            ).first()
+            abandoned = now - timedelta(seconds=settings.IDEMPOTENCY_LOCK_SECONDS)
+            if row is not None and (row.expires_at <= now or (row.status_code is None and row.created_at <= abandoned)):
+                # A later created_at than the old reservation's tells the two apart
+                now = max(now, row.created_at + timedelta(microseconds=1))
+                db.delete(row)
+                db.flush()
+                row = None
+
+            if row is None:
+                reservation = Reservation(
+                    user_id, key, fingerprint, now, now + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL_SECONDS)
+                )
+                db.add(IdempotencyKey(
+                    user_id=user_id, key=key, fingerprint=fingerprint,
+                    created_at=reservation.created_at, expires_at=reservation.expires_at,
+                ))
+                try:
+                    db.commit()
+                except IntegrityError:
+                    # Reserved by a concurrent request in the meantime
+                    db.rollback()
+                    raise IdempotencyKeyInUse("A request with this Idempotency-Key is in progress")
+                return reservation
+
+            if row.status_code is None:
+                if row.fingerprint != fingerprint:
+                    raise IdempotencyKeyReused("Idempotency-Key was already used for a different request")
+                raise IdempotencyKeyInUse("A request with this Idempotency-Key is in progress")
+            response = StoredResponse(row.status_code, row.content_type, row.body)
+            self._cache(user_id, key, row.fingerprint, response, row.expires_at)
+            raise IdempotentReplay(self._replay(fingerprint, row.fingerprint, response))
+
+    def complete(self, reservation: Reservation, response: StoredResponse) -> bool:
+        """
+        Store the response of the request holding `reservation`.
+
+        Returns False if the reservation was taken over by a retry meanwhile.
+        """
+        with self.session_factory() as db:
+            stored = db.execute(
+                update(IdempotencyKey)
+                .where(*_held_by(reservation))
+                .values(status_code=response.status_code, content_type=response.content_type, body=response.body)
+            ).rowcount
+            db.commit()
+        if stored:
+            self._cache(reservation.user_id, reservation.key, reservation.fingerprint, response, reservation.expires_at)
+        return bool(stored)
+
+    def release(self, reservation: Reservation) -> None:
+        """
+        Drop `reservation` without storing a response.
+        """
+        with self.session_factory() as db:
+            db.execute(delete(IdempotencyKey).where(*_held_by(reservation)))
+            db.commit()
+
+    def sweep(self) -> int:
+        """
+        Delete expired keys; returns how many.
+        """
+        with self.session_factory() as db:
+            deleted = db.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at <= utcnow())).rowcount
+            db.commit()
+        return deleted
+
+    def sweep_if_due(self) -> None:
+        """
+        Sweep when IDEMPOTENCY_SWEEP_SECONDS have passed since this process last did.
+        """
+        now = time.monotonic()
+        if now < self._next_sweep or not self._sweep_lock.acquire(blocking=False):
+            return
+        try:
+            self._next_sweep = now + settings.IDEMPOTENCY_SWEEP_SECONDS
+            self.sweep()
+        finally:
+            self._sweep_lock.release()
+
+    @staticmethod
+    def _replay(fingerprint: str, stored_fingerprint: str, response: StoredResponse) -> StoredResponse:
+        if stored_fingerprint != fingerprint:
+            raise IdempotencyKeyReused("Idempotency-Key was already used for a different request")
+        return response
+
+    @staticmethod
+    def _cache(user_id: int, key: str, fingerprint: str, response: StoredResponse, expires_at: datetime) -> None:
+        # Cached no longer than the row lives
+        ttl = (expires_at - utcnow()).total_seconds()
+        if ttl > 0:
+            get_cache().set(IDEMPOTENCY, _cache_key(user_id, key), (fingerprint, response), ttl=ttl)
+
+
+idempotency_store = IdempotencyStore()
@@ -0,0 +1,78 @@
+"""
+Cache invalidation for hotel, room type and rate adjustment writes.
+
+Affected cache tags are collected on the session as writes are flushed and
+published once the transaction commits (and dropped if it rolls back), so
+every worker evicts entries derived from the changed records. Bulk statements
+that bypass the ORM unit of work register their tags with `mark`.
+"""
+from typing import Hashable, Optional, Set, Tuple
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from app.core.cache import get_cache
+from app.models.hotel import Hotel, RoomType, RateAdjustment
+
+# Cache namespaces, tagged by record id (rates are tagged by room type id)
+HOTELS = "hotels"
+ROOM_TYPES = "room_types"
+RATES = "rates"
+
+_PENDING_KEY = "pending_cache_invalidations"
+
+
+def mark(db: Session, namespace: str, tag: Optional[Hashable] = None) -> None:
+    """
+    Invalidate `namespace`/`tag` once the session's transaction commits.
+    """
+    db.info.setdefault(_PENDING_KEY, set()).add((namespace, tag))
+
+
+def has_pending(db: Session) -> bool:
+    """
+    True when the session holds uncommitted writes that affect cached data.
+
+    Reads in such a session must bypass the cache, both to see their own writes
+    and to avoid caching values that may be rolled back.
+    """
+    return bool(db.info.get(_PENDING_KEY))
+
+
+def _history_values(obj, attribute: str) -> Set:
+    """
+    Current and previous (pre-flush) values of an attribute.
+    """
+    history = inspect(obj).attrs[attribute].history
+    values = {getattr(obj, attribute)}
+    values.update(history.deleted or ())
+    values.discard(None)
+    return values
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_invalidations(session: Session, flush_context) -> None:
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Hotel):
+            mark(session, HOTELS, obj.id)
+        elif isinstance(obj, RoomType):
+            mark(session, ROOM_TYPES, obj.id)
+            mark(session, RATES, obj.id)
+            for hotel_id in _history_values(obj, "hotel_id"):
+                mark(session, HOTELS, hotel_id)
+        elif isinstance(obj, RateAdjustment):
+            for room_type_id in _history_values(obj, "room_type_id"):
+                mark(session, RATES, room_type_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_invalidations(session: Session) -> None:
+    pending: Set[Tuple[str, Optional[Hashable]]] = session.info.pop(_PENDING_KEY, set())
+    if not pending:
+        return
+    cache = get_cache()
+    for namespace, tag in pending:
+        cache.invalidate(namespace, tag)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_invalidations(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,362 @@
+"""
+Background jobs for rate work too long for a request (calendars, bulk writes).
+
+The `jobs` table is the queue, so nothing beyond the application database is
+needed. `JobRunner.submit` stores a queued job; worker threads in every
+application process claim queued jobs with a conditional UPDATE (only one
+claimer wins), run the handler registered for the job's kind and store its
+result.
+
+Handlers work in chunks: `JobContext.commit_chunk` commits the chunk's writes
+together with the job's progress and checkpoint, so a job interrupted by a
+shutdown or a crash resumes after its last committed chunk. While a job runs,
+its worker refreshes the heartbeat; a running job whose heartbeat stops for
+JOB_STALE_SECONDS is requeued, up to JOB_MAX_ATTEMPTS, and each process looks
+for those every JOB_REQUEUE_CHECK_SECONDS.
+
+A claim is identified by the job's `attempts` after claiming it. Every write to
+a running job is conditional on that claim, so a worker whose job was requeued
+in the meantime rolls its chunk back and gives the job up instead of racing the
+worker that claimed it next.
+"""
+import logging
+import threading
+import time
+from datetime import timedelta
+from typing import Any, Callable, Dict, List, Optional, Set
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.job import Job
+from app.services.history import utcnow
+from app.services.sharding import shards
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+# Longest error message stored on a failed job
+MAX_ERROR_LENGTH = 1000
+
+_HANDLERS: Dict[str, Callable[["JobContext"], Any]] = {}
+
+# Kinds working on hotel data in the primary database only (see app.services.sharding)
+_PRIMARY_ONLY: Set[str] = set()
+
+
+def handler(kind: str, primary_only: bool = False):
+    """
+    Register the function that runs jobs of `kind`.
+
+    It receives a JobContext and returns the job's JSON-serialisable result.
+    Jobs of a `primary_only` kind are refused while hotel data is sharded.
+    """
+    def register(function):
+        _HANDLERS[kind] = function
+        if primary_only:
+            _PRIMARY_ONLY.add(kind)
+        return function
+    return register
+
+
+def _require_unsharded(kind: str) -> None:
+    if kind in _PRIMARY_ONLY:
+        shards.require_unsharded(f"The {kind} job")
+
+
+class JobInterrupted(Exception):
+    """
+    Raised at a chunk boundary when the runner shuts down; the job is requeued.
+    """
+    pass
+
+
+class JobLost(Exception):
+    """
+    Raised at a chunk boundary when the job was requeued or claimed again since
+    this worker claimed it; the chunk is rolled back.
+    """
+    pass
+
+
+def _owned(job_id: int, attempt: int):
+    """
+    UPDATE of a job that matches only while it is still running under the claim `attempt`.
+    """
+    return (
+        update(Job)
+        .where(Job.id == job_id, Job.attempts == attempt, Job.status == RUNNING)
+        .execution_options(synchronize_session=False)
+    )
+
+
+class JobContext:
+    """
+    What a handler sees of its job: parameters, checkpoint and a session.
+    """
+
+    def __init__(self, db: Session, job: Job, runner: "JobRunner"):
+        self.db = db
+        self.job = job
+        self.params: Dict[str, Any] = job.params
+        # State saved with the last committed chunk, None on the first attempt
+        self.checkpoint: Optional[Dict[str, Any]] = job.checkpoint
+        self.progress = job.progress
+        # The claim this context works under (see _owned)
+        self.attempt = job.attempts
+        self._runner = runner
+
+    def set_total(self, total: int) -> None:
+        self.job.total = total
+
+    def commit_chunk(self, done: int, checkpoint: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Commit the chunk's writes along with the progress and resume state.
+
+        Raises JobLost, with the chunk rolled back, if the job is no longer
+        this worker's, and JobInterrupted after committing if the runner is
+        shutting down.
+        """
+        owned = self.db.execute(
+            _owned(self.job.id, self.attempt)
+            .values(progress=done, checkpoint=checkpoint, total=self.job.total, heartbeat_at=utcnow())
+        ).rowcount
+        if not owned:
+            self.db.rollback()
+            raise JobLost()
+        self.db.commit()
+        self.progress = done
+        self.checkpoint = checkpoint
+        if self._runner.stopping:
+            raise JobInterrupted()
+
+
+class JobRunner:
+    """
+    Pool of worker threads executing queued jobs.
+    """
+
+    def __init__(self, session_factory=None, workers: Optional[int] = None):
+        self.session_factory = session_factory or SessionLocal
+        self.workers = settings.JOB_WORKERS if workers is None else workers
+        self.stopping = False
+        self._threads: List[threading.Thread] = []
+        self._condition = threading.Condition()
+        self._submitted = 0
+        self._requeue_lock = threading.Lock()
+        self._next_requeue = 0.0
+
+    def submit(self, db: Session, kind: str, params: Dict[str, Any], created_by: Optional[int] = None) -> Job:
+        """
+        Queue a job and wake an idle worker.
+        """
+        if kind not in _HANDLERS:
+            raise ValueError(f"Unknown job kind: {kind}")
+        _require_unsharded(kind)
+        job = Job(kind=kind, status=QUEUED, params=params, created_by=created_by,
+                  progress=0, attempts=0, created_at=utcnow())
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        with self._condition:
+            self._submitted += 1
+            self._condition.notify()
+        return job
+
+    def get(self, db: Session, job_id: int) -> Optional[Job]:
+        return db.get(Job, job_id)
+
+    def get_multi(self, db: Session, skip: int = 0, limit: int = 100) -> List[Job]:
+        """
+        Jobs, newest first.
+        """
+        return db.query(Job).order_by(Job.id.desc()).offset(skip).limit(limit).all()
+
+    def start(self) -> None:
+        """
+        Start the worker threads (no-op when already running or workers is 0).
+        """
+        if self._threads:
+            return
+        self.stopping = False
+        for number in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"job-worker-{number}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def shutdown(self, timeout: Optional[float] = None) -> None:
+        """
+        Stop the workers; running jobs stop after their current chunk and are requeued.
+        """
+        self.stopping = True
+        with self._condition:
+            self._condition.notify_all()
+        # `timeout` bounds the whole shutdown, not each thread
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+        self._threads = []
+
+    def run_pending(self, limit: Optional[int] = None) -> int:
+        """
+        Run queued jobs in the calling thread until none are left (or `limit` ran).
+
+        Returns the number of jobs run.
+        """
+        count = 0
+        while limit is None or count < limit:
+            if not self._run_next():
+                break
+            count += 1
+        return count
+
+    def _work(self) -> None:
+        while not self.stopping:
+            try:
+                ran = self._run_next()
+            except Exception:
+                logger.exception("Job worker failed to claim a job")
+                ran = False
+            if ran:
+                continue
+            # Idle: sleep until a submit in this process, or poll for jobs
+            # submitted by other processes and for stalled ones
+            with self._condition:
+                self._condition.wait_for(lambda: self._submitted or self.stopping, settings.JOB_POLL_SECONDS)
+                if self._submitted:
+                    self._submitted -= 1
+
+    def _run_next(self) -> bool:
+        with self.session_factory() as db:
+            if self._requeue_due():
+                self._requeue_stalled(db)
+            job = self._claim(db)
+            if job is None:
+                return False
+            self._run(db, job)
+            return True
+
+    def _claim(self, db: Session) -> Optional[Job]:
+        """
+        Mark the oldest queued job as running; None when the queue is empty.
+        """
+        while True:
+            job_id = db.scalar(select(Job.id).where(Job.status == QUEUED).order_by(Job.id).limit(1))
+            if job_id is None:
+                db.commit()
+                return None
+            now = utcnow()
+            claimed = db.execute(
+                update(Job)
+                .where(Job.id == job_id, Job.status == QUEUED)
+                .values(status=RUNNING, started_at=now, heartbeat_at=now, attempts=Job.attempts + 1)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            db.commit()
+            if claimed:
+                return db.get(Job, job_id, populate_existing=True)
+            # Another worker took it first; try the next one
+
+    def _requeue_due(self) -> bool:
+        """
+        True for one worker thread once every JOB_REQUEUE_CHECK_SECONDS.
+        """
+        now = time.monotonic()
+        if now < self._next_requeue or not self._requeue_lock.acquire(blocking=False):
+            return False
+        try:
+            if now < self._next_requeue:
+                return False
+            self._next_requeue = now + settings.JOB_REQUEUE_CHECK_SECONDS
+            return True
+        finally:
+            self._requeue_lock.release()
+
+    def _requeue_stalled(self, db: Session) -> None:
+        """
+        Requeue running jobs whose worker stopped committing (e.g. the process died).
+
+        Checked with a read first, so the usual case takes no write lock.
+        """
+        is_stalled = (
+            Job.status == RUNNING,
+            Job.heartbeat_at < utcnow() - timedelta(seconds=settings.JOB_STALE_SECONDS),
+        )
+        if db.scalar(select(Job.id).where(*is_stalled).limit(1)) is None:
+            return
+        stalled = update(Job).where(*is_stalled).execution_options(synchronize_session=False)
+        db.execute(
+            stalled.where(Job.attempts >= settings.JOB_MAX_ATTEMPTS)
+            .values(status=FAILED, error="Job stalled too many times", finished_at=utcnow())
+        )
+        db.execute(stalled.values(status=QUEUED))
+        db.commit()
+
+    def _run(self, db: Session, job: Job) -> None:
+        job_id, kind, attempt = job.id, job.kind, job.attempts
+        run = _HANDLERS.get(kind)
+        stop = threading.Event()
+        keep_alive = threading.Thread(
+            target=self._keep_alive, args=(job_id, attempt, stop), name=f"job-{job_id}-heartbeat", daemon=True
+        )
+        keep_alive.start()
+        try:
+            try:
+                if run is None:
+                    raise ValueError(f"Unknown job kind: {kind}")
+                # Queued before shards were configured
+                _require_unsharded(kind)
+                result = run(JobContext(db, job, self))
+            except JobLost:
+                logger.warning("Job %s (%s) was requeued while running; leaving it to its new worker", job_id, kind)
+                return
+            except JobInterrupted:
+                db.execute(_owned(job_id, attempt).values(status=QUEUED))
+                db.commit()
+                return
+            except Exception as exc:
+                logger.exception("Job %s (%s) failed", job_id, kind)
+                # Chunks committed before the failure stay; the rest is discarded
+                db.rollback()
+                db.execute(_owned(job_id, attempt).values(
+                    status=FAILED, error=f"{type(exc).__name__}: {exc}"[:MAX_ERROR_LENGTH], finished_at=utcnow()
+                ))
+                db.commit()
+                return
+            now = utcnow()
+            if not db.execute(
+                _owned(job_id, attempt).values(status=SUCCEEDED, result=result, finished_at=now, heartbeat_at=now)
+            ).rowcount:
+                # The result's writes (e.g. the stored calendar) go with the claim
+                db.rollback()
+                logger.warning("Job %s (%s) was requeued while running; discarding its result", job_id, kind)
+                return
+            db.commit()
+        finally:
+            stop.set()
+            keep_alive.join()
+
+    def _keep_alive(self, job_id: int, attempt: int, stop: threading.Event) -> None:
+        """
+        Refresh the heartbeat of a running job between chunks, until `stop` is set
+        or the job is no longer this worker's.
+        """
+        while not stop.wait(settings.JOB_STALE_SECONDS / 3):
+            try:
+                with self.session_factory() as db:
+                    owned = db.execute(_owned(job_id, attempt).values(heartbeat_at=utcnow())).rowcount
+                    db.commit()
+            except Exception:
+                # E.g. the database is locked by the job's own transaction; try again later
+                logger.exception("Failed to refresh the heartbeat of job %s", job_id)
+                continue
+            if not owned:
+                return
+
+
+# Process-wide runner, started with the application
+job_runner = JobRunner()
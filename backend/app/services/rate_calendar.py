@@ -0,0 +1,226 @@
+"""
+Portfolio-wide rate calendar builds across a process pool.
+
+Room type ids are split into contiguous ranges with about the same number of
+room types. Each worker process opens its own connection, streams its range's
+adjustments in room type order and prices every room type with one sweep over
+its interval index (see RateService), returning compact int64 arrays of cents.
+The parent replaces the `rate_calendar` table with the results in bulk, in a
+single transaction.
+
+Pricing is CPU-bound Python, so partitions run in separate processes rather
+than threads. Databases that other processes cannot open (in-memory SQLite)
+are built in the calling process.
+"""
+from array import array
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date, timedelta
+from itertools import groupby
+from multiprocessing import get_context
+from operator import itemgetter
+from typing import Callable, Iterator, List, Optional, Tuple
+from sqlalchemy import BigInteger, Date, DateTime, column, create_engine, delete, insert, or_, select, table
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.hotel import RoomType, RateAdjustment
+from app.services.history import utcnow
+from app.services.rate_service import _ADJUSTMENT_CENTS, _BASE_RATE_CENTS, _build_timeline, _daily_rates
+from app.services.sharding import shards
+
+# Partitions per worker: smaller partitions even out room types with many adjustments
+PARTITIONS_PER_WORKER = 4
+
+# Adjustment rows fetched per round trip while streaming a partition
+STREAM_BATCH_SIZE = 5000
+
+# Calendar rows per INSERT executemany
+WRITE_BATCH_SIZE = 10_000
+
+# The calendar table with raw cents, skipping the Decimal conversion of the Money type
+_calendar_rows = table(
+    "rate_calendar",
+    column("room_type_id"),
+    column("rate_date", Date),
+    column("effective_rate_cents", BigInteger),
+    column("built_at", DateTime),
+)
+
+
+def partition(room_type_ids: List[int], partitions: int) -> List[Tuple[int, int]]:
+    """
+    Split sorted ids into at most `partitions` inclusive (first_id, last_id) ranges.
+    """
+    if not room_type_ids:
+        return []
+    size = -(-len(room_type_ids) // max(1, partitions))
+    return [
+        (room_type_ids[offset], room_type_ids[min(offset + size, len(room_type_ids)) - 1])
+        for offset in range(0, len(room_type_ids), size)
+    ]
+
+
+def compute_partition(
+    connection: Connection, first_id: int, last_id: int, start_date: date, days: int
+) -> Tuple[array, array]:
+    """
+    Price every room type with an id from first_id to last_id for `days` dates.
+
+    Returns (room type ids, rates): rates holds `days` cents per room type, in
+    the order of the ids.
+    """
+    end_date = start_date + timedelta(days=days - 1)
+    base_rates = connection.execute(
+        select(RoomType.id, _BASE_RATE_CENTS).where(RoomType.id.between(first_id, last_id)).order_by(RoomType.id)
+    ).all()
+    adjustments = connection.execute(
+        select(
+            RateAdjustment.room_type_id,
+            RateAdjustment.effective_date,
+            RateAdjustment.end_date,
+            RateAdjustment.priority,
+            RateAdjustment.id,
+            _ADJUSTMENT_CENTS,
+        )
+        .where(
+            RateAdjustment.room_type_id.between(first_id, last_id),
+            RateAdjustment.effective_date <= end_date,
+            or_(RateAdjustment.end_date.is_(None), RateAdjustment.end_date >= start_date),
+        )
+        .order_by(RateAdjustment.room_type_id, RateAdjustment.effective_date, RateAdjustment.id)
+        .execution_options(yield_per=STREAM_BATCH_SIZE)
+    )
+
+    ids, rates = array("q"), array("q")
+    groups = groupby(adjustments, key=itemgetter(0))
+    group = next(groups, None)
+    for room_type_id, base_rate in base_rates:
+        while group is not None and group[0] < room_type_id:
+            group = next(groups, None)
+        timeline = ([], [])
+        if group is not None and group[0] == room_type_id:
+            timeline = _build_timeline([tuple(row[1:]) for row in group[1]])
+            group = next(groups, None)
+        ids.append(room_type_id)
+        rates.extend(_daily_rates(base_rate, *timeline, start_date, days))
+    return ids, rates
+
+
+_worker_engine = None
+
+
+def _init_worker(database_url: str) -> None:
+    global _worker_engine
+    _worker_engine = create_engine(database_url)
+
+
+def _compute_in_worker(first_id: int, last_id: int, start_date: date, days: int) -> Tuple[array, array]:
+    with _worker_engine.connect() as connection:
+        return compute_partition(connection, first_id, last_id, start_date, days)
+
+
+def _shareable(db: Session) -> bool:
+    url = db.get_bind().url
+    return not (url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"))
+
+
+def _compute(db: Session, ranges: List[Tuple[int, int]], start_date: date, days: int, workers: int) -> Iterator:
+    """
+    Yield (ids, rates) per partition as partitions complete.
+    """
+    if workers <= 1 or len(ranges) <= 1 or not _shareable(db):
+        for first_id, last_id in ranges:
+            yield compute_partition(db.connection(), first_id, last_id, start_date, days)
+        return
+    database_url = db.get_bind().url.render_as_string(hide_password=False)
+    # "spawn": the parent may run other threads (API, job workers), which fork does not handle safely
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=get_context("spawn"), initializer=_init_worker, initargs=(database_url,)
+    ) as pool:
+        futures = [pool.submit(_compute_in_worker, first_id, last_id, start_date, days) for first_id, last_id in ranges]
+        try:
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            # Abandoned early (error, interrupted job): skip partitions not started yet
+            pool.shutdown(cancel_futures=True)
+
+
+def build_portfolio_calendar(
+    db: Session,
+    start_date: date,
+    days: int,
+    workers: Optional[int] = None,
+    write: bool = True,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+) -> dict:
+    """
+    Compute the rate calendar of every room type and replace the stored one.
+
+    `on_progress(done, total)` is called as partitions complete. The calendar
+    is written (unless `write` is False) once all partitions are in and is
+    left uncommitted for the caller, so it replaces the previous calendar
+    atomically. Refused (ShardingUnsupported) while hotel data is sharded.
+    """
+    shards.require_unsharded("The stored rate calendar")
+    room_type_ids = db.scalars(select(RoomType.id).order_by(RoomType.id)).all()
+    workers = max(1, workers or settings.RATE_CALENDAR_WORKERS)
+    ranges = partition(room_type_ids, workers * PARTITIONS_PER_WORKER if workers > 1 else 1)
+
+    results = []
+    done = 0
+    for ids, rates in _compute(db, ranges, start_date, days, workers):
+        results.append((ids, rates))
+        done += len(ids)
+        if on_progress is not None:
+            on_progress(done, len(room_type_ids))
+
+    if write:
+        _write(db, results, start_date, days)
+    return {
+        "start_date": start_date.isoformat(),
+        "days": days,
+        "room_types": done,
+        "rows": done * days,
+        "workers": workers,
+    }
+
+
+def _write(db: Session, results: List[Tuple[array, array]], start_date: date, days: int) -> None:
+    """
+    Replace the calendar with driver-level executemany batches.
+
+    Dates and the build time are converted for the database once, not once
+    per row, which keeps the write close to the driver's own speed.
+    """
+    connection = db.connection()
+    dialect = connection.dialect
+
+    def bind(type_, value):
+        process = type_.dialect_impl(dialect).bind_processor(dialect)
+        return process(value) if process else value
+
+    dates = [bind(Date(), start_date + timedelta(days=offset)) for offset in range(days)]
+    built_at = bind(DateTime(), utcnow())
+    statement = insert(_calendar_rows).compile(dialect=dialect)
+    keys = [column.key for column in _calendar_rows.columns]
+
+    def flush(rows):
+        connection.exec_driver_sql(
+            str(statement), rows if statement.positional else [dict(zip(keys, row)) for row in rows]
+        )
+
+    connection.execute(delete(_calendar_rows))
+    batch = []
+    for ids, rates in results:
+        for index, room_type_id in enumerate(ids):
+            offset = index * days
+            batch.extend(
+                (room_type_id, rate_date, cents, built_at)
+                for rate_date, cents in zip(dates, rates[offset:offset + days])
+            )
+            if len(batch) >= WRITE_BATCH_SIZE:
+                flush(batch)
+                batch = []
+    if batch:
+        flush(batch)
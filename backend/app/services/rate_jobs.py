@@ -0,0 +1,120 @@
+"""
+Background job handlers for bulk rate work (see app.services.jobs).
+"""
+from datetime import timedelta
+from typing import List
+from sqlalchemy import func, insert, or_, select
+from app.core.config import settings
+from app.core.money import from_cents
+from app.models.hotel import Hotel, RoomType, RateAdjustment
+from app.schemas.job import BulkRateAdjustmentParams, PortfolioRateCalendarParams, RateCalendarParams
+from app.services import history, invalidation
+from app.services.jobs import JobContext, handler
+from app.services.rate_calendar import build_portfolio_calendar
+from app.services.rate_service import RateService
+
+
+@handler("rate_calendar", primary_only=True)
+def rate_calendar(context: JobContext) -> dict:
+    """
+    Effective rate calendar of the selected hotels' room types.
+
+    Room types are priced JOB_CHUNK_SIZE at a time. Nothing is written until
+    the result, so an interrupted calendar starts over.
+    """
+    params = RateCalendarParams.model_validate(context.params)
+    query = select(RoomType.id, RoomType.hotel_id, RoomType.name).join(Hotel, Hotel.id == RoomType.hotel_id)
+    if params.hotel_ids is not None:
+        query = query.where(RoomType.hotel_id.in_(params.hotel_ids))
+    else:
+        query = query.where(Hotel.is_active.is_(True))
+    room_types = context.db.execute(query.order_by(RoomType.hotel_id, RoomType.id)).all()
+    context.set_total(len(room_types))
+
+    rows: List[dict] = []
+    for offset in range(0, len(room_types), settings.JOB_CHUNK_SIZE):
+        chunk = room_types[offset:offset + settings.JOB_CHUNK_SIZE]
+        calendar = RateService.calculate_rate_calendar(
+            context.db, [room_type_id for room_type_id, _, _ in chunk], params.start_date, params.end_date
+        )
+        rows.extend(
+            {
+                "room_type_id": room_type_id,
+                "hotel_id": hotel_id,
+                "name": name,
+                "effective_rates": [float(from_cents(cents)) for cents in calendar[room_type_id]],
+            }
+            for room_type_id, hotel_id, name in chunk
+            if room_type_id in calendar
+        )
+        context.commit_chunk(offset + len(chunk))
+
+    days = (params.end_date - params.start_date).days + 1
+    return {
+        "dates": [(params.start_date + timedelta(days=offset)).isoformat() for offset in range(days)],
+        "room_types": rows,
+    }
+
+
+@handler("bulk_rate_adjustment", primary_only=True)
+def bulk_rate_adjustment(context: JobContext) -> dict:
+    """
+    Create the same rate adjustment for many room types.
+
+    Each chunk's adjustments are committed with the last room type id done, so
+    a resumed job continues after it without creating duplicates.
+    """
+    params = BulkRateAdjustmentParams.model_validate(context.params)
+    targets = []
+    if params.hotel_ids is not None:
+        targets.append(RoomType.hotel_id.in_(params.hotel_ids))
+    if params.room_type_ids is not None:
+        targets.append(RoomType.id.in_(params.room_type_ids))
+    checkpoint = context.checkpoint or {"after_id": 0, "created": 0}
+    if context.job.total is None:
+        context.set_total(context.db.scalar(select(func.count(RoomType.id)).where(or_(*targets))))
+
+    values = params.model_dump(exclude={"hotel_ids", "room_type_ids"})
+    while True:
+        room_type_ids = context.db.scalars(
+            select(RoomType.id)
+            .where(or_(*targets), RoomType.id > checkpoint["after_id"])
+            .order_by(RoomType.id)
+            .limit(settings.JOB_CHUNK_SIZE)
+        ).all()
+        if not room_type_ids:
+            break
+        rows = [{**values, "room_type_id": room_type_id} for room_type_id in room_type_ids]
+        adjustment_ids = context.db.scalars(
+            insert(RateAdjustment).returning(RateAdjustment.id, sort_by_parameter_order=True), rows
+        ).all()
+        history.record(context.db, [
+            history.entry(history.RATE_ADJUSTMENT, "create", adjustment_id, row)
+            for adjustment_id, row in zip(adjustment_ids, rows)
+        ])
+        for room_type_id in room_type_ids:
+            invalidation.mark(context.db, invalidation.RATES, room_type_id)
+        checkpoint = {"after_id": room_type_ids[-1], "created": checkpoint["created"] + len(rows)}
+        context.commit_chunk(context.progress + len(rows), checkpoint)
+
+    return {"created": checkpoint["created"]}
+
+
+@handler("portfolio_rate_calendar", primary_only=True)
+def portfolio_rate_calendar(context: JobContext) -> dict:
+    """
+    Rebuild the stored rate calendar of the whole portfolio.
+
+    Progress is committed as partitions complete; the new calendar is
+    committed together with the job's result, so an interrupted rebuild
+    leaves the previous calendar in place and starts over.
+    """
+    params = PortfolioRateCalendarParams.model_validate(context.params)
+
+    def report(done: int, total: int) -> None:
+        context.set_total(total)
+        context.commit_chunk(done)
+
+    return build_portfolio_calendar(
+        context.db, params.start_date, params.days, workers=params.workers, on_progress=report
+    )
@@ -4,13 +4,126 @@ Rate calculation service for computing effective rates.
 Implements the rate calculation algorithm as per requirements:
     effective_rate = base_rate + adjustment_amount
 
-Where adjustment_amount is from the most recent RateAdjustment
-with effective_date <= target_date.
+Where adjustment_amount comes from the RateAdjustment that covers target_date
+(effective_date <= target_date <= end_date, with no end_date meaning
+open-ended). Where several overlap, the highest priority wins, then the most
+recent effective_date, then the most recently created adjustment.
+
+Money is summed exactly in integer cents (int64 arrays for bulk work) and
+returned as two-place Decimals. With shards (see app.services.sharding), a
+room type's queries run on its hotel's shard; multi-room-type and search
+queries run on every shard in parallel and are merged.
 """
-from datetime import date
-from sqlalchemy import desc
+import heapq
+from array import array
+from bisect import bisect_right
+from datetime import date, datetime, timedelta
+from itertools import chain
+from operator import itemgetter
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import BigInteger, and_, desc, func, or_, select, type_coerce
 from sqlalchemy.orm import Session
-from app.models.hotel import RoomType, RateAdjustment
+from app.core.cache import MISS, get_cache
+from app.core.database import is_replica
+from app.core.money import Money, from_cents
+from app.models.change_log import ChangeLog
+from app.models.hotel import Hotel, RoomType, RateAdjustment
+from app.services import history, invalidation
+from app.services.sharding import shards
+
+
+def _covers(target_date):
+    """
+    SQL condition: the adjustment's date range includes `target_date`.
+    """
+    return and_(
+        RateAdjustment.effective_date <= target_date,
+        or_(RateAdjustment.end_date.is_(None), RateAdjustment.end_date >= target_date),
+    )
+
+
+# Precedence among overlapping adjustments, strongest first
+_PRECEDENCE = (desc(RateAdjustment.priority), desc(RateAdjustment.effective_date), desc(RateAdjustment.id))
+
+# Raw integer cents, skipping the Decimal conversion of the Money type
+_BASE_RATE_CENTS = type_coerce(RoomType.base_rate, BigInteger)
+_ADJUSTMENT_CENTS = type_coerce(RateAdjustment.adjustment_amount, BigInteger)
+
+
+def _build_timeline(adjustments: List[Tuple]) -> Tuple[List[date], array]:
+    """
+    Flatten (possibly overlapping) adjustment ranges into an interval index.
+
+    `adjustments` are (effective_date, end_date, priority, id, cents) tuples
+    sorted by effective_date. Returns (starts, amounts): segment i covers dates
+    from starts[i] up to the next start and is priced with amounts[i], an
+    int64 array of cents (0 where no adjustment applies), so any date resolves
+    with one bisect.
+    """
+    boundaries = sorted(
+        {adjustment[0] for adjustment in adjustments}
+        | {adjustment[1] + timedelta(days=1) for adjustment in adjustments if adjustment[1] is not None}
+    )
+    starts: List[date] = []
+    amounts = array("q")
+    active: List[Tuple] = []
+    position = 0
+    for boundary in boundaries:
+        while position < len(adjustments) and adjustments[position][0] <= boundary:
+            effective_date, end_date, priority, adjustment_id, amount = adjustments[position]
+            heapq.heappush(active, (-priority, -effective_date.toordinal(), -adjustment_id, end_date, amount))
+            position += 1
+        # Drop ended adjustments once they reach the top (lazy deletion)
+        while active and active[0][3] is not None and active[0][3] < boundary:
+            heapq.heappop(active)
+        amount = active[0][4] if active else 0
+        if not amounts or amounts[-1] != amount:
+            starts.append(boundary)
+            amounts.append(amount)
+    return starts, amounts
+
+
+def _daily_rates(base_rate: int, starts: List[date], amounts: array, start_date: date, days: int) -> array:
+    """
+    Effective rate in cents for `days` consecutive dates from `start_date`.
+
+    One sweep over the interval index built by `_build_timeline`: the segment
+    covering start_date, then each later segment that starts in range.
+    """
+    rates = array("q", [base_rate]) * days
+    position = bisect_right(starts, start_date)
+    adjustment_amount = amounts[position - 1] if position else 0
+    offset = 0
+    for segment in range(position, len(starts) + 1):
+        segment_end = min((starts[segment] - start_date).days if segment < len(starts) else days, days)
+        if adjustment_amount:
+            for day in range(offset, segment_end):
+                rates[day] += adjustment_amount
+        offset = segment_end
+        if offset >= days:
+            break
+        adjustment_amount = amounts[segment]
+    return rates
+
+
+def _cache_key(room_type_id: int, target_date: date) -> str:
+    """
+    Key of a room type's effective rate on a date in the RATES cache namespace.
+    """
+    return f"{room_type_id}:{target_date.isoformat()}"
+
+
+def _rate_result(room_type_id: int, base_rate: int, adjustment_amount: int, target_date: date) -> dict:
+    """
+    Effective rate result from a base rate and adjustment in cents.
+    """
+    return {
+        "room_type_id": room_type_id,
+        "base_rate": from_cents(base_rate),
+        "effective_rate": from_cents(base_rate + adjustment_amount),
+        "adjustment_applied": from_cents(adjustment_amount),
+        "effective_date": target_date,
+    }
 
 
 class RateService:
@@ -19,45 +132,372 @@ class RateService:
     """
     
     @staticmethod
-    def calculate_effective_rate(db: Session, room_type_id: int, target_date: date = None):
+    def calculate_effective_rate(
+        db: Session, room_type_id: int, target_date: date = None, as_of: Optional[datetime] = None
+    ):
         """
         Calculate the effective rate for a room type on a specific date.
+
+        Results are cached per (room type, date) and invalidated whenever the
+        room type or one of its adjustments is written; rates read on a
+        replica, or read while such a write committed, are not cached, as
+        they may predate the write. With `as_of` (naive UTC), the rate is
+        computed from the data as it stood at that time.
         """
         if target_date is None:
             target_date = date.today()
+        if as_of is not None:
+            return RateService.calculate_effective_rates_batch(db, [(room_type_id, target_date)], as_of=as_of)[0]
+
+        cache_key = _cache_key(room_type_id, target_date)
+        use_cache = not invalidation.has_pending(db)
+        # A replica may still hold the rate as it was before a write: read it, do not cache it
+        store = use_cache and not is_replica(db)
+        if use_cache:
+            cached = get_cache().get(invalidation.RATES, cache_key)
+            if cached is not MISS:
+                return dict(cached)
+        # Taken before reading, so a write committed before the set below keeps the result out of the cache
+        generation = get_cache().generation(invalidation.RATES, room_type_id)
         
-        # Get the room type
-        room_type = db.query(RoomType).filter(RoomType.id == room_type_id).first()
-        if not room_type:
-            return None
-        
-        # Find the most recent adjustment with effective_date <= target_date
-        # Ordered by effective_date descending to get the latest applicable adjustment
-        latest_adjustment = (
-            db.query(RateAdjustment)
-            .filter(
-                RateAdjustment.room_type_id == room_type_id,
-                RateAdjustment.effective_date <= target_date
+        with shards.record_session(db, RoomType, room_type_id) as db:
+            if db is None:
+                return None
+            # Get the room type
+            room_type = db.query(RoomType).filter(RoomType.id == room_type_id).first()
+            if not room_type:
+                return None
+            
+            # Find the adjustment covering target_date: highest priority first, then
+            # the latest effective_date, ties resolving to the most recently created
+            latest_adjustment = (
+                db.query(RateAdjustment)
+                .filter(
+                    RateAdjustment.room_type_id == room_type_id,
+                    _covers(target_date),
+                )
+                .order_by(*_PRECEDENCE)
+                .first()
             )
-            .order_by(desc(RateAdjustment.effective_date))
-            .first()
-        )
         
         # Calculate effective rate using the formula: base_rate + adjustment_amount
+        # (exact: both are two-place Decimals loaded from integer cents)
         final_rate = room_type.base_rate
-        adjustment_amount = 0.0
+        adjustment_amount = from_cents(0)
         if latest_adjustment:
             adjustment_amount = latest_adjustment.adjustment_amount
             final_rate += adjustment_amount
         
         # Return detailed rate calculation information
-        return {
+        result = {
             "room_type_id": room_type.id,
             "base_rate": room_type.base_rate,
             "effective_rate": final_rate,
             "adjustment_applied": adjustment_amount,
             "effective_date": target_date
         }
+        if store:
+            get_cache().set(invalidation.RATES, cache_key, result, tag=room_type_id, generation=generation)
+        return dict(result)
+
+    @staticmethod
+    def _load_adjustment_timelines(
+        db: Session, room_type_ids: Iterable[int], until: date, since: Optional[date] = None
+    ) -> Dict[int, Tuple[List[date], array]]:
+        """
+        Build the interval index of adjustments applying between `since` and `until`.
+
+        Returns a mapping of room_type_id -> (segment starts, amounts) as built by
+        `_build_timeline`, using a single set-based query. Adjustments that end
+        before `since` are never loaded.
+        """
+        query = db.query(
+            RateAdjustment.room_type_id,
+            RateAdjustment.effective_date,
+            RateAdjustment.end_date,
+            RateAdjustment.priority,
+            RateAdjustment.id,
+            _ADJUSTMENT_CENTS,
+        ).filter(
+            RateAdjustment.room_type_id.in_(list(room_type_ids)),
+            RateAdjustment.effective_date <= until,
+        )
+        if since is not None:
+            query = query.filter(or_(RateAdjustment.end_date.is_(None), RateAdjustment.end_date >= since))
+        rows = query.order_by(RateAdjustment.room_type_id, RateAdjustment.effective_date, RateAdjustment.id).all()
+
+        adjustments: Dict[int, List[Tuple]] = {}
+        for room_type_id, *adjustment in rows:
+            adjustments.setdefault(room_type_id, []).append(tuple(adjustment))
+        return {
+            room_type_id: _build_timeline(room_type_adjustments)
+            for room_type_id, room_type_adjustments in adjustments.items()
+        }
+
+    @staticmethod
+    def _load_rates(
+        db: Session, room_type_ids: Iterable[int], until: date, since: date, as_of: Optional[datetime] = None
+    ) -> Tuple[Dict[int, int], Dict[int, Tuple[List[date], array]]]:
+        """
+        Base rates (cents) and adjustment timelines of the room types that exist.
+
+        Current data, or as of a past time (see `_load_as_of`); with shards,
+        each shard answers for the room types it holds.
+        """
+        room_type_ids = list(room_type_ids)
+
+        def load(db: Session):
+            if as_of is not None:
+                return RateService._load_as_of(db, room_type_ids, as_of)
+            base_rates = dict(
+                db.query(RoomType.id, _BASE_RATE_CENTS).filter(RoomType.id.in_(room_type_ids)).all()
+            )
+            return base_rates, RateService._load_adjustment_timelines(db, base_rates.keys(), until, since=since)
+
+        base_rates: Dict[int, int] = {}
+        timelines: Dict[int, Tuple[List[date], array]] = {}
+        for shard_base_rates, shard_timelines in shards.scatter(db, load):
+            base_rates.update(shard_base_rates)
+            timelines.update(shard_timelines)
+        return base_rates, timelines
+
+    @staticmethod
+    def _load_as_of(
+        db: Session, room_type_ids: Iterable[int], as_of: datetime
+    ) -> Tuple[Dict[int, int], Dict[int, Tuple[List[date], array]]]:
+        """
+        Reconstruct base rates (cents) and adjustment timelines as of a past time.
+
+        Instead of replaying history, each record's latest change log snapshot
+        recorded at or before `as_of` is picked with a window function over the
+        (entity, entity_id, recorded_at) index; removed records are skipped.
+        Adjustments are found through the (entity, room_type_id, recorded_at)
+        index, then filtered on the room type they had at that time.
+        """
+        room_type_ids = list(room_type_ids)
+
+        def latest_snapshots(entity: str, entity_ids):
+            ranked = (
+                select(
+                    ChangeLog,
+                    func.row_number()
+                    .over(
+                        partition_by=ChangeLog.entity_id,
+                        order_by=(desc(ChangeLog.recorded_at), desc(ChangeLog.id)),
+                    )
+                    .label("position"),
+                )
+                .where(
+                    ChangeLog.entity == entity,
+                    ChangeLog.entity_id.in_(entity_ids),
+                    ChangeLog.recorded_at <= as_of,
+                )
+                .subquery()
+            )
+            return select(ranked).where(ranked.c.position == 1, ranked.c.action != history.REMOVE).subquery()
+
+        room_types = latest_snapshots(history.ROOM_TYPE, room_type_ids)
+        base_rates = dict(db.execute(
+            select(room_types.c.entity_id, type_coerce(room_types.c.base_rate_cents, BigInteger))
+        ).all())
+
+        candidate_ids = select(ChangeLog.entity_id).where(
+            ChangeLog.entity == history.RATE_ADJUSTMENT,
+            ChangeLog.room_type_id.in_(list(base_rates)),
+            ChangeLog.recorded_at <= as_of,
+        )
+        adjustments = latest_snapshots(history.RATE_ADJUSTMENT, candidate_ids)
+        rows = db.execute(
+            select(
+                adjustments.c.room_type_id,
+                adjustments.c.effective_date,
+                adjustments.c.end_date,
+                adjustments.c.priority,
+                adjustments.c.entity_id,
+                type_coerce(adjustments.c.adjustment_amount_cents, BigInteger),
+            )
+            .where(adjustments.c.room_type_id.in_(list(base_rates)))
+            .order_by(adjustments.c.room_type_id, adjustments.c.effective_date, adjustments.c.entity_id)
+        ).all()
+
+        grouped: Dict[int, List[Tuple]] = {}
+        for room_type_id, *adjustment in rows:
+            grouped.setdefault(room_type_id, []).append(tuple(adjustment))
+        timelines = {
+            room_type_id: _build_timeline(room_type_adjustments)
+            for room_type_id, room_type_adjustments in grouped.items()
+        }
+        return base_rates, timelines
+
+    @staticmethod
+    def calculate_effective_rates_batch(
+        db: Session, items: List[Tuple[int, date]], as_of: Optional[datetime] = None
+    ) -> List[Optional[dict]]:
+        """
+        Calculate effective rates for arbitrary (room_type_id, target_date) pairs.
+
+        Uses one query for the room types and one for candidate adjustments, then
+        resolves each pair with a binary search over its room type's adjustments.
+        Results are returned in input order, with None for unknown room types.
+        With `as_of`, both are read from the change log instead (see `_load_as_of`).
+        """
+        if not items:
+            return []
+
+        room_type_ids = {room_type_id for room_type_id, _ in items}
+        target_dates = [target_date for _, target_date in items]
+        base_rates, timelines = RateService._load_rates(
+            db, room_type_ids, max(target_dates), min(target_dates), as_of=as_of
+        )
+
+        results: List[Optional[dict]] = []
+        for room_type_id, target_date in items:
+            base_rate = base_rates.get(room_type_id)
+            if base_rate is None:
+                results.append(None)
+                continue
+            starts, amounts = timelines.get(room_type_id, ([], []))
+            # Segment of the interval index containing target_date
+            position = bisect_right(starts, target_date)
+            adjustment_amount = amounts[position - 1] if position else 0
+            results.append(_rate_result(room_type_id, base_rate, adjustment_amount, target_date))
+        return results
+
+    @staticmethod
+    def quote_stay(db: Session, room_type_ids: List[int], check_in: date, check_out: date):
+        """
+        Quote a stay (nights from check_in up to, but excluding, check_out) for several room types.
+
+        All room types and their adjustments are fetched up front; each room type
+        is then priced with a single linear sweep over the stay's nights.
+        Returns None if any requested room type does not exist.
+        """
+        unique_ids = list(dict.fromkeys(room_type_ids))
+        nights = [check_in + timedelta(days=offset) for offset in range((check_out - check_in).days)]
+        base_rates, timelines = RateService._load_rates(db, unique_ids, nights[-1], check_in)
+        if len(base_rates) != len(unique_ids):
+            return None
+
+        quotes = []
+        for room_type_id in unique_ids:
+            base_rate = base_rates[room_type_id]
+            starts, amounts = timelines.get(room_type_id, ([], []))
+            position, count = 0, len(starts)
+            adjustment_amount = 0
+            # Adjustment in cents for each night, then summed exactly
+            night_adjustments = array("q")
+            for night in nights:
+                # Advance to the interval index segment containing this night
+                while position < count and starts[position] <= night:
+                    adjustment_amount = amounts[position]
+                    position += 1
+                night_adjustments.append(adjustment_amount)
+            quotes.append({
+                "room_type_id": room_type_id,
+                "base_rate": from_cents(base_rate),
+                "total": from_cents(base_rate * len(nights) + sum(night_adjustments)),
+                "nightly_rates": [
+                    {
+                        "date": night,
+                        "effective_rate": from_cents(base_rate + cents),
+                        "adjustment_applied": from_cents(cents),
+                    }
+                    for night, cents in zip(nights, night_adjustments)
+                ],
+            })
+
+        return {
+            "check_in": check_in,
+            "check_out": check_out,
+            "nights": len(nights),
+            "quotes": quotes,
+        }
+
+    @staticmethod
+    def calculate_rate_calendar(
+        db: Session, room_type_ids: Iterable[int], start_date: date, end_date: date
+    ) -> Dict[int, array]:
+        """
+        Effective rates of each room type for every date from start_date to end_date.
+
+        Returns room_type_id -> int64 array of cents, one per date, for the room
+        types that exist; each is filled with one sweep over its interval index.
+        """
+        base_rates, timelines = RateService._load_rates(db, room_type_ids, end_date, start_date)
+        days = (end_date - start_date).days + 1
+
+        return {
+            room_type_id: _daily_rates(base_rate, *timelines.get(room_type_id, ([], [])), start_date, days)
+            for room_type_id, base_rate in base_rates.items()
+        }
+
+    @staticmethod
+    def search_lowest_rates(
+        db: Session,
+        location: str,
+        target_date: date,
+        skip: int = 0,
+        limit: int = 20,
+        descending: bool = False,
+    ) -> List[dict]:
+        """
+        Find the cheapest effective rate per active hotel in a location on a date.
+
+        A window function picks the adjustment covering the date per room type,
+        then rates are aggregated with MIN per hotel, sorted and paginated in SQL.
+        With shards, each shard's first skip + limit hotels are merged.
+        """
+        hotel_filter = and_(Hotel.location == location, Hotel.is_active.is_(True))
+
+        ranked_adjustments = (
+            select(
+                RateAdjustment.room_type_id,
+                _ADJUSTMENT_CENTS.label("adjustment_cents"),
+                func.row_number()
+                .over(
+                    partition_by=RateAdjustment.room_type_id,
+                    order_by=_PRECEDENCE,
+                )
+                .label("position"),
+            )
+            .join(RoomType, RoomType.id == RateAdjustment.room_type_id)
+            .join(Hotel, Hotel.id == RoomType.hotel_id)
+            .where(hotel_filter, _covers(target_date))
+            .subquery()
+        )
+
+        # Summed in integer cents in SQL; the Money type converts the MIN back to Decimal
+        effective_rate = _BASE_RATE_CENTS + func.coalesce(ranked_adjustments.c.adjustment_cents, 0)
+        lowest_rate = type_coerce(func.min(effective_rate), Money).label("lowest_rate")
+        statement = (
+            select(
+                Hotel.id.label("hotel_id"),
+                Hotel.name,
+                Hotel.location,
+                lowest_rate,
+                func.count(RoomType.id).label("room_type_count"),
+            )
+            .join(RoomType, RoomType.hotel_id == Hotel.id)
+            .outerjoin(
+                ranked_adjustments,
+                and_(
+                    ranked_adjustments.c.room_type_id == RoomType.id,
+                    ranked_adjustments.c.position == 1,
+                ),
+            )
+            .where(hotel_filter)
+            .group_by(Hotel.id, Hotel.name, Hotel.location)
+            .order_by(desc(lowest_rate) if descending else lowest_rate, Hotel.id)
+        )
+        if shards.enabled:
+            pages = shards.scatter(
+                db, lambda shard_db: [dict(row) for row in shard_db.execute(statement.limit(skip + limit)).mappings()]
+            )
+            # Stable sorts: by hotel id, then by rate
+            rows = sorted(chain.from_iterable(pages), key=itemgetter("hotel_id"))
+            rows.sort(key=itemgetter("lowest_rate"), reverse=descending)
+            return rows[skip:skip + limit]
+        return [dict(row) for row in db.execute(statement.offset(skip).limit(limit)).mappings()]
 
 
 # Service instance for dependency injection
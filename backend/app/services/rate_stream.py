@@ -0,0 +1,254 @@
+"""
+Live effective-rate snapshots per hotel, fanned out to stream subscribers.
+
+The hub listens to cache invalidations (published after every commit that
+touches rates, locally or - with the SQLite cache bus - in other workers),
+works out which subscribed hotels are affected, computes each hotel's
+snapshot once and pushes it to every subscriber of that hotel. Subscribers
+have small bounded queues: a snapshot always carries the full state, so when
+a slow client falls behind its oldest queued snapshots are dropped instead of
+buffering without limit or slowing the writer down.
+"""
+import asyncio
+import json
+import threading
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterable, Optional, Set
+from fastapi.concurrency import run_in_threadpool
+from app.core.cache import get_cache
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.hotel import Hotel, RoomType
+from app.services import invalidation
+from app.services.rate_service import RateService
+from app.services.sharding import shards
+
+
+class RateSubscription:
+    """
+    One stream client: a bounded queue of snapshots for a hotel.
+    """
+
+    def __init__(self, hotel_id: int, queue_size: int):
+        self.hotel_id = hotel_id
+        self.queue: "asyncio.Queue[dict]" = asyncio.Queue(maxsize=queue_size)
+        self.dropped = 0
+
+    def push(self, snapshot: dict) -> None:
+        # The newest snapshot supersedes queued ones: when full, drop the oldest
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(snapshot)
+
+    async def get(self, timeout: float) -> Optional[dict]:
+        """
+        Next snapshot, or None if none arrives within `timeout` seconds.
+        """
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+def format_event(snapshot: dict) -> str:
+    """
+    Encode a snapshot as a Server-Sent Events message.
+    """
+    return f"event: rates\ndata: {json.dumps(snapshot, separators=(',', ':'))}\n\n"
+
+
+class RateStreamHub:
+    """
+    In-process pub/sub of per-hotel rate snapshots.
+
+    Runs on the event loop of its first subscriber; invalidation callbacks
+    may arrive from any thread.
+    """
+
+    def __init__(self, session_factory=None):
+        self.session_factory = session_factory or SessionLocal
+        self._subscribers: Dict[int, Set[RateSubscription]] = {}
+        self._latest: Dict[int, dict] = {}
+        self._lock = threading.Lock()
+        self._pending_room_types: Set[int] = set()
+        self._pending_hotels: Set[int] = set()
+        self._refresh_all = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def subscribe(self, hotel_id: int) -> RateSubscription:
+        """
+        Register a subscriber; its queue starts with the hotel's current snapshot.
+        """
+        self._ensure_started()
+        subscription = RateSubscription(hotel_id, settings.RATE_STREAM_QUEUE_SIZE)
+        # Registered first so writes made while the snapshot is built are pushed too
+        self._subscribers.setdefault(hotel_id, set()).add(subscription)
+        try:
+            snapshot = self._latest.get(hotel_id)
+            if snapshot is None or snapshot["today"] != date.today().isoformat():
+                snapshot = (await run_in_threadpool(self._build_snapshots, [hotel_id]))[hotel_id]
+                self._latest[hotel_id] = snapshot
+        except BaseException:
+            # Failed or cancelled: nobody will unsubscribe it
+            self.unsubscribe(subscription)
+            raise
+        subscription.push(snapshot)
+        return subscription
+
+    def unsubscribe(self, subscription: RateSubscription) -> None:
+        subscribers = self._subscribers.get(subscription.hotel_id)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.hotel_id]
+                self._latest.pop(subscription.hotel_id, None)
+        if not self._subscribers:
+            self._stop()
+
+    def subscriber_count(self, hotel_id: Optional[int] = None) -> int:
+        if hotel_id is not None:
+            return len(self._subscribers.get(hotel_id, ()))
+        return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    def _ensure_started(self) -> None:
+        if self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._task = self._loop.create_task(self._dispatch())
+        get_cache().subscribe(self._on_invalidate)
+
+    def _stop(self) -> None:
+        if self._task is None:
+            return
+        get_cache().unsubscribe(self._on_invalidate)
+        self._task.cancel()
+        self._task = self._loop = self._wakeup = None
+        with self._lock:
+            self._pending_room_types.clear()
+            self._pending_hotels.clear()
+            self._refresh_all = False
+
+    def _on_invalidate(self, namespace: str, tag: Optional[str]) -> None:
+        if namespace not in (invalidation.RATES, invalidation.HOTELS):
+            return
+        with self._lock:
+            if tag is None:
+                self._refresh_all = True
+            elif namespace == invalidation.RATES:
+                self._pending_room_types.add(int(tag))
+            else:
+                self._pending_hotels.add(int(tag))
+        loop, wakeup = self._loop, self._wakeup
+        if loop is not None and wakeup is not None:
+            try:
+                loop.call_soon_threadsafe(wakeup.set)
+            except RuntimeError:  # loop already closed
+                pass
+
+    async def _dispatch(self) -> None:
+        today = date.today()
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), settings.CACHE_INVALIDATION_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            # Deliver invalidations from other workers (no-op for the local bus);
+            # the shared bus queries SQLite, so off the event loop
+            await run_in_threadpool(get_cache().bus.poll)
+            # Let a burst of writes settle into one push
+            await asyncio.sleep(settings.RATE_STREAM_DEBOUNCE_SECONDS)
+
+            with self._lock:
+                room_type_ids, self._pending_room_types = self._pending_room_types, set()
+                hotel_ids, self._pending_hotels = self._pending_hotels, set()
+                refresh_all, self._refresh_all = self._refresh_all, False
+            if date.today() != today:
+                today, refresh_all = date.today(), True
+            if refresh_all:
+                hotel_ids = set(self._subscribers)
+            elif room_type_ids:
+                hotel_ids |= await run_in_threadpool(self._hotels_of, room_type_ids)
+            hotel_ids &= set(self._subscribers)
+            if not hotel_ids:
+                continue
+
+            try:
+                snapshots = await run_in_threadpool(self._build_snapshots, hotel_ids)
+            except Exception:
+                # Keep streaming; the next write retries these hotels
+                continue
+            for hotel_id, snapshot in snapshots.items():
+                subscribers = self._subscribers.get(hotel_id)
+                if not subscribers:
+                    continue
+                self._latest[hotel_id] = snapshot
+                for subscription in list(subscribers):
+                    subscription.push(snapshot)
+
+    def _hotels_of(self, room_type_ids: Iterable[int]) -> Set[int]:
+        room_type_ids = list(room_type_ids)
+        with self.session_factory() as db:
+            per_shard = shards.scatter(
+                db, lambda shard_db: shard_db.query(RoomType.hotel_id).filter(RoomType.id.in_(room_type_ids)).all()
+            )
+        return {hotel_id for rows in per_shard for hotel_id, in rows}
+
+    def _build_snapshots(self, hotel_ids: Iterable[int]) -> Dict[int, dict]:
+        """
+        Effective rates from today to today + RATE_STREAM_HORIZON_DAYS for every
+        room type of the given hotels, with one batch rate lookup (per shard, with shards).
+
+        Room types deleted between the two reads are left out.
+        """
+        hotel_ids = list(hotel_ids)
+        today = date.today()
+        days = [today + timedelta(days=offset) for offset in range(settings.RATE_STREAM_HORIZON_DAYS + 1)]
+
+        def load_room_types(db):
+            return (
+                db.query(RoomType.id, RoomType.hotel_id, RoomType.name)
+                .join(Hotel, Hotel.id == RoomType.hotel_id)
+                .filter(RoomType.hotel_id.in_(hotel_ids))
+                .order_by(RoomType.hotel_id, RoomType.id)
+                .all()
+            )
+
+        with self.session_factory() as db:
+            # Each hotel's rows are on one shard, so the order holds within each hotel
+            room_types = [row for rows in shards.scatter(db, load_room_types) for row in rows]
+            items = [(room_type_id, day) for room_type_id, _, _ in room_types for day in days]
+            rates = RateService.calculate_effective_rates_batch(db, items)
+
+        generated_at = datetime.now(timezone.utc).isoformat()
+        snapshots = {
+            hotel_id: {
+                "hotel_id": hotel_id,
+                "today": today.isoformat(),
+                "generated_at": generated_at,
+                "room_types": [],
+            }
+            for hotel_id in hotel_ids
+        }
+        for index, (room_type_id, hotel_id, name) in enumerate(room_types):
+            room_type_rates = rates[index * len(days):(index + 1) * len(days)]
+            if room_type_rates[0] is None:
+                continue
+            snapshots[hotel_id]["room_types"].append({
+                "room_type_id": room_type_id,
+                "name": name,
+                "base_rate": float(room_type_rates[0]["base_rate"]),
+                "rates": [
+                    {"date": rate["effective_date"].isoformat(), "effective_rate": float(rate["effective_rate"])}
+                    for rate in room_type_rates
+                ],
+            })
+        return snapshots
+
+
+# Process-wide hub shared by all stream connections of this worker
+hub = RateStreamHub()
@@ -0,0 +1,505 @@
+"""
+Sharding of hotel data across several databases by hotel id.
+
+With SQLALCHEMY_SHARD_URLS set, every hotel lives on one shard together with
+its room types, rate adjustments and their change log entries, so writes and
+rate queries of one hotel stay within one database and one transaction. A
+hotel's shard is the owner of its bucket, hotel_id % SHARD_BUCKETS, in the
+`shard_buckets` map on the primary database. Buckets without a row belong to
+shard 0, so a deployment that lists its existing database as the first shard
+keeps its data in place until buckets are moved (see `plan_rebalance` and
+`ShardSet.move_buckets`, or scripts/rebalance_shards.py).
+
+Ids of sharded tables are reserved in blocks from `id_sequences` on the
+primary, so they are unique across shards and survive moves. Room types and
+adjustments are located by asking every shard for their hotel (cached for
+room types); queries not restricted to one hotel run on every shard in
+parallel and their results are merged.
+
+Without shards, every call runs on the session it is given. Features that
+still use the primary database only (batch writes, the change feed, bulk rate
+jobs, the stored rate calendar and exports) refuse to run with shards
+(`ShardSet.require_unsharded`) rather than miss or misplace rows.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar
+from sqlalchemy import create_engine, delete, func, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, sessionmaker
+from app.core.cache import MISS, get_cache
+from app.core.config import settings
+from app.core.database import SessionLocal, _connect_args
+from app.models.change_log import ChangeLog
+from app.models.hotel import Hotel, RoomType, RateAdjustment
+from app.models.shard import IdSequence, ShardBucket
+from app.services import history, invalidation
+
+# Cache namespace of the bucket map
+SHARD_MAP = "shard_map"
+
+# Parallel queries per shard when scattering
+SCATTER_THREADS_PER_SHARD = 4
+
+T = TypeVar("T")
+
+
+class ShardError(Exception):
+    """
+    Base class of errors routing a write to a shard.
+    """
+    pass
+
+
+class ShardMoving(ShardError):
+    """
+    Raised for writes to a hotel whose bucket is being moved; retry shortly.
+    """
+    pass
+
+
+class CrossShardWrite(ShardError):
+    """
+    Raised when a write would span two shards, or its parent record is on none.
+    """
+    pass
+
+
+class ShardingUnsupported(ShardError):
+    """
+    Raised by features that only use the primary database while shards are configured.
+    """
+    pass
+
+
+class Shard:
+    """
+    One shard database.
+    """
+
+    def __init__(self, index: int, url: str):
+        self.index = index
+        self.engine = create_engine(url, connect_args=_connect_args(url))
+        # Records are returned after their per-call session closes, so keep them loaded
+        self.session_factory = sessionmaker(
+            autocommit=False, autoflush=False, expire_on_commit=False, bind=self.engine
+        )
+
+
+class ShardSet:
+    """
+    The configured shards, the bucket map and id allocation.
+    """
+
+    def __init__(self, urls: List[str], buckets: int, primary: sessionmaker = SessionLocal):
+        self.buckets = buckets
+        self.primary = primary
+        self.shards: List[Shard] = []
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._id_lock = threading.Lock()
+        self._id_blocks: Dict[str, Tuple[int, int]] = {}
+        self.configure(urls)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.shards)
+
+    def dispose(self, close: bool = True) -> None:
+        """
+        Drop the shards' pooled connections (see Engine.dispose).
+        """
+        for shard in self.shards:
+            shard.engine.dispose(close=close)
+
+    def configure(self, urls: List[str]) -> None:
+        """
+        Replace the shards (tests and tools switch between databases).
+        """
+        changed = bool(self.shards or urls)
+        self.dispose()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+        self.shards = [Shard(index, url) for index, url in enumerate(urls)]
+        self._pool = ThreadPoolExecutor(
+            max_workers=SCATTER_THREADS_PER_SHARD * len(urls), thread_name_prefix="shard"
+        ) if urls else None
+        with self._id_lock:
+            self._id_blocks = {}
+        if changed:
+            get_cache().invalidate(SHARD_MAP)
+            get_cache().invalidate(invalidation.ROOM_TYPES)
+
+    # Routing ----------------------------------------------------------------
+
+    def bucket_map(self) -> Dict[int, Tuple[int, bool]]:
+        """
+        bucket -> (owning shard, moving) for the buckets in `shard_buckets`.
+        """
+        cache = get_cache()
+        owners = cache.get(SHARD_MAP, "buckets")
+        if owners is MISS:
+            with self.primary() as db:
+                owners = {
+                    bucket: (shard, moving)
+                    for bucket, shard, moving in db.execute(
+                        select(ShardBucket.bucket, ShardBucket.shard, ShardBucket.moving)
+                    )
+                }
+            cache.set(SHARD_MAP, "buckets", owners, ttl=settings.SHARD_MAP_TTL_SECONDS)
+        return owners
+
+    def owner(self, bucket: int) -> Tuple[int, bool]:
+        return self.bucket_map().get(bucket, (0, False))
+
+    def shard_of(self, hotel_id: int) -> Shard:
+        return self.shards[self.owner(hotel_id % self.buckets)[0]]
+
+    def require_unsharded(self, feature: str) -> None:
+        """
+        Refuse `feature`, which reads or writes hotel data on the primary only, when sharded.
+        """
+        if self.enabled:
+            raise ShardingUnsupported(f"{feature} is not available while hotel data is sharded")
+
+    def check_writable(self, hotel_id: int) -> None:
+        if self.owner(hotel_id % self.buckets)[1]:
+            raise ShardMoving(f"Hotel {hotel_id} is being moved to another shard, retry shortly")
+
+    @contextmanager
+    def session(self, db: Session, hotel_id: int, write: bool = False) -> Iterator[Session]:
+        """
+        Session on the shard of `hotel_id` (`db` itself without shards).
+        """
+        if not self.enabled:
+            yield db
+            return
+        if write:
+            self.check_writable(hotel_id)
+        with self.shard_of(hotel_id).session_factory() as shard_db:
+            yield shard_db
+
+    @contextmanager
+    def record_session(
+        self, db: Session, model, record_id: int, write: bool = False, moved_to: Optional[int] = None
+    ) -> Iterator[Optional[Session]]:
+        """
+        Session on the shard holding a hotel, room type or adjustment (`db` itself without shards).
+
+        Yields None when the record's hotel cannot be found. `moved_to` is the
+        hotel a write re-parents the record to, which must share its shard.
+        """
+        if not self.enabled:
+            yield db
+            return
+        hotel_id = self.hotel_of(model, record_id)
+        if hotel_id is None:
+            yield None
+            return
+        if moved_to is not None and moved_to != hotel_id:
+            if self.shard_of(moved_to) is not self.shard_of(hotel_id):
+                raise CrossShardWrite(f"Hotels {hotel_id} and {moved_to} are on different shards")
+            self.check_writable(moved_to)
+        with self.session(db, hotel_id, write=write) as shard_db:
+            yield shard_db
+
+    def hotel_of(self, model, record_id: int) -> Optional[int]:
+        """
+        Id of the hotel of a hotel, room type or adjustment; None if it is not found.
+
+        Room types are looked up on every shard once, then cached until written.
+        """
+        if model is Hotel:
+            return record_id
+        if model is RateAdjustment:
+            return self._first(select(RoomType.hotel_id).join(
+                RateAdjustment, RateAdjustment.room_type_id == RoomType.id
+            ).where(RateAdjustment.id == record_id))
+        cache = get_cache()
+        key = f"hotel_id:{record_id}"
+        hotel_id = cache.get(invalidation.ROOM_TYPES, key)
+        if hotel_id is MISS:
+            hotel_id = self._first(select(RoomType.hotel_id).where(RoomType.id == record_id))
+            if hotel_id is not None:
+                cache.set(invalidation.ROOM_TYPES, key, hotel_id, tag=record_id)
+        return hotel_id
+
+    def _first(self, statement):
+        return next((value for value in self.scatter(None, lambda db: db.scalar(statement)) if value is not None), None)
+
+    def scatter(self, db: Optional[Session], function: Callable[[Session], T]) -> List[T]:
+        """
+        Run `function` with a session on every shard in parallel; results in shard order.
+
+        Without shards it runs once, on `db`.
+        """
+        if not self.enabled:
+            return [function(db)]
+
+        def run(shard: Shard) -> T:
+            with shard.session_factory() as shard_db:
+                return function(shard_db)
+
+        return list(self._pool.map(run, self.shards))
+
+    # Ids --------------------------------------------------------------------
+
+    def allocate_id(self, model) -> int:
+        """
+        A new id for `model`'s table, unique across shards.
+        """
+        name = model.__tablename__
+        with self._id_lock:
+            next_id, end = self._id_blocks.get(name, (0, 0))
+            if next_id >= end:
+                next_id, end = self._reserve_ids(model)
+            self._id_blocks[name] = (next_id + 1, end)
+            return next_id
+
+    def _reserve_ids(self, model) -> Tuple[int, int]:
+        name = model.__tablename__
+        size = settings.SHARD_ID_BLOCK_SIZE
+        with self.primary() as db:
+            if db.get(IdSequence, name) is None:
+                # First allocation: continue after the largest id on any shard
+                largest = self.scatter(None, lambda shard_db: shard_db.scalar(select(func.max(model.id))))
+                db.add(IdSequence(name=name, next_id=max(filter(None, largest), default=0) + 1))
+                try:
+                    db.commit()
+                except IntegrityError:
+                    # Another process created it first
+                    db.rollback()
+            end = db.scalar(
+                update(IdSequence)
+                .where(IdSequence.name == name)
+                .values(next_id=IdSequence.next_id + size)
+                .returning(IdSequence.next_id)
+            )
+            db.commit()
+        return end - size, end
+
+    # Rebalancing ------------------------------------------------------------
+
+    def bucket_weights(self) -> Dict[int, int]:
+        """
+        Hotels, room types and adjustments per bucket, over all shards.
+        """
+        hotel_bucket = Hotel.id % self.buckets
+        room_type_bucket = RoomType.hotel_id % self.buckets
+        statements = (
+            select(hotel_bucket, func.count()).group_by(hotel_bucket),
+            select(room_type_bucket, func.count()).group_by(room_type_bucket),
+            select(room_type_bucket, func.count())
+            .select_from(RateAdjustment)
+            .join(RoomType, RoomType.id == RateAdjustment.room_type_id)
+            .group_by(room_type_bucket),
+        )
+
+        def count(db: Session) -> List[Tuple[int, int]]:
+            return [tuple(row) for statement in statements for row in db.execute(statement)]
+
+        weights: Dict[int, int] = {}
+        for rows in self.scatter(None, count):
+            for bucket, rows_in_bucket in rows:
+                weights[bucket] = weights.get(bucket, 0) + rows_in_bucket
+        return weights
+
+    def rebalance(self, settle_seconds: Optional[float] = None, batch_size: int = 16,
+                  on_move: Optional[Callable[[dict], None]] = None) -> List[dict]:
+        """
+        Move buckets so every shard holds about the same number of rows.
+        """
+        owners = {bucket: shard for bucket, (shard, _) in self.bucket_map().items()}
+        moves = plan_rebalance(self.bucket_weights(), owners, len(self.shards), self.buckets)
+        results = []
+        for offset in range(0, len(moves), batch_size):
+            batch = [(bucket, target) for bucket, _, target in moves[offset:offset + batch_size]]
+            for result in self.move_buckets(batch, settle_seconds):
+                results.append(result)
+                if on_move is not None:
+                    on_move(result)
+        return results
+
+    def move_buckets(self, moves: Iterable[Tuple[int, int]], settle_seconds: Optional[float] = None) -> Iterator[dict]:
+        """
+        Move each (bucket, target shard): hotels with their room types, adjustments and change log.
+
+        Writes to the buckets are refused (ShardMoving) until each is moved:
+        they are flagged first, then the call waits `settle_seconds` (by
+        default SHARD_MAP_TTL_SECONDS) so every process sees the flag and
+        writes in flight finish. Each bucket is committed on its target before
+        the map points there and its rows are deleted from the source. An
+        interrupted move can simply be run again; `purge_orphans` removes
+        rows it may have left on a source.
+
+        Yields {"bucket", "from", "to", "hotels", "rows"} per bucket as it completes.
+        """
+        moves = [(bucket, target, self.owner(bucket)[0]) for bucket, target in moves]
+        moves = [move for move in moves if move[1] != move[2]]
+        if not moves:
+            return
+        for bucket, _, source in moves:
+            self._set_owner(bucket, source, moving=True)
+        try:
+            time.sleep(settings.SHARD_MAP_TTL_SECONDS if settle_seconds is None else settle_seconds)
+            for bucket, target, source in moves:
+                yield self._move_bucket(bucket, source, target)
+        finally:
+            for bucket, _, _ in moves:
+                shard, moving = self.owner(bucket)
+                if moving:
+                    self._set_owner(bucket, shard, moving=False)
+
+    def _move_bucket(self, bucket: int, source: int, target: int) -> dict:
+        # Imported here: the hotel service routes through this module
+        from app.services.hotel_service import hotel as hotel_service
+
+        with self.shards[source].session_factory() as source_db, self.shards[target].session_factory() as target_db:
+            rows = _read_bucket(source_db, bucket, self.buckets)
+            # Leftovers of an interrupted move
+            _delete_bucket(target_db, bucket, self.buckets)
+            for model, table_rows in rows:
+                if table_rows:
+                    target_db.execute(insert(model.__table__), table_rows)
+            hotel_ids = [row["id"] for row in rows[0][1]]
+            hotel_service.sync_search_index(target_db, hotel_ids)
+            target_db.commit()
+
+            self._set_owner(bucket, target, moving=False)
+
+            _delete_bucket(source_db, bucket, self.buckets)
+            hotel_service.sync_search_index(source_db, hotel_ids)
+            source_db.commit()
+        return {
+            "bucket": bucket,
+            "from": source,
+            "to": target,
+            "hotels": len(hotel_ids),
+            "rows": sum(len(table_rows) for _, table_rows in rows),
+        }
+
+    def purge_orphans(self) -> int:
+        """
+        Delete rows of buckets a shard does not own, left by interrupted moves.
+
+        Returns the number of buckets purged.
+        """
+        from app.services.hotel_service import hotel as hotel_service
+
+        purged = 0
+        for shard in self.shards:
+            with shard.session_factory() as db:
+                present = set(db.scalars(select(Hotel.id % self.buckets).distinct()))
+                present |= set(db.scalars(select(RoomType.hotel_id % self.buckets).distinct()))
+                for bucket in sorted(present):
+                    owner, moving = self.owner(bucket)
+                    if owner == shard.index or moving:
+                        continue
+                    hotel_ids = db.scalars(select(Hotel.id).where(Hotel.id % self.buckets == bucket)).all()
+                    _delete_bucket(db, bucket, self.buckets)
+                    hotel_service.sync_search_index(db, hotel_ids)
+                    purged += 1
+                db.commit()
+        return purged
+
+    def _set_owner(self, bucket: int, shard: int, moving: bool) -> None:
+        with self.primary() as db:
+            db.merge(ShardBucket(bucket=bucket, shard=shard, moving=moving))
+            db.commit()
+        get_cache().invalidate(SHARD_MAP)
+
+
+def _bucket_conditions(bucket: int, buckets: int) -> dict:
+    """
+    Per table, the condition selecting the rows of a bucket.
+    """
+    room_type_ids = select(RoomType.id).where(RoomType.hotel_id % buckets == bucket)
+    logged_room_type_ids = select(ChangeLog.entity_id).where(
+        ChangeLog.entity == history.ROOM_TYPE, ChangeLog.hotel_id % buckets == bucket
+    )
+    return {
+        Hotel: Hotel.id % buckets == bucket,
+        RoomType: RoomType.hotel_id % buckets == bucket,
+        RateAdjustment: RateAdjustment.room_type_id.in_(room_type_ids),
+        # Including entries of removed records, for point-in-time reads
+        ChangeLog: or_(
+            (ChangeLog.entity == history.HOTEL) & (ChangeLog.entity_id % buckets == bucket),
+            (ChangeLog.entity == history.ROOM_TYPE) & (ChangeLog.hotel_id % buckets == bucket),
+            (ChangeLog.entity == history.RATE_ADJUSTMENT) & ChangeLog.room_type_id.in_(logged_room_type_ids.union(room_type_ids)),
+        ),
+    }
+
+
+def _read_bucket(db: Session, bucket: int, buckets: int) -> List[Tuple[type, List[dict]]]:
+    """
+    Rows of a bucket per table, parents first; change log rows without their id.
+    """
+    rows = []
+    for model, condition in _bucket_conditions(bucket, buckets).items():
+        table = model.__table__
+        # Change log ids are sequence numbers of the shard they are written to
+        columns = [column for column in table.columns if not (model is ChangeLog and column.key == "id")]
+        statement = select(*columns).where(condition).order_by(*table.primary_key.columns)
+        rows.append((model, [dict(row) for row in db.execute(statement).mappings()]))
+    return rows
+
+
+def _delete_bucket(db: Session, bucket: int, buckets: int) -> None:
+    # Children first, while their parents still identify the bucket
+    for model, condition in reversed(list(_bucket_conditions(bucket, buckets).items())):
+        db.execute(delete(model.__table__).where(condition))
+
+
+def plan_rebalance(
+    weights: Dict[int, int], owners: Dict[int, int], shard_count: int, buckets: int
+) -> List[Tuple[int, int, int]]:
+    """
+    Bucket moves that even out the rows per shard, as (bucket, from, to).
+
+    Each bucket weighs its rows plus one, so empty buckets (where new hotels
+    will go) are spread too. Buckets of shards beyond `shard_count` are moved
+    first, heaviest first, to the least loaded shard. Then, while some bucket
+    of the most loaded shard is lighter than its lead over the least loaded
+    one, the bucket closest to half that lead moves across.
+    """
+    loads = [0] * shard_count
+    placement: Dict[int, int] = {}
+    homeless = []
+    for bucket in range(buckets):
+        owner = owners.get(bucket, 0)
+        if owner < shard_count:
+            placement[bucket] = owner
+            loads[owner] += weights.get(bucket, 0) + 1
+        else:
+            homeless.append(bucket)
+
+    def weight(bucket: int) -> int:
+        return weights.get(bucket, 0) + 1
+
+    for bucket in sorted(homeless, key=weight, reverse=True):
+        target = min(range(shard_count), key=loads.__getitem__)
+        placement[bucket] = target
+        loads[target] += weight(bucket)
+
+    while True:
+        heaviest = max(range(shard_count), key=loads.__getitem__)
+        lightest = min(range(shard_count), key=loads.__getitem__)
+        gap = loads[heaviest] - loads[lightest]
+        candidates = [bucket for bucket, shard in placement.items() if shard == heaviest and weight(bucket) < gap]
+        if not candidates:
+            break
+        bucket = max(candidates, key=lambda candidate: (weight(candidate) * (gap - weight(candidate)), -candidate))
+        placement[bucket] = lightest
+        loads[heaviest] -= weight(bucket)
+        loads[lightest] += weight(bucket)
+
+    return [
+        (bucket, owners.get(bucket, 0), shard)
+        for bucket, shard in sorted(placement.items())
+        if shard != owners.get(bucket, 0)
+    ]
+
+
+# Process-wide shard set; empty unless SQLALCHEMY_SHARD_URLS is set
+shards = ShardSet(settings.SQLALCHEMY_SHARD_URLS, settings.SHARD_BUCKETS)
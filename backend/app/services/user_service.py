@@ -13,6 +13,8 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
     """
     User-specific CRUD operations.
     """
+    private_columns = ("password_hash",)
+
     def get_by_username(self, db: Session, username: str) -> Optional[User]:
         """
         Retrieve a user by username.
@@ -41,4 +43,10 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
             update_data["password_hash"] = get_password_hash(password)
         return super().update(db, db_obj=db_obj, obj_in=update_data)
 
+    def set_password_hash(self, db: Session, db_obj: User, password_hash: str) -> User:
+        """
+        Store an already computed password hash (e.g. after a rehash on login).
+        """
+        return super().update(db, db_obj=db_obj, obj_in={"password_hash": password_hash})
+
 user = CRUDUser(User)
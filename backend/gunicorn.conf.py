@@ -0,0 +1,38 @@
+"""
+Gunicorn configuration for running the API with multiple uvicorn workers.
+
+The app is imported once in the master (preload_app) so workers share its
+memory copy-on-write. Each worker drops the connection pools inherited from
+the master (primary, read replicas and shards) right after fork and closes
+its own pools on exit.
+
+Usage:
+    gunicorn -c gunicorn.conf.py app.main:app
+"""
+from app.core.config import settings
+
+bind = f"{settings.HOST}:{settings.PORT}"
+workers = settings.WORKERS
+worker_class = "uvicorn_worker.UvicornWorker"
+preload_app = True
+reload = False
+timeout = settings.WORKER_TIMEOUT_SECONDS
+graceful_timeout = settings.GRACEFUL_TIMEOUT_SECONDS
+
+
+def post_fork(server, worker):
+    """Forget pooled connections copied from the master without closing them."""
+    from app.core.database import engine, read_replicas
+    from app.services.sharding import shards
+    engine.dispose(close=False)
+    read_replicas.dispose(close=False)
+    shards.dispose(close=False)
+
+
+def worker_exit(server, worker):
+    """Close this worker's pooled connections on shutdown."""
+    from app.core.database import engine, read_replicas
+    from app.services.sharding import shards
+    engine.dispose()
+    read_replicas.dispose()
+    shards.dispose()
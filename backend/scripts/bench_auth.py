@@ -0,0 +1,82 @@
+"""
+Microbenchmark of per-request token verification overhead.
+
+Compares decoding with the raw secret from settings on every call (the old
+path), decoding with pre-parsed key material, and the verified-token cache,
+for HS256 and, when `cryptography` is installed, RS256 and EdDSA.
+
+Usage (from the backend directory):
+    python scripts/bench_auth.py --iterations 20000
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import jwt  # noqa: E402
+
+from app.core import security  # noqa: E402
+from app.core.config import settings  # noqa: E402
+
+
+def asymmetric_keys(algorithm: str):
+    """
+    Generate a throwaway PEM key pair for the algorithm.
+    """
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+
+    if algorithm == "RS256":
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    else:
+        private_key = ed25519.Ed25519PrivateKey.generate()
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ).decode()
+    public_pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    ).decode()
+    return private_pem, public_pem
+
+
+def bench(algorithm: str, iterations: int) -> None:
+    settings.ALGORITHM = algorithm
+    if algorithm.startswith("HS"):
+        raw_key = settings.SECRET_KEY
+    else:
+        settings.JWT_PRIVATE_KEY, settings.JWT_PUBLIC_KEY = asymmetric_keys(algorithm)
+        raw_key = settings.JWT_PUBLIC_KEY
+
+    token = security.create_access_token({"sub": "admin"})
+    keys = security.get_key_material()
+
+    cases = {
+        "decode with raw key": lambda: jwt.decode(token, raw_key, algorithms=[algorithm]),
+        "decode with parsed key": lambda: jwt.decode(token, keys.verification_key, algorithms=keys.algorithms),
+        "cached verification": lambda: security.decode_access_token(token),
+    }
+    for name, case in cases.items():
+        seconds = min(timeit.repeat(case, number=iterations, repeat=3))
+        print(f"{algorithm:>6}  {name:<24} {seconds / iterations * 1e6:>9.2f} us/request")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    algorithms = ["HS256"]
+    try:
+        import cryptography  # noqa: F401
+        algorithms += ["RS256", "EdDSA"]
+    except ImportError:
+        print("cryptography not installed: skipping RS256/EdDSA")
+
+    for algorithm in algorithms:
+        bench(algorithm, args.iterations)
+
+
+if __name__ == "__main__":
+    main()
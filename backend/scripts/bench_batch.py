@@ -0,0 +1,90 @@
+"""
+Compare per-request rate adjustment updates with one unit-of-work batch.
+
+The per-record path repeats what `PUT /rate-adjustments/{id}` does for each
+adjustment (lookup, room type check, update, commit, refresh); the batch path
+sends the same updates through the batch service. Runs against a throwaway
+SQLite file.
+
+Usage (from the backend directory):
+    python scripts/bench_batch.py --operations 50 200 1000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.core.database import Base  # noqa: E402
+from app.models.hotel import Hotel, RoomType, RateAdjustment  # noqa: E402
+from app.schemas.batch import BatchOperation  # noqa: E402
+from app.schemas.room import RateAdjustmentUpdate  # noqa: E402
+from app.services import batch_service, rate_adjustment, room_type  # noqa: E402
+
+
+def seed(db, count: int):
+    hotel = Hotel(name="Bench Hotel", location="Bench")
+    db.add(hotel)
+    db.flush()
+    room = RoomType(name="Standard", base_rate=100.0, hotel_id=hotel.id)
+    db.add(room)
+    db.flush()
+    adjustments = [
+        RateAdjustment(room_type_id=room.id, adjustment_amount=1.0, effective_date=date(2024, 1, 1), reason="Seed")
+        for _ in range(count)
+    ]
+    db.add_all(adjustments)
+    db.commit()
+    return room.id, [adjustment.id for adjustment in adjustments]
+
+
+def per_record(db, room_type_id, ids, amount):
+    for adjustment_id in ids:
+        db_adjustment = rate_adjustment.get(db, id=adjustment_id)
+        room_type.get(db, id=room_type_id)
+        rate_adjustment.update(db, db_obj=db_adjustment, obj_in=RateAdjustmentUpdate(
+            room_type_id=room_type_id, adjustment_amount=amount
+        ))
+
+
+def batched(db, room_type_id, ids, amount):
+    batch_service.apply(db, [
+        BatchOperation(op="update", entity="rate_adjustment", id=adjustment_id,
+                       data={"room_type_id": room_type_id, "adjustment_amount": amount})
+        for adjustment_id in ids
+    ])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--operations", type=int, nargs="+", default=[50, 200, 1000])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+        Base.metadata.create_all(engine)
+        Session = sessionmaker(bind=engine)
+        with Session() as db:
+            room_type_id, all_ids = seed(db, max(args.operations))
+
+        print(f"{'ops':>6} {'per-record ms':>14} {'batch ms':>10} {'speedup':>8}")
+        for count in args.operations:
+            ids = all_ids[:count]
+            timings = []
+            for run, amount in ((per_record, 2.0), (batched, 3.0)):
+                with Session() as db:
+                    started = time.perf_counter()
+                    run(db, room_type_id, ids, amount)
+                    timings.append(time.perf_counter() - started)
+            print(f"{count:>6} {timings[0] * 1000:>14.1f} {timings[1] * 1000:>10.1f} {timings[0] / timings[1]:>7.1f}x")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
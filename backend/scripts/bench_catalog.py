@@ -0,0 +1,103 @@
+"""
+Compare the memory held by the in-memory catalog with the same room types
+loaded as ORM objects, and the time to serve a hotel's room types from each.
+
+Seeds a throwaway SQLite file, then measures with tracemalloc the memory
+retained by the catalog (records, indexes and adjacency lists) and by a
+session holding every hotel and room type as ORM instances.
+
+Usage (from the backend directory):
+    python scripts/bench_catalog.py --room-types 100000
+"""
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, insert  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app import schemas  # noqa: E402
+from app.core.database import Base  # noqa: E402
+from app.models.hotel import Hotel, RoomType  # noqa: E402
+from app.services.catalog import Catalog  # noqa: E402
+
+NAMES = ["Single", "Double", "Twin", "Suite", "Deluxe", "Family", "Studio", "Penthouse"]
+
+
+def seed(db, room_types: int) -> int:
+    hotels = max(1, room_types // 10)
+    db.execute(insert(Hotel), [{"name": f"Hotel {n}", "location": f"City {n % 500}"} for n in range(hotels)])
+    db.execute(insert(RoomType), [
+        {"name": NAMES[n % len(NAMES)], "base_rate": 80 + n % 300, "hotel_id": n % hotels + 1}
+        for n in range(room_types)
+    ])
+    db.commit()
+    return hotels
+
+
+def retained(load):
+    """
+    Run `load` and return (its result, bytes it left allocated).
+    """
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = load()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--room-types", type=int, default=100_000)
+    parser.add_argument("--requests", type=int, default=2000, help="room type lists served per approach")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+        Base.metadata.create_all(engine)
+        Session = sessionmaker(bind=engine)
+        with Session() as db:
+            hotels = seed(db, args.room_types)
+
+        catalog = Catalog(session_factory=Session)
+        started = time.perf_counter()
+        _, catalog_bytes = retained(catalog.load)
+        print(f"catalog: loaded in {time.perf_counter() - started:.2f} s")
+
+        db = Session()
+        started = time.perf_counter()
+        _, orm_bytes = retained(lambda: (db.query(Hotel).all(), db.query(RoomType).all()))
+        print(f"ORM:     loaded in {time.perf_counter() - started:.2f} s")
+
+        scale = 100_000 / args.room_types
+        print(f"memory per 100k room types (with {hotels * scale:,.0f} hotels):")
+        print(f"  catalog {catalog_bytes * scale / 2**20:8.1f} MiB")
+        print(f"  ORM     {orm_bytes * scale / 2**20:8.1f} MiB  ({orm_bytes / catalog_bytes:.1f}x)")
+
+        adapter = schemas.RoomType.model_validate
+        started = time.perf_counter()
+        for n in range(args.requests):
+            [adapter(record) for record in catalog.get_room_types_by_hotel(n % hotels + 1)]
+        catalog_seconds = time.perf_counter() - started
+        started = time.perf_counter()
+        for n in range(args.requests):
+            with Session() as request_db:
+                rooms = request_db.query(RoomType).filter(RoomType.hotel_id == n % hotels + 1).all()
+                [adapter(room) for room in rooms]
+        orm_seconds = time.perf_counter() - started
+        print(f"room types of a hotel: catalog {catalog_seconds / args.requests * 1e6:.0f} us, "
+              f"ORM query {orm_seconds / args.requests * 1e6:.0f} us")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Compare a JSON dump of rate adjustments, as the list endpoint returns them,
+with the columnar export.
+
+Seeds a throwaway SQLite file, then reports file size, export time and load
+time for each. Columnar files are loaded with numpy (or pyarrow) when
+installed, otherwise with the standard-library npz reader.
+
+Usage (from the backend directory):
+    python scripts/bench_export.py --rows 1000000
+"""
+import argparse
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, insert  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app import schemas  # noqa: E402
+from app.core.database import Base  # noqa: E402
+from app.models.hotel import Hotel, RoomType, RateAdjustment  # noqa: E402
+from app.services.columnar_export import FORMATS, export_table, load_npz, pyarrow_available  # noqa: E402
+
+REASONS = ["Weekend", "Holiday", "Conference", "Promo", "Season", "Event", "Maintenance", "Last minute"]
+
+
+def seed(db, rows: int) -> None:
+    randomizer = random.Random(7)
+    room_types = max(1, rows // 100)
+    db.execute(insert(Hotel), [{"name": f"Hotel {n}", "location": "Bench"} for n in range(max(1, room_types // 10))])
+    db.execute(insert(RoomType), [
+        {"name": "Standard", "base_rate": 100, "hotel_id": n % max(1, room_types // 10) + 1} for n in range(room_types)
+    ])
+    start = date(2025, 1, 1)
+    for offset in range(0, rows, 100_000):
+        batch = []
+        for _ in range(min(100_000, rows - offset)):
+            effective_date = start + timedelta(days=randomizer.randrange(730))
+            batch.append({
+                "room_type_id": randomizer.randint(1, room_types),
+                "adjustment_amount": randomizer.randint(-3000, 6000) / 100,
+                "effective_date": effective_date,
+                "end_date": effective_date + timedelta(days=randomizer.randint(0, 30)) if randomizer.random() < 0.5 else None,
+                "priority": randomizer.randint(0, 2),
+                "reason": randomizer.choice(REASONS),
+            })
+        db.execute(insert(RateAdjustment), batch)
+    db.commit()
+
+
+def load_columnar(content: bytes, format: str) -> None:
+    if format == "npz":
+        try:
+            import numpy
+        except ImportError:
+            load_npz(io.BytesIO(content))
+            return
+        arrays = numpy.load(io.BytesIO(content))
+        for name in arrays.files:
+            arrays[name]
+        return
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    source = io.BytesIO(content)
+    pa.ipc.open_file(source).read_all() if format == "arrow" else pq.read_table(source)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+        Base.metadata.create_all(engine)
+        Session = sessionmaker(bind=engine)
+        with Session() as db:
+            seed(db, args.rows)
+
+        print(f"{args.rows} rate adjustments")
+        print(f"{'format':>8} {'size MB':>9} {'export s':>9} {'load s':>7}")
+        with Session() as db:
+            started = time.perf_counter()
+            content = json.dumps([
+                schemas.RateAdjustment.model_validate(adjustment).model_dump(mode="json")
+                for adjustment in db.query(RateAdjustment).yield_per(10_000)
+            ]).encode()
+            exported = time.perf_counter() - started
+        started = time.perf_counter()
+        json.loads(content)
+        print(f"{'json':>8} {len(content) / 1e6:>9.1f} {exported:>9.2f} {time.perf_counter() - started:>7.2f}")
+
+        for format in FORMATS:
+            if format != "npz" and not pyarrow_available():
+                continue
+            output = io.BytesIO()
+            with Session() as db:
+                started = time.perf_counter()
+                export_table(db, "rate_adjustments", output, format)
+                exported = time.perf_counter() - started
+            content = output.getvalue()
+            started = time.perf_counter()
+            load_columnar(content, format)
+            print(f"{format:>8} {len(content) / 1e6:>9.1f} {exported:>9.2f} {time.perf_counter() - started:>7.2f}")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Measure how portfolio rate calendar builds scale with worker processes.
+
+Seeds a throwaway SQLite file with room types and overlapping adjustments,
+then times the calendar computation (without the table write) for each
+worker count, and one full build including the bulk write.
+
+Usage (from the backend directory):
+    python scripts/bench_rate_calendar.py --room-types 2000 --days 730 --workers 1 2 4 8
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, insert  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.core.database import Base  # noqa: E402
+from app.models.hotel import Hotel, RoomType, RateAdjustment  # noqa: E402
+from app.services.rate_calendar import build_portfolio_calendar  # noqa: E402
+
+
+def seed(db, room_types: int, adjustments: int, start: date, days: int) -> None:
+    randomizer = random.Random(42)
+    hotels = max(1, room_types // 10)
+    db.execute(insert(Hotel), [{"name": f"Hotel {n}", "location": f"City {n % 50}"} for n in range(hotels)])
+    db.execute(insert(RoomType), [
+        {"name": f"Room {n}", "base_rate": randomizer.randint(50, 500), "hotel_id": n % hotels + 1}
+        for n in range(room_types)
+    ])
+    rows = []
+    for room_type_id in range(1, room_types + 1):
+        for _ in range(adjustments):
+            effective_date = start + timedelta(days=randomizer.randrange(days))
+            rows.append({
+                "room_type_id": room_type_id,
+                "adjustment_amount": randomizer.randint(-30, 60),
+                "effective_date": effective_date,
+                "end_date": effective_date + timedelta(days=randomizer.randint(1, 60)) if randomizer.random() < 0.7 else None,
+                "priority": randomizer.randint(0, 3),
+                "reason": "Bench",
+            })
+    db.execute(insert(RateAdjustment), rows)
+    db.commit()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--room-types", type=int, default=2000)
+    parser.add_argument("--adjustments", type=int, default=20, help="adjustments per room type")
+    parser.add_argument("--days", type=int, default=730)
+    parser.add_argument("--workers", type=int, nargs="+",
+                        default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    args = parser.parse_args()
+    start = date(2025, 1, 1)
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+        Base.metadata.create_all(engine)
+        Session = sessionmaker(bind=engine)
+        with Session() as db:
+            seed(db, args.room_types, args.adjustments, start, args.days)
+
+        print(f"{args.room_types} room types x {args.days} days, {os.cpu_count()} CPUs")
+        print(f"{'workers':>8} {'compute s':>10} {'speedup':>8}")
+        baseline = None
+        for workers in args.workers:
+            with Session() as db:
+                started = time.perf_counter()
+                build_portfolio_calendar(db, start, args.days, workers=workers, write=False)
+                elapsed = time.perf_counter() - started
+            baseline = baseline or elapsed
+            print(f"{workers:>8} {elapsed:>10.2f} {baseline / elapsed:>7.1f}x")
+
+        with Session() as db:
+            started = time.perf_counter()
+            summary = build_portfolio_calendar(db, start, args.days, workers=max(args.workers))
+            db.commit()
+            print(f"full build with write: {summary['rows']} rows in {time.perf_counter() - started:.2f} s")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Compare the per-row cost of list reads through the ORM and through the
+plain-dict Core path (`get_values_by_room_type`, `get_multi_values`).
+
+Seeds a throwaway SQLite file with one room type holding --rows rate
+adjustments (and as many users), then times the query alone and the query
+plus response validation and JSON encoding, as the endpoints do it.
+
+Usage (from the backend directory):
+    python scripts/bench_reads.py --rows 10000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pydantic import TypeAdapter  # noqa: E402
+from sqlalchemy import create_engine, insert  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app import schemas  # noqa: E402
+from app.core.database import Base  # noqa: E402
+from app.models.hotel import Hotel, RoomType, RateAdjustment  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.services import rate_adjustment, user  # noqa: E402
+
+
+def seed(db, rows: int) -> None:
+    db.execute(insert(Hotel), [{"name": "Bench Hotel", "location": "Bench"}])
+    db.execute(insert(RoomType), [{"name": "Standard", "base_rate": 100, "hotel_id": 1}])
+    db.execute(insert(RateAdjustment), [
+        {
+            "room_type_id": 1,
+            "adjustment_amount": n % 50 - 25,
+            "effective_date": date(2025, 1, 1) + timedelta(days=n % 730),
+            "reason": "Promo",
+        }
+        for n in range(rows)
+    ])
+    db.execute(insert(User), [{"username": f"user{n}", "password_hash": "x" * 87} for n in range(rows)])
+    db.commit()
+
+
+def best_of(Session, repeat: int, read) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        with Session() as db:
+            started = time.perf_counter()
+            read(db)
+            best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    adjustments = TypeAdapter(List[schemas.RateAdjustment])
+    users = TypeAdapter(List[schemas.User])
+    cases = [
+        ("adjustments", adjustments,
+         lambda db: rate_adjustment.get_by_room_type(db, 1), lambda db: rate_adjustment.get_values_by_room_type(db, 1)),
+        ("users", users,
+         lambda db: user.get_multi(db, limit=args.rows), lambda db: user.get_multi_values(db, limit=args.rows)),
+    ]
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+        Base.metadata.create_all(engine)
+        Session = sessionmaker(bind=engine)
+        with Session() as db:
+            seed(db, args.rows)
+
+        print(f"{'list':<12} {'path':<6} {'query us/row':>13} {'response us/row':>16}")
+        for name, adapter, orm_read, core_read in cases:
+            for path, read in (("ORM", orm_read), ("Core", core_read)):
+                query = best_of(Session, args.repeat, read)
+                response = best_of(
+                    Session, args.repeat, lambda db: adapter.dump_json(adapter.validate_python(read(db)))
+                )
+                print(f"{name:<12} {path:<6} {query / args.rows * 1e6:13.2f} {response / args.rows * 1e6:16.2f}")
+
+
+if __name__ == "__main__":
+    main()
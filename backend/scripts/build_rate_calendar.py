@@ -0,0 +1,45 @@
+"""
+Rebuild the stored rate calendar of every room type.
+
+Partitions room types across worker processes (see
+app.services.rate_calendar) and replaces the `rate_calendar` table in one
+transaction. The same build runs in the background through
+`POST /jobs/` with kind "portfolio_rate_calendar".
+
+Usage (from the backend directory):
+    python scripts/build_rate_calendar.py
+    python scripts/build_rate_calendar.py --start 2025-01-01 --days 730 --workers 8
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings  # noqa: E402
+from app.core.database import SessionLocal  # noqa: E402
+from app.services.rate_calendar import build_portfolio_calendar  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--start", type=date.fromisoformat, default=date.today(), help="first date (default: today)")
+    parser.add_argument("--days", type=int, default=settings.RATE_CALENDAR_DAYS)
+    parser.add_argument("--workers", type=int, default=settings.RATE_CALENDAR_WORKERS)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    with SessionLocal() as db:
+        summary = build_portfolio_calendar(
+            db, args.start, args.days, workers=args.workers,
+            on_progress=lambda done, total: print(f"\r{done}/{total} room types", end="", flush=True),
+        )
+        db.commit()
+    print(f"\n{summary['rows']} rows for {summary['room_types']} room types "
+          f"in {time.perf_counter() - started:.1f} s with {summary['workers']} workers")
+
+
+if __name__ == "__main__":
+    main()
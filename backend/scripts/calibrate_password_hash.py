@@ -0,0 +1,91 @@
+"""
+Measure password hashing cost on this machine and recommend settings.
+
+For each scheme, times a verify at a known cost, scales the cost linearly
+(pbkdf2 rounds, argon2 time cost) or by powers of two (bcrypt log rounds) to
+land near the target latency, then re-measures the recommendation. Print the
+suggested environment variables for the scheme you choose.
+
+Usage (from the backend directory):
+    python scripts/calibrate_password_hash.py --target-ms 100
+    python scripts/calibrate_password_hash.py --scheme argon2 --argon2-memory-kib 65536
+"""
+import argparse
+import math
+import time
+
+# Cost settings per scheme: (settings name, lower bound, starting value)
+SCHEMES = {
+    "pbkdf2_sha256": ("PASSWORD_PBKDF2_ROUNDS", 1000, 10000),
+    "argon2": ("PASSWORD_ARGON2_TIME_COST", 1, 2),
+    "bcrypt": ("PASSWORD_BCRYPT_ROUNDS", 4, 10),
+}
+
+
+def build_context(scheme: str, cost: int, argon2_memory_kib: int, argon2_parallelism: int):
+    from passlib.context import CryptContext
+
+    if scheme == "argon2":
+        return CryptContext(
+            schemes=[scheme],
+            argon2__rounds=cost,
+            argon2__memory_cost=argon2_memory_kib,
+            argon2__parallelism=argon2_parallelism,
+        )
+    return CryptContext(schemes=[scheme], **{f"{scheme}__rounds": cost})
+
+
+def time_verify(pwd_context, repeat: int) -> float:
+    """
+    Best-of-`repeat` verify time in seconds.
+    """
+    hashed = pwd_context.hash("calibration-password")
+    best = math.inf
+    for _ in range(repeat):
+        started = time.perf_counter()
+        pwd_context.verify("calibration-password", hashed)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def recommend(scheme: str, cost: int, seconds: float, target: float) -> int:
+    setting, lower, _ = SCHEMES[scheme]
+    if scheme == "bcrypt":
+        # Each extra log round doubles the work
+        return max(lower, cost + round(math.log2(target / seconds)))
+    return max(lower, int(cost * target / seconds))
+
+
+def calibrate(scheme: str, args) -> None:
+    setting, _, start = SCHEMES[scheme]
+    try:
+        seconds = time_verify(build_context(scheme, start, args.argon2_memory_kib, args.argon2_parallelism), args.repeat)
+    except Exception as exc:  # missing backend (argon2-cffi, bcrypt)
+        print(f"{scheme:<14} unavailable: {exc}")
+        return
+    cost = recommend(scheme, start, seconds, args.target_ms / 1000)
+    measured = time_verify(build_context(scheme, cost, args.argon2_memory_kib, args.argon2_parallelism), args.repeat)
+    print(f"{scheme:<14} {setting}={cost:<8} verify {measured * 1000:7.1f} ms (target {args.target_ms:.0f} ms)")
+    if scheme == "argon2":
+        print(f"{'':<14} PASSWORD_ARGON2_MEMORY_COST_KIB={args.argon2_memory_kib} "
+              f"PASSWORD_ARGON2_PARALLELISM={args.argon2_parallelism}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target-ms", type=float, default=100.0, help="desired verify latency")
+    parser.add_argument("--scheme", choices=sorted(SCHEMES), action="append",
+                        help="scheme to calibrate (repeatable, default: all)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--argon2-memory-kib", type=int, default=65536)
+    parser.add_argument("--argon2-parallelism", type=int, default=2)
+    args = parser.parse_args()
+
+    for scheme in args.scheme or SCHEMES:
+        calibrate(scheme, args)
+    print("\nPut the chosen scheme first in PASSWORD_SCHEMES and keep the old ones after it,")
+    print('e.g. PASSWORD_SCHEMES=\'["argon2", "pbkdf2_sha256"]\'; existing hashes upgrade on next login.')
+
+
+if __name__ == "__main__":
+    main()
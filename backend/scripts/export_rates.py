@@ -0,0 +1,44 @@
+"""
+Export hotels, room types, rate adjustments and the stored rate calendar
+as columnar files for analytics.
+
+Writes one file per table: Parquet or Arrow IPC when pyarrow is installed,
+otherwise NumPy .npz (see app.services.columnar_export for the layout).
+Load an npz export with `numpy.load(path)`; date columns are int32 days
+since 1970-01-01 (`.astype("datetime64[D]")`).
+
+Usage (from the backend directory):
+    python scripts/export_rates.py --output-dir exports
+    python scripts/export_rates.py --format npz --tables rate_adjustments rate_calendar
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import SessionLocal  # noqa: E402
+from app.services.columnar_export import FORMATS, TABLES, export_table, resolve_format  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--format", choices=("auto",) + FORMATS, default="auto")
+    parser.add_argument("--tables", choices=sorted(TABLES), nargs="+", default=list(TABLES))
+    parser.add_argument("--output-dir", default="exports")
+    args = parser.parse_args()
+
+    format = resolve_format(args.format)
+    os.makedirs(args.output_dir, exist_ok=True)
+    with SessionLocal() as db:
+        for table in args.tables:
+            path = os.path.join(args.output_dir, f"{table}.{format}")
+            started = time.perf_counter()
+            with open(path, "wb") as output:
+                export_table(db, table, output, format)
+            print(f"{path}: {os.path.getsize(path) / 1e6:.1f} MB in {time.perf_counter() - started:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""
+Load test for read endpoints across different worker counts.
+
+Starts the production server (gunicorn with uvicorn workers) once per worker
+count, drives it with concurrent GET requests and prints throughput and
+latency, so scaling with the number of workers can be compared.
+
+Usage (from the backend directory, after `alembic upgrade head` and `python seed.py`):
+    python scripts/load_test.py --workers 1 2 4 --duration 10 --concurrency 64
+"""
+import argparse
+import asyncio
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def start_server(workers: int, port: int) -> subprocess.Popen:
+    """
+    Start gunicorn with the given number of workers and wait until it answers.
+    """
+    env = {**os.environ, "WORKERS": str(workers), "PORT": str(port), "HOST": "127.0.0.1"}
+    process = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app.main:app"],
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/docs", timeout=1).status_code == 200:
+                return process
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f"Server with {workers} workers did not start")
+
+
+def stop_server(process: subprocess.Popen) -> None:
+    """
+    Ask gunicorn for a graceful shutdown and wait for it.
+    """
+    process.send_signal(signal.SIGTERM)
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def prepare(base_url: str, username: str, password: str) -> tuple:
+    """
+    Log in and make sure there is a hotel and room type to read.
+
+    Returns the auth headers and the read endpoints to exercise.
+    """
+    token = httpx.post(
+        f"{base_url}/auth/token", data={"username": username, "password": password}
+    ).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    hotels = httpx.get(f"{base_url}/hotels/?q=Load Test Hotel", headers=headers).json()
+    if hotels:
+        hotel_id = hotels[0]["id"]
+    else:
+        hotel_id = httpx.post(
+            f"{base_url}/hotels/", json={"name": "Load Test Hotel", "location": "Bench"}, headers=headers
+        ).json()["id"]
+    room_types = httpx.get(f"{base_url}/hotels/{hotel_id}/room-types/", headers=headers).json()
+    if room_types:
+        room_type_id = room_types[0]["id"]
+    else:
+        room_type_id = httpx.post(
+            f"{base_url}/room-types/",
+            json={"name": "Standard", "base_rate": 100.0, "hotel_id": hotel_id},
+            headers=headers,
+        ).json()["id"]
+
+    paths = [
+        "/hotels/",
+        f"/hotels/{hotel_id}",
+        f"/hotels/{hotel_id}/room-types/",
+        f"/room-types/{room_type_id}/effective-rate",
+    ]
+    return headers, paths
+
+
+async def run_load(base_url: str, headers: dict, paths: list, duration: float, concurrency: int) -> dict:
+    """
+    Issue GET requests from `concurrency` tasks for `duration` seconds.
+    """
+    latencies = []
+    errors = 0
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, headers=headers, limits=limits) as client:
+        deadline = time.perf_counter() + duration
+
+        async def worker(offset: int) -> None:
+            nonlocal errors
+            index = offset
+            while time.perf_counter() < deadline:
+                path = paths[index % len(paths)]
+                index += 1
+                started = time.perf_counter()
+                try:
+                    response = await client.get(path)
+                    if response.status_code != 200:
+                        errors += 1
+                        continue
+                except httpx.HTTPError:
+                    errors += 1
+                    continue
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(i) for i in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else 0.0,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000 if latencies else 0.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of load per worker count")
+    parser.add_argument("--concurrency", type=int, default=64, help="Concurrent client connections")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--username", default="admin")
+    parser.add_argument("--password", default="password123")
+    args = parser.parse_args()
+
+    base_url = f"http://127.0.0.1:{args.port}"
+    baseline = None
+    print(f"{'workers':>7} {'req/s':>10} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7} {'speedup':>8} {'efficiency':>10}")
+    for workers in args.workers:
+        process = start_server(workers, args.port)
+        try:
+            headers, paths = prepare(base_url, args.username, args.password)
+            result = asyncio.run(run_load(base_url, headers, paths, args.duration, args.concurrency))
+        finally:
+            stop_server(process)
+
+        if baseline is None:
+            baseline = result["rps"] / workers
+        speedup = result["rps"] / baseline
+        print(
+            f"{workers:>7} {result['rps']:>10.1f} {result['p50_ms']:>8.1f} {result['p99_ms']:>8.1f} "
+            f"{result['errors']:>7} {speedup:>7.2f}x {speedup / workers:>9.0%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Startup-time profile for the API.
+
+Imports the app in a fresh interpreter with `-X importtime`, then reports the
+slowest modules (cumulative and self time), the app import wall time and the
+time to serve a first authenticated-path request.
+
+Usage (from the backend directory):
+    python scripts/profile_startup.py --top 25
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TIMING_SCRIPT = """
+import time
+started = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+client = TestClient(app.main.app)
+client.get("/users/me", headers={"Authorization": "Bearer invalid"})
+print(imported - started, time.perf_counter() - imported)
+"""
+
+
+def parse_importtime(stderr: str) -> list:
+    """
+    Parse `-X importtime` output into (cumulative_us, self_us, module) tuples.
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|")
+        rows.append((int(cumulative_us), int(self_us), module.strip()))
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--top", type=int, default=25, help="Number of modules to list")
+    parser.add_argument("--prefix", default="", help="Only list modules starting with this prefix (e.g. app.)")
+    args = parser.parse_args()
+
+    profile = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+    )
+    rows = [row for row in parse_importtime(profile.stderr) if row[2].startswith(args.prefix)]
+
+    print(f"{'cumulative ms':>14} {'self ms':>8}  module")
+    for cumulative_us, self_us, module in sorted(rows, reverse=True)[:args.top]:
+        print(f"{cumulative_us / 1000:>14.1f} {self_us / 1000:>8.1f}  {module}")
+
+    print(f"\n{'self ms':>8}  module (by self time)")
+    for cumulative_us, self_us, module in sorted(rows, key=lambda row: row[1], reverse=True)[:args.top]:
+        print(f"{self_us / 1000:>8.1f}  {module}")
+
+    timing = subprocess.run(
+        [sys.executable, "-c", TIMING_SCRIPT], cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+    )
+    import_seconds, first_request_seconds = map(float, timing.stdout.split())
+    print(f"\napp import: {import_seconds * 1000:.0f} ms, first request: {first_request_seconds * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
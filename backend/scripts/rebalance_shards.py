@@ -0,0 +1,82 @@
+"""
+Rebalance hotel data across the shards in SQLALCHEMY_SHARD_URLS.
+
+Buckets of hotels (hotel_id % SHARD_BUCKETS) are moved between shards until
+every shard holds about the same number of rows; see app.services.sharding.
+Writes to a bucket are refused (503) while it moves, so moves run in small
+batches. Run the database migrations on a new shard before adding it.
+
+Usage (from the backend directory):
+    python scripts/rebalance_shards.py --dry-run
+    python scripts/rebalance_shards.py
+    python scripts/rebalance_shards.py --bucket 17 --to 2
+    python scripts/rebalance_shards.py --purge
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.sharding import plan_rebalance, shards  # noqa: E402
+
+
+def _print_move(move: dict) -> None:
+    print(f"bucket {move['bucket']}: shard {move['from']} -> {move['to']}, "
+          f"{move['hotels']} hotels, {move['rows']} rows")
+
+
+def _print_loads(weights: dict, owners: dict) -> None:
+    loads = [0] * len(shards.shards)
+    for bucket, rows in weights.items():
+        shard = owners.get(bucket, 0)
+        if shard < len(loads):
+            loads[shard] += rows
+    for index, rows in enumerate(loads):
+        print(f"shard {index}: {rows} rows")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="print the planned moves only")
+    parser.add_argument("--bucket", type=int, help="move this bucket only (with --to)")
+    parser.add_argument("--to", type=int, help="target shard of --bucket")
+    parser.add_argument("--purge", action="store_true", help="delete rows left behind by interrupted moves")
+    parser.add_argument("--batch-size", type=int, default=16, help="buckets frozen for writes at a time")
+    parser.add_argument("--settle-seconds", type=float, default=None,
+                        help="wait after freezing buckets (default: SHARD_MAP_TTL_SECONDS)")
+    args = parser.parse_args()
+
+    if not shards.enabled:
+        parser.error("SQLALCHEMY_SHARD_URLS is not set")
+    if (args.bucket is None) != (args.to is None):
+        parser.error("--bucket and --to go together")
+
+    if args.purge:
+        print(f"purged {shards.purge_orphans()} buckets")
+        return
+
+    started = time.perf_counter()
+    if args.bucket is not None:
+        for move in shards.move_buckets([(args.bucket, args.to)], args.settle_seconds):
+            _print_move(move)
+        return
+
+    weights = shards.bucket_weights()
+    owners = {bucket: shard for bucket, (shard, _) in shards.bucket_map().items()}
+    _print_loads(weights, owners)
+    if args.dry_run:
+        moves = plan_rebalance(weights, owners, len(shards.shards), shards.buckets)
+        for bucket, source, target in moves:
+            print(f"bucket {bucket}: shard {source} -> {target}, {weights.get(bucket, 0)} rows")
+        print(f"{len(moves)} buckets to move")
+        return
+
+    moved = shards.rebalance(args.settle_seconds, args.batch_size, on_move=_print_move)
+    print(f"moved {len(moved)} buckets in {time.perf_counter() - started:.1f} s")
+    _print_loads(shards.bucket_weights(), {bucket: shard for bucket, (shard, _) in shards.bucket_map().items()})
+
+
+if __name__ == "__main__":
+    main()
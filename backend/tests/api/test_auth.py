@@ -75,3 +75,53 @@ def test_access_protected_endpoint_with_malformed_header(client):
     response = client.get("/users/me", headers=headers)
     assert response.status_code == 401
 
+
+
+def test_login_rate_limited_per_username(client):
+    """Repeated attempts for one username are throttled with 429 and Retry-After."""
+    from app.core.rate_limit import login_ip_limiter, login_username_limiter
+    from app.core.config import settings
+
+    login_username_limiter.reset()
+    try:
+        for _ in range(settings.LOGIN_USERNAME_BURST):
+            response = client.post("/auth/token", data={"username": "Victim", "password": "guess"})
+            assert response.status_code == 401
+        response = client.post("/auth/token", data={"username": "victim", "password": "guess"})
+        assert response.status_code == 429
+        assert int(response.headers["Retry-After"]) >= 1
+    finally:
+        login_ip_limiter.reset()
+        login_username_limiter.reset()
+
+
+def test_login_hashing_queue_full(client, monkeypatch):
+    """When no hashing slot is free the login is rejected instead of queued."""
+    from app.core import security
+
+    monkeypatch.setattr(security, "password_hash_queue", security.HashingQueue(workers=1, max_pending=0))
+    response = client.post("/auth/token", data={"username": "admin", "password": "password123"})
+    assert response.status_code == 429
+
+
+def test_login_upgrades_outdated_password_hash(client, monkeypatch):
+    """A successful login rehashes passwords stored with an outdated cost."""
+    from app import services
+    from app.core.config import settings
+    from app.core.security import get_password_hash
+    from app.models.user import User
+    from tests.conftest import TestingSessionLocal
+
+    monkeypatch.setattr(settings, "PASSWORD_PBKDF2_ROUNDS", 1000)
+    db = TestingSessionLocal()
+    try:
+        db.add(User(username="legacy", password_hash=get_password_hash("legacy-pass")))
+        db.commit()
+        monkeypatch.setattr(settings, "PASSWORD_PBKDF2_ROUNDS", 2000)
+
+        response = client.post("/auth/token", data={"username": "legacy", "password": "legacy-pass"})
+        assert response.status_code == 200
+        db.expire_all()
+        assert "$2000$" in services.user.get_by_username(db, username="legacy").password_hash
+    finally:
+        db.close()
@@ -0,0 +1,110 @@
+"""
+Tests for the unit-of-work batch endpoint.
+"""
+
+
+def _setup_room_type(client, admin_headers, name):
+    hotel_id = client.post(
+        "/hotels/", json={"name": name, "location": "Batch City"}, headers=admin_headers
+    ).json()["id"]
+    room_type_id = client.post(
+        "/room-types/", json={"name": "Standard", "base_rate": 100.0, "hotel_id": hotel_id}, headers=admin_headers
+    ).json()["id"]
+    return hotel_id, room_type_id
+
+
+def test_batch_mixed_operations(client, admin_headers):
+    """Creates, updates and deletes across tables apply together, results in request order."""
+    hotel_id, room_type_id = _setup_room_type(client, admin_headers, "Batch Hotel")
+    adjustment_id = client.post(
+        "/rate-adjustments/",
+        json={"room_type_id": room_type_id, "adjustment_amount": 5, "effective_date": "2024-01-01", "reason": "Old"},
+        headers=admin_headers,
+    ).json()["id"]
+
+    response = client.post("/batch/", json={"operations": [
+        {"op": "create", "entity": "rate_adjustment", "data": {
+            "room_type_id": room_type_id, "adjustment_amount": 20, "effective_date": "2024-02-01", "reason": "Peak"}},
+        {"op": "update", "entity": "room_type", "id": room_type_id, "data": {"base_rate": 150.0}},
+        {"op": "delete", "entity": "rate_adjustment", "id": adjustment_id},
+        {"op": "update", "entity": "hotel", "id": hotel_id, "data": {"name": "Batch Hotel Renamed"}},
+        {"op": "create", "entity": "hotel", "data": {"name": "Batch Hotel Two", "location": "Elsewhere"}},
+    ]}, headers=admin_headers)
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [(r["index"], r["op"], r["entity"]) for r in results] == [
+        (0, "create", "rate_adjustment"),
+        (1, "update", "room_type"),
+        (2, "delete", "rate_adjustment"),
+        (3, "update", "hotel"),
+        (4, "create", "hotel"),
+    ]
+    assert results[2]["id"] == adjustment_id
+
+    assert client.get(f"/room-types/{room_type_id}", headers=admin_headers).json()["base_rate"] == 150.0
+    assert client.get(f"/rate-adjustments/{adjustment_id}", headers=admin_headers).status_code == 404
+    adjustments = client.get(f"/room-types/{room_type_id}/rate-adjustments/", headers=admin_headers).json()
+    assert [a["id"] for a in adjustments] == [results[0]["id"]]
+    assert client.get(f"/hotels/{results[4]['id']}", headers=admin_headers).json()["name"] == "Batch Hotel Two"
+    rate = client.get(
+        f"/room-types/{room_type_id}/effective-rate?date_str=2024-03-01", headers=admin_headers
+    ).json()
+    assert rate["effective_rate"] == 170.0
+    found = client.get("/hotels/?q=renamed", headers=admin_headers).json()
+    assert [h["id"] for h in found] == [hotel_id]
+
+
+def test_batch_missing_references_write_nothing(client, admin_headers):
+    """Missing targets or parents reject the whole batch with per-operation errors."""
+    _, room_type_id = _setup_room_type(client, admin_headers, "Batch Hotel Missing")
+    response = client.post("/batch/", json={"operations": [
+        {"op": "update", "entity": "room_type", "id": room_type_id, "data": {"base_rate": 999.0}},
+        {"op": "update", "entity": "hotel", "id": 99999, "data": {"name": "Ghost"}},
+        {"op": "create", "entity": "rate_adjustment", "data": {
+            "room_type_id": 99999, "adjustment_amount": 1, "effective_date": "2024-01-01", "reason": "x"}},
+    ]}, headers=admin_headers)
+    assert response.status_code == 422
+    assert response.json()["detail"] == [
+        {"index": 1, "detail": "Hotel not found"},
+        {"index": 2, "detail": "Room Type not found"},
+    ]
+    assert client.get(f"/room-types/{room_type_id}", headers=admin_headers).json()["base_rate"] == 100.0
+
+
+def test_batch_rejects_reference_to_deleted_parent(client, admin_headers):
+    _, room_type_id = _setup_room_type(client, admin_headers, "Batch Hotel Deleted Parent")
+    response = client.post("/batch/", json={"operations": [
+        {"op": "delete", "entity": "room_type", "id": room_type_id},
+        {"op": "create", "entity": "rate_adjustment", "data": {
+            "room_type_id": room_type_id, "adjustment_amount": 1, "effective_date": "2024-01-01", "reason": "x"}},
+    ]}, headers=admin_headers)
+    assert response.status_code == 422
+    assert response.json()["detail"] == [{"index": 1, "detail": "Room Type not found"}]
+
+
+def test_batch_invalid_operations(client, admin_headers):
+    """Operation shape and payloads are validated against the entity schemas."""
+    for operation in (
+        {"op": "update", "entity": "hotel", "data": {"name": "No id"}},
+        {"op": "create", "entity": "room_type", "data": {"name": "Free", "base_rate": 0, "hotel_id": 1}},
+        {"op": "delete", "entity": "hotel", "id": 1, "data": {"name": "x"}},
+    ):
+        response = client.post("/batch/", json={"operations": [operation]}, headers=admin_headers)
+        assert response.status_code == 422
+    response = client.post("/batch/", json={"operations": []}, headers=admin_headers)
+    assert response.status_code == 422
+
+
+def test_batch_conflict_rolls_back(client, admin_headers):
+    hotel_id, _ = _setup_room_type(client, admin_headers, "Batch Hotel Conflict")
+    response = client.post("/batch/", json={"operations": [
+        {"op": "update", "entity": "hotel", "id": hotel_id, "data": {"location": "Changed"}},
+        {"op": "create", "entity": "hotel", "data": {"name": "Batch Hotel Conflict", "location": "Dup"}},
+    ]}, headers=admin_headers)
+    assert response.status_code == 409
+    assert client.get(f"/hotels/{hotel_id}", headers=admin_headers).json()["location"] == "Batch City"
+
+
+def test_batch_requires_auth(client):
+    response = client.post("/batch/", json={"operations": [{"op": "delete", "entity": "hotel", "id": 1}]})
+    assert response.status_code == 401
@@ -0,0 +1,70 @@
+"""
+Tests for the change feed endpoint.
+"""
+import threading
+import time
+
+
+def test_change_feed_pages_by_cursor(client, admin_headers):
+    start = client.get("/changes/?limit=1000", headers=admin_headers).json()["next_cursor"]
+
+    hotel_id = client.post("/hotels/", json={"name": "Feed Hotel", "location": "Feedtown"}, headers=admin_headers).json()["id"]
+    room_type_id = client.post(
+        "/room-types/", json={"name": "Feed Room", "base_rate": 99.5, "hotel_id": hotel_id}, headers=admin_headers
+    ).json()["id"]
+    client.put(f"/hotels/{hotel_id}", json={"is_active": False}, headers=admin_headers)
+    client.delete(f"/room-types/{room_type_id}", headers=admin_headers)
+
+    feed = client.get(f"/changes/?since={start}", headers=admin_headers).json()
+    changes = feed["changes"]
+    assert [(c["entity"], c["entity_id"], c["action"]) for c in changes] == [
+        ("hotel", hotel_id, "create"),
+        ("room_type", room_type_id, "create"),
+        ("hotel", hotel_id, "update"),
+        ("room_type", room_type_id, "remove"),
+    ]
+    assert changes[0]["location"] == "Feedtown"
+    assert changes[1]["base_rate"] == 99.5
+    assert changes[2]["is_active"] is False
+    assert feed["next_cursor"] == changes[-1]["id"]
+
+    # Pages continue from the cursor and end empty with the cursor unchanged
+    first_page = client.get(f"/changes/?since={start}&limit=2", headers=admin_headers).json()
+    second_page = client.get(f"/changes/?since={first_page['next_cursor']}&limit=2", headers=admin_headers).json()
+    assert [c["id"] for c in first_page["changes"] + second_page["changes"]] == [c["id"] for c in changes]
+    empty = client.get(f"/changes/?since={feed['next_cursor']}", headers=admin_headers).json()
+    assert empty == {"changes": [], "next_cursor": feed["next_cursor"]}
+
+
+def test_change_feed_long_poll_wakes_on_write(client, admin_headers):
+    from app.schemas.hotel import HotelCreate
+    from app.services import hotel
+    from tests.conftest import TestingSessionLocal
+
+    cursor = client.get("/changes/?limit=1000", headers=admin_headers).json()["next_cursor"]
+
+    def write_later():
+        time.sleep(0.3)
+        db = TestingSessionLocal()
+        try:
+            hotel.create(db, HotelCreate(name="Long Poll Hotel", location="Waitville"))
+        finally:
+            db.close()
+
+    writer = threading.Thread(target=write_later)
+    writer.start()
+    started = time.monotonic()
+    feed = client.get(f"/changes/?since={cursor}&wait=10", headers=admin_headers).json()
+    elapsed = time.monotonic() - started
+    writer.join()
+
+    assert [c["name"] for c in feed["changes"]] == ["Long Poll Hotel"]
+    assert elapsed < 5
+
+
+def test_change_feed_wait_times_out(client, admin_headers):
+    cursor = client.get("/changes/?limit=1000", headers=admin_headers).json()["next_cursor"]
+    started = time.monotonic()
+    feed = client.get(f"/changes/?since={cursor}&wait=0.2", headers=admin_headers).json()
+    assert feed["changes"] == []
+    assert 0.15 < time.monotonic() - started < 5
@@ -42,3 +42,36 @@ def test_rate_adjustment_flow(client, admin_headers):
     # 3. Check New Rate
     response = client.get(f"/room-types/{room_id}/effective-rate", headers=admin_headers)
     assert response.json()["effective_rate"] == 250.0
+
+def test_search_hotels(client, admin_headers):
+    client.post("/hotels/", json={"name": "Searchable Sands", "location": "Dunes"}, headers=admin_headers)
+    client.post("/hotels/", json={"name": "Other Place", "location": "Sandton"}, headers=admin_headers)
+
+    response = client.get("/hotels/?q=sand", headers=admin_headers)
+    assert response.status_code == 200
+    assert [h["name"] for h in response.json()] == ["Searchable Sands", "Other Place"]
+
+    response = client.get("/hotels/?q=sand&limit=1&skip=1", headers=admin_headers)
+    assert [h["name"] for h in response.json()] == ["Other Place"]
+
+def test_hotel_reads_without_shared_bus(client, admin_headers, monkeypatch):
+    from sqlalchemy import delete, insert
+    from app.core.config import settings
+    from app.models.hotel import Hotel
+    from tests.conftest import TestingSessionLocal
+
+    hotel_id = client.post("/hotels/", json={"name": "Listed", "location": "Here"}, headers=admin_headers).json()["id"]
+    assert "Listed" in [h["name"] for h in client.get("/hotels/", headers=admin_headers).json()]
+
+    # Several workers on per-process buses: another worker's writes never reach this catalog
+    monkeypatch.setattr(settings, "WORKERS", 2)
+    monkeypatch.setattr(settings, "CACHE_BACKEND", "local")
+    db = TestingSessionLocal()
+    db.execute(insert(Hotel), [{"name": "Elsewhere", "location": "There", "is_active": True}])
+    db.execute(delete(Hotel).where(Hotel.id == hotel_id))
+    db.commit()
+    db.close()
+
+    names = [h["name"] for h in client.get("/hotels/", headers=admin_headers).json()]
+    assert "Elsewhere" in names and "Listed" not in names
+    assert client.get(f"/hotels/{hotel_id}", headers=admin_headers).status_code == 404
@@ -0,0 +1,151 @@
+"""
+Tests for Idempotency-Key support on create endpoints.
+"""
+from datetime import timedelta
+import pytest
+from fastapi import HTTPException
+from app import services
+from app.core.cache import MISS, get_cache
+from app.core.config import settings
+from app.models.hotel import RateAdjustment
+from app.models.idempotency import IdempotencyKey
+from app.services import idempotency_store
+from app.services.history import utcnow
+from app.services.idempotency import IDEMPOTENCY, IdempotentReplay, StoredResponse
+from tests.conftest import TestingSessionLocal
+
+
+def _room_type(client, headers, name):
+    hotel_id = client.post("/hotels/", json={"name": name, "location": "Retry City"}, headers=headers).json()["id"]
+    return client.post(
+        "/room-types/", json={"name": "Double", "base_rate": 100.0, "hotel_id": hotel_id}, headers=headers
+    ).json()["id"]
+
+
+def _adjustment_count(room_type_id):
+    with TestingSessionLocal() as db:
+        return db.query(RateAdjustment).filter(RateAdjustment.room_type_id == room_type_id).count()
+
+
+def test_retry_replays_first_response(client, admin_headers):
+    """Test that a retried create returns the first response without writing again."""
+    room_type_id = _room_type(client, admin_headers, "Retry Hotel")
+    payload = {"room_type_id": room_type_id, "adjustment_amount": 15.0, "effective_date": "2031-01-01", "reason": "Event"}
+    headers = {**admin_headers, "Idempotency-Key": "adjustment-1"}
+
+    first = client.post("/rate-adjustments/", json=payload, headers=headers)
+    assert first.status_code == 200
+    assert "Idempotent-Replayed" not in first.headers
+
+    retry = client.post("/rate-adjustments/", json=payload, headers=headers)
+    assert retry.status_code == 200
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert retry.json() == first.json()
+
+    # Also from the table, as in a worker that did not see the first request
+    get_cache().clear()
+    assert client.post("/rate-adjustments/", json=payload, headers=headers).json() == first.json()
+    assert _adjustment_count(room_type_id) == 1
+
+    # Without a key every request writes
+    for _ in range(2):
+        assert client.post("/rate-adjustments/", json=payload, headers=admin_headers).status_code == 200
+    assert _adjustment_count(room_type_id) == 3
+
+
+def test_key_conflicts(client, admin_headers):
+    """Test that a key cannot be reused for another request or while its request runs."""
+    room_type_id = _room_type(client, admin_headers, "Conflict Hotel")
+    payload = {"room_type_id": room_type_id, "adjustment_amount": 5.0, "effective_date": "2031-01-01", "reason": "Promo"}
+    headers = {**admin_headers, "Idempotency-Key": "adjustment-2"}
+    assert client.post("/rate-adjustments/", json=payload, headers=headers).status_code == 200
+
+    response = client.post("/rate-adjustments/", json={**payload, "adjustment_amount": 6.0}, headers=headers)
+    assert response.status_code == 422
+    response = client.post("/hotels/", json={"name": "Other", "location": "Elsewhere"}, headers=headers)
+    assert response.status_code == 422
+
+    # Reserved by a request that is still running
+    with TestingSessionLocal() as db:
+        db.query(IdempotencyKey).filter(IdempotencyKey.key == "adjustment-2").update({"status_code": None})
+        db.commit()
+    get_cache().clear()
+    response = client.post("/rate-adjustments/", json=payload, headers=headers)
+    assert response.status_code == 409
+    assert response.headers["Retry-After"] == "1"
+    assert _adjustment_count(room_type_id) == 1
+
+    response = client.post("/rate-adjustments/", json=payload, headers={**admin_headers, "Idempotency-Key": "x" * 256})
+    assert response.status_code == 422
+
+
+def test_client_errors_are_replayed_and_keys_expire(client, admin_headers):
+    """Test that error responses are stored too, and expired keys are swept."""
+    headers = {**admin_headers, "Idempotency-Key": "missing-room"}
+    payload = {"room_type_id": 999_999, "adjustment_amount": 5.0, "effective_date": "2031-01-01", "reason": "Promo"}
+    assert client.post("/rate-adjustments/", json=payload, headers=headers).status_code == 404
+    retry = client.post("/rate-adjustments/", json=payload, headers=headers)
+    assert retry.status_code == 404
+    assert retry.headers["Idempotent-Replayed"] == "true"
+
+    with TestingSessionLocal() as db:
+        db.query(IdempotencyKey).filter(IdempotencyKey.key == "missing-room").update(
+            {"expires_at": utcnow() - timedelta(seconds=1)}
+        )
+        db.commit()
+    assert idempotency_store.sweep() == 1
+    with TestingSessionLocal() as db:
+        assert db.query(IdempotencyKey).filter(IdempotencyKey.key == "missing-room").count() == 0
+
+
+def test_server_errors_release_the_key(client, admin_headers, monkeypatch):
+    """Test that a 5xx response or a failure before responding frees the key for a retry."""
+    room_type_id = _room_type(client, admin_headers, "Flaky Hotel")
+    payload = {"room_type_id": room_type_id, "adjustment_amount": 5.0, "effective_date": "2031-01-01", "reason": "Promo"}
+    headers = {**admin_headers, "Idempotency-Key": "flaky"}
+    create = services.rate_adjustment.create
+
+    def unavailable(*args, **kwargs):
+        raise HTTPException(status_code=503, detail="Try again")
+
+    def crash(*args, **kwargs):
+        raise RuntimeError("worker died")
+
+    monkeypatch.setattr(services.rate_adjustment, "create", unavailable)
+    assert client.post("/rate-adjustments/", json=payload, headers=headers).status_code == 503
+    monkeypatch.setattr(services.rate_adjustment, "create", crash)
+    with pytest.raises(RuntimeError):
+        client.post("/rate-adjustments/", json=payload, headers=headers)
+    with TestingSessionLocal() as db:
+        assert db.query(IdempotencyKey).filter(IdempotencyKey.key == "flaky").count() == 0
+
+    monkeypatch.setattr(services.rate_adjustment, "create", create)
+    response = client.post("/rate-adjustments/", json=payload, headers=headers)
+    assert response.status_code == 200
+    assert "Idempotent-Replayed" not in response.headers
+    assert _adjustment_count(room_type_id) == 1
+
+
+def test_abandoned_reservation_taken_over(client, monkeypatch):
+    """Test that a slow request finishing after a retry took its key over leaves the new reservation alone."""
+    monkeypatch.setattr(settings, "IDEMPOTENCY_LOCK_SECONDS", 0)
+    slow = idempotency_store.begin(1, "takeover", "fingerprint")
+    retry = idempotency_store.begin(1, "takeover", "fingerprint")
+    assert retry.created_at > slow.created_at
+
+    idempotency_store.release(slow)
+    assert idempotency_store.complete(slow, StoredResponse(201, "application/json", b"slow")) is False
+    with TestingSessionLocal() as db:
+        row = db.query(IdempotencyKey).filter(IdempotencyKey.key == "takeover").one()
+        assert (row.created_at, row.status_code) == (retry.created_at, None)
+
+    assert idempotency_store.complete(retry, StoredResponse(201, "application/json", b"retry")) is True
+    with pytest.raises(IdempotentReplay) as replay:
+        idempotency_store.begin(1, "takeover", "fingerprint")
+    assert replay.value.response.body == b"retry"
+
+    # Responses are cached only as long as their row lives
+    monkeypatch.setattr(settings, "IDEMPOTENCY_KEY_TTL_SECONDS", 0)
+    short = idempotency_store.begin(1, "short-lived", "fingerprint")
+    assert idempotency_store.complete(short, StoredResponse(201, "application/json", b"short")) is True
+    assert get_cache().get(IDEMPOTENCY, "1:short-lived") is MISS
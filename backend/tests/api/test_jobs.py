@@ -0,0 +1,87 @@
+from datetime import date
+from app.services import job_runner
+
+
+def _create_room(client, admin_headers, hotel_name, base_rate):
+    hotel = client.post("/hotels/", json={"name": hotel_name, "location": "Jobs"}, headers=admin_headers).json()
+    room = client.post(
+        "/room-types/", json={"name": "Standard", "base_rate": base_rate, "hotel_id": hotel["id"]}, headers=admin_headers
+    ).json()
+    return hotel, room
+
+
+def test_bulk_rate_adjustment_job(client, admin_headers):
+    hotel, room = _create_room(client, admin_headers, "Bulk Job Hotel", 100.0)
+    client.post("/room-types/", json={"name": "Suite", "base_rate": 200.0, "hotel_id": hotel["id"]}, headers=admin_headers)
+
+    response = client.post("/jobs/", json={"kind": "bulk_rate_adjustment", "params": {
+        "hotel_ids": [hotel["id"]],
+        "adjustment_amount": 15.5,
+        "effective_date": "2031-03-01",
+        "reason": "Season",
+    }}, headers=admin_headers)
+    assert response.status_code == 202
+    job = response.json()
+    assert job["status"] == "queued"
+    assert client.get(f"/jobs/{job['id']}/result", headers=admin_headers).status_code == 409
+
+    assert job_runner.run_pending() == 1
+
+    job = client.get(f"/jobs/{job['id']}", headers=admin_headers).json()
+    assert job["status"] == "succeeded"
+    assert (job["progress"], job["total"], job["attempts"]) == (2, 2, 1)
+    assert client.get(f"/jobs/{job['id']}/result", headers=admin_headers).json() == {"created": 2}
+
+    rate = client.get(
+        f"/room-types/{room['id']}/effective-rate", params={"date_str": "2031-03-02"}, headers=admin_headers
+    ).json()
+    assert rate["effective_rate"] == 115.5
+
+
+def test_rate_calendar_job(client, admin_headers):
+    hotel, room = _create_room(client, admin_headers, "Calendar Job Hotel", 80.0)
+    client.post("/rate-adjustments/", json={
+        "room_type_id": room["id"], "adjustment_amount": 20.0, "effective_date": "2031-05-02",
+        "end_date": "2031-05-02", "reason": "Event",
+    }, headers=admin_headers)
+
+    job = client.post("/jobs/", json={"kind": "rate_calendar", "params": {
+        "hotel_ids": [hotel["id"]], "start_date": "2031-05-01", "end_date": "2031-05-03",
+    }}, headers=admin_headers).json()
+    job_runner.run_pending()
+
+    result = client.get(f"/jobs/{job['id']}/result", headers=admin_headers).json()
+    assert result["dates"] == ["2031-05-01", "2031-05-02", "2031-05-03"]
+    assert result["room_types"] == [{
+        "room_type_id": room["id"], "hotel_id": hotel["id"], "name": "Standard",
+        "effective_rates": [80.0, 100.0, 80.0],
+    }]
+
+
+def test_submit_job_validation(client, admin_headers):
+    response = client.post("/jobs/", json={"kind": "rate_calendar", "params": {
+        "start_date": str(date(2031, 1, 2)), "end_date": str(date(2031, 1, 1)),
+    }}, headers=admin_headers)
+    assert response.status_code == 422
+    response = client.post("/jobs/", json={"kind": "reindex", "params": {}}, headers=admin_headers)
+    assert response.status_code == 422
+
+
+def test_job_not_found(client, admin_headers):
+    assert client.get("/jobs/99999", headers=admin_headers).status_code == 404
+    assert client.get("/jobs/99999/result", headers=admin_headers).status_code == 404
+
+
+def test_portfolio_rate_calendar_job(client, admin_headers):
+    _create_room(client, admin_headers, "Portfolio Job Hotel", 90.0)
+
+    job = client.post("/jobs/", json={"kind": "portfolio_rate_calendar", "params": {
+        "start_date": "2031-07-01", "days": 3, "workers": 1,
+    }}, headers=admin_headers).json()
+    job_runner.run_pending()
+
+    job = client.get(f"/jobs/{job['id']}", headers=admin_headers).json()
+    assert job["status"] == "succeeded"
+    assert job["progress"] == job["total"]
+    result = client.get(f"/jobs/{job['id']}/result", headers=admin_headers).json()
+    assert result["rows"] == result["room_types"] * 3
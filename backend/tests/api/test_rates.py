@@ -0,0 +1,187 @@
+"""
+Tests for rate calculation API endpoints.
+"""
+import io
+from datetime import date, timedelta
+from app.services.columnar_export import load_npz
+
+
+def test_stay_quote(client, admin_headers):
+    """Test quoting a multi-night stay for several room types."""
+    hotel_id = client.post(
+        "/hotels/",
+        json={"name": "Quote API Hotel", "location": "City"},
+        headers=admin_headers
+    ).json()["id"]
+    suite_id = client.post(
+        "/room-types/",
+        json={"name": "Suite", "base_rate": 200.0, "hotel_id": hotel_id},
+        headers=admin_headers
+    ).json()["id"]
+    double_id = client.post(
+        "/room-types/",
+        json={"name": "Double", "base_rate": 120.0, "hotel_id": hotel_id},
+        headers=admin_headers
+    ).json()["id"]
+
+    check_in = date.today() + timedelta(days=30)
+    client.post(
+        "/rate-adjustments/",
+        json={
+            "room_type_id": suite_id,
+            "adjustment_amount": 50.0,
+            "effective_date": (check_in + timedelta(days=1)).isoformat(),
+            "reason": "Weekend"
+        },
+        headers=admin_headers
+    )
+
+    response = client.post(
+        "/stay-quotes/",
+        json={
+            "room_type_ids": [suite_id, double_id],
+            "check_in": check_in.isoformat(),
+            "check_out": (check_in + timedelta(days=3)).isoformat(),
+        },
+        headers=admin_headers
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["nights"] == 3
+
+    suite_quote, double_quote = data["quotes"]
+    assert suite_quote["room_type_id"] == suite_id
+    assert [n["effective_rate"] for n in suite_quote["nightly_rates"]] == [200.0, 250.0, 250.0]
+    assert suite_quote["total"] == 700.0
+    assert double_quote["total"] == 360.0
+
+
+def test_stay_quote_unknown_room_type(client, admin_headers):
+    """Test quoting a non-existent room type returns 404."""
+    response = client.post(
+        "/stay-quotes/",
+        json={"room_type_ids": [9999], "check_in": "2030-01-01", "check_out": "2030-01-02"},
+        headers=admin_headers
+    )
+    assert response.status_code == 404
+
+
+def test_stay_quote_invalid_dates(client, admin_headers):
+    """Test that check_out must be after check_in."""
+    response = client.post(
+        "/stay-quotes/",
+        json={"room_type_ids": [1], "check_in": "2030-01-05", "check_out": "2030-01-05"},
+        headers=admin_headers
+    )
+    assert response.status_code == 422
+
+
+def test_effective_rates_batch(client, admin_headers):
+    """Test batch effective-rate lookup keeps input order and marks unknown room types."""
+    hotel_id = client.post(
+        "/hotels/",
+        json={"name": "Batch API Hotel", "location": "City"},
+        headers=admin_headers
+    ).json()["id"]
+    room_id = client.post(
+        "/room-types/",
+        json={"name": "Suite", "base_rate": 200.0, "hotel_id": hotel_id},
+        headers=admin_headers
+    ).json()["id"]
+
+    future_date = date.today() + timedelta(days=10)
+    client.post(
+        "/rate-adjustments/",
+        json={
+            "room_type_id": room_id,
+            "adjustment_amount": -25.0,
+            "effective_date": future_date.isoformat(),
+            "reason": "Promo"
+        },
+        headers=admin_headers
+    )
+
+    response = client.post(
+        "/effective-rates/batch",
+        json={"items": [
+            {"room_type_id": room_id, "date": future_date.isoformat()},
+            {"room_type_id": 9999, "date": future_date.isoformat()},
+            {"room_type_id": room_id, "date": date.today().isoformat()},
+        ]},
+        headers=admin_headers
+    )
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [r["found"] for r in results] == [True, False, True]
+    assert results[0]["effective_rate"] == 175.0
+    assert results[1]["room_type_id"] == 9999
+    assert results[1]["effective_rate"] is None
+    assert results[2]["effective_rate"] == 200.0
+
+
+def test_lowest_rates_search(client, admin_headers):
+    """Test searching the cheapest rate per hotel in a location."""
+    for name, base_rate in [("LAR Budget", 90.0), ("LAR Deluxe", 250.0)]:
+        hotel_id = client.post(
+            "/hotels/",
+            json={"name": name, "location": "LAR City"},
+            headers=admin_headers
+        ).json()["id"]
+        client.post(
+            "/room-types/",
+            json={"name": "Standard", "base_rate": base_rate, "hotel_id": hotel_id},
+            headers=admin_headers
+        )
+
+    response = client.get("/lowest-rates/?location=LAR City", headers=admin_headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert [h["name"] for h in data] == ["LAR Budget", "LAR Deluxe"]
+    assert data[0]["lowest_rate"] == 90.0
+
+    response = client.get("/lowest-rates/?location=LAR City&sort=desc&limit=1", headers=admin_headers)
+    assert [h["name"] for h in response.json()] == ["LAR Deluxe"]
+
+    response = client.get("/lowest-rates/?location=LAR City&date_str=bad", headers=admin_headers)
+    assert response.status_code == 422
+
+
+def test_effective_rate_as_of(client, admin_headers):
+    """as_of returns the rate as it stood before a later update."""
+    import time
+    from datetime import datetime, timezone
+
+    hotel_id = client.post("/hotels/", json={"name": "As Of API Hotel", "location": "Loc"}, headers=admin_headers).json()["id"]
+    room_type_id = client.post(
+        "/room-types/", json={"name": "Std", "base_rate": 80.0, "hotel_id": hotel_id}, headers=admin_headers
+    ).json()["id"]
+    time.sleep(0.002)
+    quoted_at = datetime.now(timezone.utc).isoformat()
+    time.sleep(0.002)
+    client.put(f"/room-types/{room_type_id}", json={"base_rate": 95.0}, headers=admin_headers)
+
+    params = {"date_str": "2030-01-01", "as_of": quoted_at}
+    past = client.get(f"/room-types/{room_type_id}/effective-rate", params=params, headers=admin_headers)
+    assert past.status_code == 200
+    assert past.json()["effective_rate"] == 80.0
+    current = client.get(f"/room-types/{room_type_id}/effective-rate?date_str=2030-01-01", headers=admin_headers)
+    assert current.json()["effective_rate"] == 95.0
+
+    batch = client.post("/effective-rates/batch", json={
+        "items": [{"room_type_id": room_type_id, "date": "2030-01-01"}], "as_of": quoted_at,
+    }, headers=admin_headers)
+    assert batch.json()["results"][0]["effective_rate"] == 80.0
+
+
+def test_rate_stream_unknown_hotel(client, admin_headers):
+    response = client.get("/hotels/99999/rate-stream", headers=admin_headers)
+    assert response.status_code == 404
+
+
+def test_export_rate_adjustments(client, admin_headers):
+    """Test downloading rate adjustments as a columnar npz file."""
+    response = client.get("/exports/rate_adjustments", params={"format": "npz"}, headers=admin_headers)
+    assert response.status_code == 200
+    assert response.headers["content-disposition"] == 'attachment; filename="rate_adjustments.npz"'
+    arrays = load_npz(io.BytesIO(response.content))
+    assert {"id", "room_type_id", "effective_date", "reason", "reason.dictionary"} <= set(arrays)
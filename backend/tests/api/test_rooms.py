@@ -45,6 +45,8 @@ def test_get_room_type_not_found(client, admin_headers):
     """Test getting non-existent room type returns 404."""
     response = client.get("/room-types/9999", headers=admin_headers)
     assert response.status_code == 404
+    response = client.get("/room-types/9999/rate-adjustments/", headers=admin_headers)
+    assert response.status_code == 404
 
 
 def test_update_room_type(client, admin_headers):
@@ -243,3 +245,42 @@ def test_effective_rate_with_specific_date(client, admin_headers):
         headers=admin_headers
     )
     assert response_future.json()["effective_rate"] == 250.0
+
+
+def test_rate_adjustment_date_range_validation(client, admin_headers):
+    """end_date before effective_date is rejected on create and update."""
+    hotel_id = client.post(
+        "/hotels/", json={"name": "Range RA Hotel", "location": "City"}, headers=admin_headers
+    ).json()["id"]
+    room_id = client.post(
+        "/room-types/", json={"name": "Suite", "base_rate": 200.0, "hotel_id": hotel_id}, headers=admin_headers
+    ).json()["id"]
+
+    payload = {
+        "room_type_id": room_id,
+        "adjustment_amount": 30.0,
+        "effective_date": "2031-07-01",
+        "end_date": "2031-06-30",
+        "reason": "Summer",
+    }
+    assert client.post("/rate-adjustments/", json=payload, headers=admin_headers).status_code == 422
+
+    payload["end_date"] = "2031-09-28"
+    created = client.post("/rate-adjustments/", json=payload, headers=admin_headers)
+    assert created.status_code == 200
+    assert created.json()["end_date"] == "2031-09-28"
+    assert created.json()["priority"] == 0
+    adj_id = created.json()["id"]
+
+    response = client.put(f"/rate-adjustments/{adj_id}", json={"end_date": "2031-06-01"}, headers=admin_headers)
+    assert response.status_code == 422
+    response = client.put(
+        f"/rate-adjustments/{adj_id}", json={"end_date": None, "priority": 2}, headers=admin_headers
+    )
+    assert response.status_code == 200
+    assert response.json()["end_date"] is None
+    assert response.json()["priority"] == 2
+    for field in ("priority", "adjustment_amount", "reason"):
+        response = client.put(f"/rate-adjustments/{adj_id}", json={field: None}, headers=admin_headers)
+        assert response.status_code == 422
+    assert client.get(f"/rate-adjustments/{adj_id}", headers=admin_headers).json()["priority"] == 2
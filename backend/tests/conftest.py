@@ -5,10 +5,13 @@ from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
 from app.main import app
-from app.api.deps import get_db
+from app.api.deps import get_db, get_read_db
 from app.core.database import Base
 from app.models.user import User
 from app.core.security import get_password_hash
+from app.core.cache import get_cache
+from app.core.rate_limit import login_ip_limiter, login_username_limiter
+from app.services import cache_warmer, catalog, idempotency_store, job_runner, rate_stream_hub
 
 # Use in-memory SQLite for tests
 SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
@@ -24,6 +27,8 @@ TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engin
 @pytest.fixture(scope="module")
 def test_db():
     Base.metadata.create_all(bind=engine)
+    get_cache().clear()
+    catalog.reset()
     db = TestingSessionLocal()
     
     # Seed Admin if not exists
@@ -63,6 +68,16 @@ def client(test_db):
             db.close()
     
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    rate_stream_hub.session_factory = TestingSessionLocal
+    # Tests run queued jobs explicitly with job_runner.run_pending()
+    job_runner.session_factory = TestingSessionLocal
+    job_runner.workers = 0
+    cache_warmer.session_factory = TestingSessionLocal
+    catalog.session_factory = TestingSessionLocal
+    idempotency_store.session_factory = TestingSessionLocal
+    login_ip_limiter.reset()
+    login_username_limiter.reset()
     with TestClient(app) as c:
         yield c
 
@@ -0,0 +1,91 @@
+"""
+Tests for cache backends and cross-worker invalidation.
+"""
+import time
+from app.core.cache import (
+    MISS,
+    InvalidationBus,
+    LocalCache,
+    SQLiteCache,
+    SQLiteInvalidationBus,
+    TieredCache,
+)
+
+
+def test_local_cache_is_bounded_lru():
+    """Test that the least recently used entry is evicted first."""
+    cache = LocalCache(max_entries=2, default_ttl=60)
+    cache.set("ns", "a", 1)
+    cache.set("ns", "b", 2)
+    assert cache.get("ns", "a") == 1  # "b" is now least recently used
+    cache.set("ns", "c", 3)
+
+    assert cache.get("ns", "b") is MISS
+    assert cache.get("ns", "a") == 1
+    assert len(cache) == 2
+
+
+def test_local_cache_expiry():
+    """Test that expired entries are not served."""
+    cache = LocalCache(max_entries=10, default_ttl=60)
+    cache.set("ns", "short", "value", ttl=0.01)
+    time.sleep(0.02)
+    assert cache.get("ns", "short") is MISS
+
+
+def test_invalidate_by_tag():
+    """Test that invalidating a tag drops only entries carrying it."""
+    cache = TieredCache(LocalCache(max_entries=10, default_ttl=60), bus=InvalidationBus())
+    cache.set("rates", "1:2030-01-01", 100, tag=1)
+    cache.set("rates", "1:2030-01-02", 110, tag=1)
+    cache.set("rates", "2:2030-01-01", 200, tag=2)
+
+    cache.invalidate("rates", 1)
+    assert cache.get("rates", "1:2030-01-01") is MISS
+    assert cache.get("rates", "1:2030-01-02") is MISS
+    assert cache.get("rates", "2:2030-01-01") == 200
+
+
+def _worker_cache(path):
+    return TieredCache(
+        LocalCache(max_entries=100, default_ttl=60),
+        bus=SQLiteInvalidationBus(path, poll_interval=0),
+        shared=SQLiteCache(path, default_ttl=60),
+    )
+
+
+def test_shared_cache_across_workers(tmp_path):
+    """Test that two workers share entries and see each other's invalidations."""
+    path = str(tmp_path / "cache.db")
+    worker_a = _worker_cache(path)
+    worker_b = _worker_cache(path)
+
+    worker_a.set("rates", "7:2030-01-01", {"effective_rate": 120.0}, tag=7)
+    # Worker B misses locally and is served from the shared store
+    assert worker_b.get("rates", "7:2030-01-01") == {"effective_rate": 120.0}
+
+    events = []
+    worker_b.subscribe(lambda namespace, tag: events.append((namespace, tag)))
+    worker_a.invalidate("rates", 7)
+
+    # Worker B drops its local copy on the next poll
+    assert worker_b.get("rates", "7:2030-01-01") is MISS
+    assert events == [("rates", "7")]
+
+
+def test_value_read_before_an_invalidation_is_not_cached(tmp_path):
+    """Test that a value read before another worker's write is dropped, here and in the shared store."""
+    path = str(tmp_path / "cache.db")
+    worker_a = _worker_cache(path)
+    worker_b = _worker_cache(path)
+
+    generation = worker_a.generation("rates", 7)
+    # Worker B writes and invalidates after A read the old value from the database
+    worker_b.invalidate("rates", 7)
+    worker_a.set("rates", "7:2030-01-01", {"effective_rate": 120.0}, tag=7, generation=generation)
+    assert worker_a.get("rates", "7:2030-01-01") is MISS
+    assert worker_b.get("rates", "7:2030-01-01") is MISS
+
+    generation = worker_a.generation("rates", 7)
+    worker_a.set("rates", "7:2030-01-01", {"effective_rate": 110.0}, tag=7, generation=generation)
+    assert worker_b.get("rates", "7:2030-01-01") == {"effective_rate": 110.0}
@@ -0,0 +1,19 @@
+"""
+Tests for integer-cents money helpers.
+"""
+from decimal import Decimal
+from app.core.money import from_cents, to_cents
+
+
+def test_to_cents_rounds_half_even():
+    assert to_cents(19.99) == 1999
+    assert to_cents(0.1) == 10
+    assert to_cents(-0.125) == -12
+    assert to_cents("0.135") == 14
+    assert to_cents(Decimal("150")) == 15000
+
+
+def test_from_cents_is_exact():
+    assert from_cents(1999) == Decimal("19.99")
+    assert from_cents(-10) == Decimal("-0.10")
+    assert str(from_cents(15000)) == "150.00"
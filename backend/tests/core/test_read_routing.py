@@ -0,0 +1,113 @@
+"""
+Tests for read replica routing.
+"""
+import sqlite3
+from datetime import date
+import pytest
+from pydantic import ValidationError
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from app.core import database
+from app.core.cache import MISS, get_cache
+from app.core.config import Settings
+from app.core.database import Base, ReplicaSet, is_replica, tag_writer, wrote_recently
+from app.models.hotel import Hotel, RoomType
+from app.services import invalidation
+from app.services.rate_service import _cache_key, rate_service
+
+
+def _database(path, name):
+    connection = sqlite3.connect(path)
+    connection.execute("CREATE TABLE origin (name TEXT)")
+    connection.execute("INSERT INTO origin VALUES (?)", (name,))
+    connection.commit()
+    connection.close()
+    return f"sqlite:///{path}"
+
+
+def _origin(session):
+    with session as db:
+        return db.execute(text("SELECT name FROM origin")).scalar()
+
+
+def _primary(tmp_path):
+    return sessionmaker(bind=create_engine(_database(tmp_path / "primary.db", "primary")))
+
+
+def test_reads_rotate_across_replicas(tmp_path):
+    """Test that read sessions alternate between replicas."""
+    replicas = ReplicaSet(
+        [_database(tmp_path / "a.db", "a"), _database(tmp_path / "b.db", "b")],
+        check_interval=60,
+        primary=_primary(tmp_path),
+    )
+    assert [_origin(replicas.session()) for _ in range(4)] == ["a", "b", "a", "b"]
+    assert _origin(replicas.session(use_primary=True)) == "primary"
+
+
+def test_unhealthy_replicas_are_skipped(tmp_path):
+    """Test that a failing replica is skipped and the primary serves when none is healthy."""
+    missing = f"sqlite:///file:{tmp_path / 'missing.db'}?mode=ro&uri=true"
+    replicas = ReplicaSet(
+        [missing, _database(tmp_path / "a.db", "a")], check_interval=60, primary=_primary(tmp_path)
+    )
+    assert [_origin(replicas.session()) for _ in range(3)] == ["a", "a", "a"]
+    assert replicas.replicas[0].healthy is False
+
+    replicas.mark_failed(replicas.replicas[1])
+    assert _origin(replicas.session()) == "primary"
+
+
+def test_failed_replica_rejoins_after_check_interval(tmp_path):
+    """Test that a replica marked failed is checked again once the interval passes."""
+    replicas = ReplicaSet([_database(tmp_path / "a.db", "a")], check_interval=0, primary=_primary(tmp_path))
+    db = replicas.session()
+    replica = replicas.replica_of(db)
+    db.close()
+    replicas.mark_failed(replica)
+
+    assert _origin(replicas.session()) == "a"
+    assert replica.healthy is True
+
+
+def test_writer_reads_primary_after_commit(tmp_path, monkeypatch):
+    """Test that a client's commit marks it as a recent writer."""
+    primary = _primary(tmp_path)
+    replicas = ReplicaSet([_database(tmp_path / "a.db", "a")], check_interval=60, primary=primary)
+    monkeypatch.setattr(database, "read_replicas", replicas)
+    assert not wrote_recently("client-1")
+
+    with primary() as db:
+        tag_writer(db, "client-1")
+        db.execute(text("INSERT INTO origin VALUES ('written')"))
+        db.commit()
+
+    assert wrote_recently("client-1")
+    assert not wrote_recently("client-2")
+    assert _origin(replicas.session(use_primary=wrote_recently("client-1"))) == "primary"
+
+
+def test_replica_reads_are_not_cached(tmp_path):
+    """Test that rates read on a replica are returned but kept out of the shared cache."""
+    url = f"sqlite:///{tmp_path / 'replica.db'}"
+    Base.metadata.create_all(create_engine(url))
+    replicas = ReplicaSet([url], check_interval=60, primary=_primary(tmp_path))
+    with replicas.session() as db:
+        assert is_replica(db)
+        db.add(Hotel(id=1, name="Lagging", location="Replica"))
+        db.add(RoomType(id=1, name="Double", base_rate=120, hotel_id=1))
+        db.commit()
+        get_cache().clear()
+        assert rate_service.calculate_effective_rate(db, 1, date(2031, 1, 1))["effective_rate"] == 120
+    assert get_cache().get(invalidation.RATES, _cache_key(1, date(2031, 1, 1))) is MISS
+    with replicas.session(use_primary=True) as db:
+        assert not is_replica(db)
+
+
+def test_replicas_need_shared_cache_with_several_workers():
+    """Test that read-your-writes markers must be shared when several workers serve requests."""
+    replica_urls = ["sqlite:///replica.db"]
+    with pytest.raises(ValidationError):
+        Settings(SQLALCHEMY_REPLICA_URLS=replica_urls, CACHE_BACKEND="local", WORKERS=2)
+    assert Settings(SQLALCHEMY_REPLICA_URLS=replica_urls, CACHE_BACKEND="sqlite", WORKERS=2).WORKERS == 2
+    assert Settings(SQLALCHEMY_REPLICA_URLS=replica_urls, CACHE_BACKEND="local", WORKERS=1).WORKERS == 1
@@ -1,12 +1,21 @@
 """
 Tests for security module (password hashing and JWT tokens).
 """
+import threading
+import time
 from datetime import timedelta
 import jwt
+import pytest
+from app.core.rate_limit import TokenBucketLimiter
 from app.core.security import (
+    HashingQueue,
+    HashingQueueFull,
+    TokenCache,
+    verify_and_update_password,
     verify_password,
     get_password_hash,
-    create_access_token
+    create_access_token,
+    decode_access_token,
 )
 from app.core.config import settings
 
@@ -88,3 +97,113 @@ def test_verify_special_characters_password():
     
     assert verify_password(special_password, hashed) is True
     assert verify_password("p@ssw0rd", hashed) is False
+
+
+def test_decode_access_token_caches_verified_claims(monkeypatch):
+    """Test that a verified token is served from the cache on the next decode."""
+    token = create_access_token({"sub": "cacheduser"})
+    assert decode_access_token(token)["sub"] == "cacheduser"
+
+    # A second decode must not verify the signature again
+    def fail(*args, **kwargs):
+        raise AssertionError("token was re-verified")
+    monkeypatch.setattr(jwt, "decode", fail)
+    assert decode_access_token(token)["sub"] == "cacheduser"
+
+
+def test_decode_access_token_rejects_invalid_and_expired():
+    """Test that invalid and expired tokens are rejected, cached or not."""
+    assert decode_access_token("invalidtoken") is None
+
+    expired = create_access_token({"sub": "testuser"}, expires_delta=timedelta(seconds=-1))
+    assert decode_access_token(expired) is None
+
+    cache = TokenCache(max_size=2)
+    cache.put("old", {"sub": "a", "exp": time.time() - 1})
+    assert cache.get("old") is None
+
+
+def test_token_cache_is_bounded():
+    """Test that the token cache evicts the least recently used entry."""
+    cache = TokenCache(max_size=2)
+    exp = time.time() + 60
+    for name in ("a", "b", "c"):
+        cache.put(name, {"sub": name, "exp": exp})
+    assert cache.get("a") is None
+    assert cache.get("c")["sub"] == "c"
+
+
+@pytest.mark.parametrize("algorithm", ["RS256", "EdDSA"])
+def test_asymmetric_tokens(monkeypatch, algorithm):
+    """Test issuing with a private key and verifying with only the public key."""
+    pytest.importorskip("cryptography")
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+
+    if algorithm == "RS256":
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    else:
+        private_key = ed25519.Ed25519PrivateKey.generate()
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ).decode()
+    public_pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    ).decode()
+
+    monkeypatch.setattr(settings, "ALGORITHM", algorithm)
+    monkeypatch.setattr(settings, "JWT_PRIVATE_KEY", private_pem)
+    token = create_access_token({"sub": "rsauser"})
+
+    # A verifying-only worker holds just the public key
+    monkeypatch.setattr(settings, "JWT_PRIVATE_KEY", None)
+    monkeypatch.setattr(settings, "JWT_PUBLIC_KEY", public_pem)
+    assert decode_access_token(token)["sub"] == "rsauser"
+    assert jwt.decode(token, public_pem, algorithms=[algorithm])["sub"] == "rsauser"
+
+
+def test_verify_and_update_password_unknown_user():
+    """Missing hashes never verify but still go through the hasher."""
+    hashed = get_password_hash("secret")
+    assert verify_and_update_password("secret", hashed) == (True, None)
+    assert verify_and_update_password("wrong", hashed) == (False, None)
+    assert verify_and_update_password("secret", None) == (False, None)
+
+
+def test_verify_and_update_password_rehashes_outdated_cost(monkeypatch):
+    """Hashes made with a different cost are upgraded on successful verification."""
+    monkeypatch.setattr(settings, "PASSWORD_PBKDF2_ROUNDS", 1000)
+    old_hash = get_password_hash("secret")
+    assert "$1000$" in old_hash
+
+    monkeypatch.setattr(settings, "PASSWORD_PBKDF2_ROUNDS", 2000)
+    verified, new_hash = verify_and_update_password("secret", old_hash)
+    assert verified is True
+    assert "$2000$" in new_hash
+    assert verify_password("secret", new_hash)
+    assert verify_and_update_password("wrong", old_hash) == (False, None)
+
+
+def test_hashing_queue_rejects_when_full():
+    """Submissions beyond max_pending fail fast and slots are released on completion."""
+    queue = HashingQueue(workers=1, max_pending=1)
+    release = threading.Event()
+    future = queue.submit(release.wait)
+    with pytest.raises(HashingQueueFull):
+        queue.submit(lambda: None)
+    release.set()
+    future.result(timeout=5)
+    assert queue.submit(lambda: 42).result(timeout=5) == 42
+
+
+def test_token_bucket_limiter():
+    """Buckets allow a burst, then refuse with a retry hint, and stay bounded."""
+    limiter = TokenBucketLimiter(rate=1.0, capacity=2, max_keys=3)
+    assert limiter.acquire("a") == (True, 0.0)
+    assert limiter.acquire("a") == (True, 0.0)
+    allowed, retry_after = limiter.acquire("a")
+    assert allowed is False
+    assert 0 < retry_after <= 1.0
+    for key in ("b", "c", "d", "e"):
+        limiter.acquire(key)
+    assert len(limiter) == 3
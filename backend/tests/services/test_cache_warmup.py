@@ -0,0 +1,91 @@
+"""
+Tests for cache warm-up and cache snapshots.
+"""
+from datetime import date, timedelta
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.core.cache import MISS, get_cache
+from app.core.config import settings
+from app.core.database import Base
+from app.models.hotel import Hotel, RoomType, RateAdjustment
+from app.schemas.room import RateAdjustmentCreate
+from app.services import invalidation, rate_adjustment
+from app.services.cache_warmup import CacheWarmer
+from app.services.rate_service import rate_service
+
+START = date(2031, 1, 1)
+
+
+@pytest.fixture
+def warmer(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'warmup.db'}")
+    Base.metadata.create_all(engine)
+    get_cache().clear()
+    yield CacheWarmer(session_factory=sessionmaker(bind=engine))
+    get_cache().clear()
+
+
+def _seed(db):
+    hotels = [Hotel(name="Open", location="Loc"), Hotel(name="Closed", location="Loc", is_active=False)]
+    db.add_all(hotels)
+    db.flush()
+    rooms = [RoomType(name=f"Room {number}", base_rate=100 + number, hotel_id=hotels[0].id) for number in range(3)]
+    rooms.append(RoomType(name="Closed room", base_rate=50, hotel_id=hotels[1].id))
+    db.add_all(rooms)
+    db.flush()
+    db.add(RateAdjustment(room_type_id=rooms[0].id, adjustment_amount=-5, effective_date=START + timedelta(days=1),
+                          end_date=START + timedelta(days=2), reason="Promo"))
+    db.commit()
+    return [room.id for room in rooms]
+
+
+def _cached(room_type_id, target_date):
+    return get_cache().local.get(invalidation.RATES, f"{room_type_id}:{target_date.isoformat()}")
+
+
+def test_warm_caches_active_room_types(warmer):
+    """Test that warm-up caches the same results as the rate service, active hotels only."""
+    with warmer.session_factory() as db:
+        room_type_ids = _seed(db)
+        assert warmer.warm(START, 4, max_entries=100) == 12
+
+        for room_type_id in room_type_ids[:3]:
+            for offset in range(4):
+                target_date = START + timedelta(days=offset)
+                assert _cached(room_type_id, target_date) == rate_service.calculate_effective_rate(
+                    db, room_type_id, target_date
+                )
+        assert _cached(room_type_ids[3], START) is MISS
+
+        get_cache().clear()
+        assert warmer.warm(START, 4, max_entries=9) == 8
+        assert _cached(room_type_ids[2], START) is MISS
+
+
+def test_snapshot_round_trip(warmer, tmp_path, monkeypatch):
+    """Test that a restored snapshot drops rates written since it was saved."""
+    path = str(tmp_path / "cache.snapshot")
+    with warmer.session_factory() as db:
+        room_type_ids = _seed(db)
+        warmer.warm(START, 3, max_entries=100)
+        expected = {room_type_id: _cached(room_type_id, START + timedelta(days=1)) for room_type_id in room_type_ids[:3]}
+        assert warmer.save_snapshot(path) == 9
+
+        get_cache().clear()
+        rate_adjustment.create(db, RateAdjustmentCreate(
+            room_type_id=room_type_ids[1], adjustment_amount=7, effective_date=START, reason="Event",
+        ))
+        get_cache().clear()
+
+        assert warmer.restore(path) == 6
+        assert _cached(room_type_ids[0], START + timedelta(days=1)) == expected[room_type_ids[0]]
+        assert _cached(room_type_ids[2], START + timedelta(days=1)) == expected[room_type_ids[2]]
+        assert _cached(room_type_ids[1], START) is MISS
+
+    monkeypatch.setattr(settings, "CACHE_SNAPSHOT_MAX_AGE_SECONDS", -1.0)
+    assert warmer.restore(path) is None
+    with open(path, "r+b") as snapshot:
+        snapshot.write(b"XXXX")
+    assert warmer.restore(path) is None
+    assert warmer.restore(str(tmp_path / "missing")) is None
@@ -0,0 +1,101 @@
+"""
+Tests for the in-memory hotel and room type catalog.
+"""
+import threading
+import time
+from decimal import Decimal
+import pytest
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from app.core.cache import get_cache
+from app.core.database import Base
+from app.models.hotel import Hotel
+from app.schemas.hotel import HotelCreate
+from app.schemas.room import RoomTypeCreate, RoomTypeUpdate
+from app.services import hotel, invalidation, room_type
+from app.services.catalog import Catalog
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'catalog.db'}")
+    Base.metadata.create_all(engine)
+    get_cache().clear()
+    catalog = Catalog(session_factory=sessionmaker(bind=engine))
+    yield catalog
+    get_cache().unsubscribe(catalog._invalidate)
+
+
+def test_catalog_serves_loaded_records(catalog):
+    """Test that hotels and room types are served from the bulk-loaded catalog."""
+    with catalog.session_factory() as db:
+        hotels = [hotel.create(db, HotelCreate(name=f"Hotel {number}", location="Loc")).id for number in range(3)]
+        rooms = [
+            room_type.create(db, RoomTypeCreate(name="Double", base_rate=120.5, hotel_id=hotels[number % 2])).id
+            for number in range(4)
+        ]
+    assert catalog.load() == 7
+
+    assert [record.id for record in catalog.get_hotels(skip=1, limit=5)] == hotels[1:]
+    assert catalog.get_hotel(hotels[0]).name == "Hotel 0"
+    assert [record.id for record in catalog.get_room_types_by_hotel(hotels[0])] == [rooms[0], rooms[2]]
+    assert catalog.get_room_types_by_hotel(hotels[2]) == []
+    record = catalog.get_room_type(rooms[1])
+    assert (record.hotel_id, record.name, record.base_rate) == (hotels[1], "Double", Decimal("120.50"))
+    assert catalog.get_room_type(10_000) is None
+
+
+def test_catalog_follows_writes(catalog):
+    """Test that writes, including from elsewhere, show up in the catalog."""
+    with catalog.session_factory() as db:
+        first = hotel.create(db, HotelCreate(name="First", location="Loc"))
+        second = hotel.create(db, HotelCreate(name="Second", location="Loc"))
+        room = room_type.create(db, RoomTypeCreate(name="Single", base_rate=80, hotel_id=first.id))
+        catalog.load()
+
+        room_type.update(db, room_type.get(db, room.id), RoomTypeUpdate(hotel_id=second.id, name="Twin"))
+        assert catalog.get_room_types_by_hotel(first.id) == []
+        assert [record.name for record in catalog.get_room_types_by_hotel(second.id)] == ["Twin"]
+
+        hotel.update(db, hotel.get(db, first.id), {"location": "Inland"})
+        assert catalog.get_hotel(first.id).location == "Inland"
+        room_type.remove(db, room.id)
+        assert catalog.get_room_type(room.id) is None
+        assert catalog.get_room_types_by_hotel(second.id) == []
+
+        # Written without publishing an invalidation (another worker on its own bus)
+        db.execute(insert(Hotel), [{"name": "Elsewhere", "location": "Loc", "is_active": True}])
+        db.commit()
+        assert len(catalog.get_hotels()) == 2
+        elsewhere = catalog.get_hotel(3)
+        assert elsewhere.name == "Elsewhere"
+        assert len(catalog.get_hotels()) == 3
+
+        db.execute(insert(Hotel), [{"name": "Bulk", "location": "Loc", "is_active": True}])
+        db.commit()
+        get_cache().invalidate(invalidation.HOTELS)
+        assert [record.name for record in catalog.get_hotels()][-1] == "Bulk"
+
+
+def test_reads_continue_during_reload(catalog):
+    """Test that a periodic reload in one thread does not block readers or lose writes made meanwhile."""
+    with catalog.session_factory() as db:
+        first = hotel.create(db, HotelCreate(name="First", location="Loc"))
+        catalog.load()
+
+        # Another reader is reloading: the current maps are served
+        catalog._expires_at = time.monotonic() - 1
+        with catalog._load_lock:
+            reader = threading.Thread(target=catalog.get_hotels)
+            reader.start()
+            reader.join(1)
+            assert not reader.is_alive()
+        catalog.load()
+
+        # A record refreshed while a load runs is re-read after the load swaps its maps in
+        catalog._loading = True
+        hotel.update(db, hotel.get(db, first.id), {"location": "Inland"})
+        assert catalog.get_hotel(first.id).location == "Inland"
+        catalog._loading = False
+        assert catalog._stale_hotels == set()
+        assert catalog._touched_hotels == {first.id}
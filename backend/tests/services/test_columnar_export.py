@@ -0,0 +1,87 @@
+"""
+Tests for columnar exports.
+"""
+import io
+from datetime import date
+import pytest
+from app.models.hotel import Hotel, RoomType, RateAdjustment
+from app.services import columnar_export
+from app.services.columnar_export import ExportFormatUnavailable, load_npz, read_table
+
+
+def _seed(db):
+    hotel = Hotel(name="Export Hotel", location="Columnar City")
+    db.add(hotel)
+    db.flush()
+    room = RoomType(name="Standard", base_rate=99.99, hotel_id=hotel.id)
+    db.add(room)
+    db.flush()
+    db.add_all([
+        RateAdjustment(room_type_id=room.id, adjustment_amount=10.5, effective_date=date(1970, 1, 2),
+                       end_date=date(1970, 1, 31), reason="Winter"),
+        RateAdjustment(room_type_id=room.id, adjustment_amount=-5, effective_date=date(2031, 6, 1), reason="Promo"),
+        RateAdjustment(room_type_id=room.id, adjustment_amount=20, effective_date=date(2031, 12, 24),
+                       priority=2, reason="Winter"),
+    ])
+    db.commit()
+    return room.id
+
+
+def test_read_table_encodes_columns(db_session):
+    room_type_id = _seed(db_session)
+    columns = {column.name: column for column in read_table(db_session, "rate_adjustments")}
+    mine = [index for index, value in enumerate(columns["room_type_id"].values) if value == room_type_id]
+
+    assert [columns["adjustment_amount_cents"].values[i] for i in mine] == [1050, -500, 2000]
+    assert [columns["effective_date"].values[i] for i in mine][0] == 1
+    end_date = columns["end_date"]
+    assert [end_date.valid[i] for i in mine] == [1, 0, 0]
+    reason = columns["reason"]
+    assert [reason.dictionary[reason.values[i]] for i in mine] == ["Winter", "Promo", "Winter"]
+    assert reason.values.typecode == "i" and columns["priority"].values.typecode == "i"
+
+
+def test_npz_round_trip(db_session):
+    _seed(db_session)
+    output = io.BytesIO()
+    assert columnar_export.export_table(db_session, "hotels", output, "npz") == "npz"
+
+    loaded = load_npz(io.BytesIO(output.getvalue()))
+    position = loaded["name"].index("Export Hotel")
+    assert loaded["location.dictionary"][loaded["location"][position]] == "Columnar City"
+    assert loaded["is_active"][position] == 1
+    assert len(loaded["id"]) == len(loaded["name"])
+
+
+def test_npz_loads_with_numpy(db_session):
+    numpy = pytest.importorskip("numpy")
+    room_type_id = _seed(db_session)
+    output = io.BytesIO()
+    columnar_export.export_table(db_session, "rate_adjustments", output, "npz")
+
+    arrays = numpy.load(io.BytesIO(output.getvalue()))
+    mine = arrays["room_type_id"] == room_type_id
+    assert arrays["effective_date"][mine].astype("datetime64[D]")[0] == numpy.datetime64("1970-01-02")
+    assert list(arrays["reason.dictionary"][arrays["reason"][mine]]) == ["Winter", "Promo", "Winter"]
+
+
+def test_arrow_formats(db_session):
+    pytest.importorskip("pyarrow")
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    _seed(db_session)
+    for format in ("arrow", "parquet"):
+        output = io.BytesIO()
+        columnar_export.export_table(db_session, "rate_adjustments", output, format)
+        source = io.BytesIO(output.getvalue())
+        table = pa.ipc.open_file(source).read_all() if format == "arrow" else pq.read_table(source)
+        assert table.schema.field("effective_date").type == pa.date32()
+        assert pa.types.is_dictionary(table.schema.field("reason").type)
+
+
+def test_arrow_formats_require_pyarrow(monkeypatch):
+    monkeypatch.setattr(columnar_export, "pyarrow_available", lambda: False)
+    assert columnar_export.resolve_format("auto") == "npz"
+    with pytest.raises(ExportFormatUnavailable):
+        columnar_export.resolve_format("parquet")
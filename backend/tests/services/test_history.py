@@ -0,0 +1,98 @@
+"""
+Tests for the change log and point-in-time rate queries.
+"""
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from app.models.change_log import ChangeLog
+from app.models.hotel import Hotel
+from app.schemas.batch import BatchOperation
+from app.schemas.room import RateAdjustmentCreate, RateAdjustmentUpdate, RoomTypeCreate, RoomTypeUpdate
+from app.services import batch_service, history, rate_adjustment, room_type
+from app.services.rate_service import rate_service
+
+
+def _tick():
+    """Return a timestamp strictly between the writes around it."""
+    time.sleep(0.002)
+    moment = history.utcnow()
+    time.sleep(0.002)
+    return moment
+
+
+def test_writes_are_logged(db_session):
+    hotel = Hotel(name="Log Hotel", location="Loc")
+    db_session.add(hotel)
+    db_session.commit()
+
+    room = room_type.create(db_session, RoomTypeCreate(name="Logged", base_rate=100, hotel_id=hotel.id))
+    room_type.update(db_session, room, RoomTypeUpdate(base_rate=120))
+    room_type.remove(db_session, id=room.id)
+
+    entries = (
+        db_session.query(ChangeLog)
+        .filter(ChangeLog.entity == history.ROOM_TYPE, ChangeLog.entity_id == room.id)
+        .order_by(ChangeLog.id)
+        .all()
+    )
+    assert [(e.action, e.base_rate) for e in entries] == [
+        ("create", Decimal("100.00")),
+        ("update", Decimal("120.00")),
+        ("remove", Decimal("120.00")),
+    ]
+
+
+def test_effective_rate_as_of(db_session):
+    hotel = Hotel(name="As Of Hotel", location="Loc")
+    db_session.add(hotel)
+    db_session.commit()
+    day = date(2033, 5, 1)
+
+    before_create = _tick()
+    room = room_type.create(db_session, RoomTypeCreate(name="Timeline", base_rate=100, hotel_id=hotel.id))
+    adjustment = rate_adjustment.create(db_session, RateAdjustmentCreate(
+        room_type_id=room.id, adjustment_amount=10, effective_date=day, reason="Spring"
+    ))
+    first = _tick()
+    room_type.update(db_session, room, RoomTypeUpdate(base_rate=200))
+    rate_adjustment.update(db_session, adjustment, RateAdjustmentUpdate(adjustment_amount=30))
+    second = _tick()
+    rate_adjustment.remove(db_session, id=adjustment.id)
+    third = _tick()
+
+    def rate(as_of):
+        result = rate_service.calculate_effective_rate(db_session, room.id, day, as_of=as_of)
+        return result and result["effective_rate"]
+
+    assert rate(before_create) is None
+    assert rate(first) == Decimal("110.00")
+    assert rate(second) == Decimal("230.00")
+    assert rate(third) == Decimal("200.00")
+    # Current state matches the live tables
+    assert rate(history.utcnow()) == rate_service.calculate_effective_rate(db_session, room.id, day)["effective_rate"]
+
+
+def test_as_of_follows_adjustment_moves_and_batches(db_session):
+    hotel = Hotel(name="Move Hotel", location="Loc")
+    db_session.add(hotel)
+    db_session.commit()
+    day = date(2033, 6, 1)
+    source = room_type.create(db_session, RoomTypeCreate(name="Source", base_rate=100, hotel_id=hotel.id))
+    target = room_type.create(db_session, RoomTypeCreate(name="Target", base_rate=100, hotel_id=hotel.id))
+
+    results = batch_service.apply(db_session, [
+        BatchOperation(op="create", entity="rate_adjustment", data={
+            "room_type_id": source.id, "adjustment_amount": 15, "effective_date": day, "reason": "Batch"}),
+    ])
+    adjustment_id = results[0]["id"]
+    before_move = _tick()
+    batch_service.apply(db_session, [
+        BatchOperation(op="update", entity="rate_adjustment", id=adjustment_id, data={"room_type_id": target.id}),
+    ])
+    after_move = _tick()
+
+    items = [(source.id, day), (target.id, day)]
+    before = rate_service.calculate_effective_rates_batch(db_session, items, as_of=before_move)
+    after = rate_service.calculate_effective_rates_batch(db_session, items, as_of=after_move)
+    assert [r["effective_rate"] for r in before] == [Decimal("115.00"), Decimal("100.00")]
+    assert [r["effective_rate"] for r in after] == [Decimal("100.00"), Decimal("115.00")]
@@ -101,3 +101,57 @@ def test_rate_adjustment_get_by_room_type(db_session):
     
     adjustments = rate_adjustment.get_by_room_type(db_session, room_type_id=rt.id)
     assert len(adjustments) == 3
+
+
+def test_get_values_match_orm_reads(db_session):
+    """Test that the plain-dict reads return the same data as the ORM reads."""
+    h = hotel.create(db_session, obj_in=HotelCreate(name="Values Hotel", location="Values City"))
+    rt = room_type.create(db_session, obj_in=RoomTypeCreate(name="Values Room", base_rate=99.5, hotel_id=h.id))
+    adjustment = rate_adjustment.create(db_session, obj_in=RateAdjustmentCreate(
+        room_type_id=rt.id, adjustment_amount=-12.25, effective_date=date(2031, 1, 1), reason="Promo",
+    ))
+
+    values = room_type.get_values(db_session, id=rt.id)
+    assert values == {"id": rt.id, "hotel_id": h.id, "name": "Values Room", "base_rate": rt.base_rate}
+    assert room_type.get_values(db_session, id=10_000) is None
+
+    values = rate_adjustment.get_values_by_room_type(db_session, room_type_id=rt.id)
+    assert values == [{column: getattr(adjustment, column) for column in values[0]}]
+    assert set(values[0]) == {"id", "room_type_id", "adjustment_amount", "effective_date", "end_date", "priority", "reason"}
+    assert rate_adjustment.get_values_by_room_type(db_session, room_type_id=10_000) is None
+
+    assert [row["id"] for row in hotel.get_multi_values(db_session, skip=0, limit=1000)] == [
+        item.id for item in hotel.get_multi(db_session, skip=0, limit=1000)
+    ]
+
+
+def test_search_hotels(db_session):
+    """Test prefix, case-insensitive search over name and location."""
+    grand = hotel.create(db_session, obj_in=HotelCreate(name="Grand Seaside Resort", location="Lisbon"))
+    hotel.create(db_session, obj_in=HotelCreate(name="Harbour View", location="Grandville"))
+    hotel.create(db_session, obj_in=HotelCreate(name="City Lodge", location="Porto"))
+    hotel.create(db_session, obj_in=HotelCreate(name="Bellagrand", location="Porto"))
+
+    # Name matches rank above location matches; words match from their start only
+    results = hotel.search(db_session, "gRaN")
+    assert [h.name for h in results] == ["Grand Seaside Resort", "Harbour View"]
+
+    # All words must match
+    assert [h.name for h in hotel.search(db_session, "grand lis")] == ["Grand Seaside Resort"]
+    assert hotel.search(db_session, "%") == []
+
+    # Index follows updates and deletes
+    hotel.update(db_session, db_obj=grand, obj_in=HotelUpdate(name="Royal Seaside Resort"))
+    assert [h.name for h in hotel.search(db_session, "royal")] == ["Royal Seaside Resort"]
+    assert [h.name for h in hotel.search(db_session, "grand")] == ["Harbour View"]
+
+    hotel.remove(db_session, id=grand.id)
+    assert hotel.search(db_session, "royal") == []
+
+
+def test_search_ranks_comparable_across_shards(db_session):
+    """Test that bm25 scores are scaled by the shard's best before shards are merged."""
+    first, second = Hotel(id=1), Hotel(id=2)
+    rows = hotel._comparable(db_session, [(first, -8.0, 1), (second, -2.0, 2)])
+    assert [(item, key) for item, key, _ in rows] == [(first, -1.0), (second, -0.25)]
+    assert hotel._comparable(db_session, []) == []
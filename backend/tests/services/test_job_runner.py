@@ -0,0 +1,168 @@
+"""
+Tests for the background job runner.
+"""
+import threading
+import time
+from datetime import timedelta
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.core.config import settings
+from app.core.database import Base
+from app.models.hotel import Hotel, RoomType, RateAdjustment
+from app.models.job import Job
+from app.services.history import utcnow
+from app.services.jobs import JobRunner
+
+
+def _seed(session_factory, room_types):
+    with session_factory() as db:
+        hotel = Hotel(name="Runner Hotel", location="Loc")
+        db.add(hotel)
+        db.flush()
+        db.add_all(RoomType(name=f"Room {number}", base_rate=100, hotel_id=hotel.id) for number in range(room_types))
+        db.commit()
+        return hotel.id
+
+
+def _file_session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'jobs.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    return engine, sessionmaker(bind=engine)
+
+
+def test_worker_threads_run_submitted_jobs(tmp_path):
+    engine, session_factory = _file_session_factory(tmp_path)
+    hotel_id = _seed(session_factory, 3)
+    runner = JobRunner(session_factory=session_factory, workers=2)
+    runner.start()
+    try:
+        with session_factory() as db:
+            job_ids = [
+                runner.submit(db, "rate_calendar", {
+                    "hotel_ids": [hotel_id], "start_date": "2031-01-01", "end_date": "2031-01-31",
+                }).id
+                for _ in range(4)
+            ]
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline:
+            with session_factory() as db:
+                statuses = {status for status, in db.query(Job.status).filter(Job.id.in_(job_ids))}
+            if statuses == {"succeeded"}:
+                break
+            time.sleep(0.02)
+    finally:
+        runner.shutdown(timeout=5)
+        engine.dispose()
+    assert statuses == {"succeeded"}
+
+
+def test_interrupted_job_resumes_after_last_chunk(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "JOB_CHUNK_SIZE", 2)
+    engine, session_factory = _file_session_factory(tmp_path)
+    hotel_id = _seed(session_factory, 5)
+    runner = JobRunner(session_factory=session_factory, workers=0)
+    with session_factory() as db:
+        job_id = runner.submit(db, "bulk_rate_adjustment", {
+            "hotel_ids": [hotel_id], "adjustment_amount": 5, "effective_date": "2031-01-01", "reason": "Bulk",
+        }).id
+
+    # Shutting down: the job stops after its first chunk and goes back to the queue
+    runner.stopping = True
+    runner.run_pending(limit=1)
+    with session_factory() as db:
+        job = db.get(Job, job_id)
+        assert (job.status, job.progress, job.total) == ("queued", 2, 5)
+        assert db.query(RateAdjustment).count() == 2
+
+    runner.stopping = False
+    assert runner.run_pending() == 1
+    with session_factory() as db:
+        job = db.get(Job, job_id)
+        assert (job.status, job.progress, job.attempts, job.result) == ("succeeded", 5, 2, {"created": 5})
+        room_types = [room_type_id for room_type_id, in db.query(RateAdjustment.room_type_id)]
+        assert sorted(room_types) == sorted(set(room_types)) and len(room_types) == 5
+    engine.dispose()
+
+
+def test_requeued_job_is_given_up_by_its_first_worker(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "JOB_CHUNK_SIZE", 2)
+    engine, session_factory = _file_session_factory(tmp_path)
+    hotel_id = _seed(session_factory, 5)
+    first = JobRunner(session_factory=session_factory, workers=0)
+    second = JobRunner(session_factory=session_factory, workers=0)
+    with session_factory() as db:
+        job_id = first.submit(db, "bulk_rate_adjustment", {
+            "hotel_ids": [hotel_id], "adjustment_amount": 5, "effective_date": "2031-01-01", "reason": "Bulk",
+        }).id
+
+    with session_factory() as slow_db:
+        # The first worker claims the job, then goes quiet past JOB_STALE_SECONDS
+        job = first._claim(slow_db)
+        with session_factory() as db:
+            db.get(Job, job_id).heartbeat_at = utcnow() - timedelta(seconds=settings.JOB_STALE_SECONDS + 1)
+            db.commit()
+        # Another worker requeues and finishes it
+        assert second.run_pending() == 1
+        # The first worker wakes up: its chunk is rolled back and the job left alone
+        first._run(slow_db, job)
+
+    with session_factory() as db:
+        job = db.get(Job, job_id)
+        assert (job.status, job.attempts, job.progress, job.result) == ("succeeded", 2, 5, {"created": 5})
+        assert db.query(RateAdjustment).count() == 5
+    engine.dispose()
+
+
+def test_stalled_jobs_are_requeued_then_failed(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "JOB_MAX_ATTEMPTS", 2)
+    engine, session_factory = _file_session_factory(tmp_path)
+    runner = JobRunner(session_factory=session_factory, workers=0)
+    stale = utcnow() - timedelta(seconds=settings.JOB_STALE_SECONDS + 1)
+    with session_factory() as db:
+        params = {"start_date": "2031-01-01", "end_date": "2031-01-01"}
+        db.add_all([
+            Job(id=1, kind="rate_calendar", status="running", params=params, progress=0, attempts=1,
+                created_at=stale, heartbeat_at=stale),
+            Job(id=2, kind="rate_calendar", status="running", params=params, progress=0, attempts=2,
+                created_at=stale, heartbeat_at=stale),
+        ])
+        db.commit()
+
+    assert runner.run_pending() == 1
+    with session_factory() as db:
+        assert [(job.status, job.attempts) for job in db.query(Job).order_by(Job.id)] == [
+            ("succeeded", 2), ("failed", 2),
+        ]
+    engine.dispose()
+
+
+def test_stalled_jobs_checked_on_their_own_interval(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "JOB_REQUEUE_CHECK_SECONDS", 60)
+    engine, session_factory = _file_session_factory(tmp_path)
+    runner = JobRunner(session_factory=session_factory, workers=0)
+    assert runner.run_pending() == 0
+
+    stale = utcnow() - timedelta(seconds=settings.JOB_STALE_SECONDS + 1)
+    with session_factory() as db:
+        db.add(Job(id=1, kind="rate_calendar", status="running", params={"start_date": "2031-01-01", "end_date": "2031-01-01"},
+                   progress=0, attempts=1, created_at=stale, heartbeat_at=stale))
+        db.commit()
+    assert runner.run_pending() == 0
+
+    runner._next_requeue = 0.0
+    assert runner.run_pending() == 1
+    with session_factory() as db:
+        assert db.get(Job, 1).status == "succeeded"
+    engine.dispose()
+
+
+def test_shutdown_timeout_covers_all_threads():
+    runner = JobRunner(workers=0)
+    release = threading.Event()
+    runner._threads = [threading.Thread(target=release.wait, daemon=True) for _ in range(4)]
+    for thread in runner._threads:
+        thread.start()
+    started = time.monotonic()
+    runner.shutdown(timeout=0.2)
+    assert time.monotonic() - started < 0.6
+    release.set()
@@ -0,0 +1,75 @@
+"""
+Tests for portfolio rate calendar builds.
+"""
+from datetime import date, timedelta
+from decimal import Decimal
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.core.database import Base
+from app.models.hotel import Hotel, RoomType, RateAdjustment
+from app.models.rate_calendar import RateCalendar
+from app.services.rate_calendar import build_portfolio_calendar, partition
+from app.services.rate_service import rate_service
+
+
+def _seed(db, room_types=6):
+    hotel = Hotel(name="Portfolio Hotel", location="Loc")
+    db.add(hotel)
+    db.flush()
+    rooms = [RoomType(name=f"Room {number}", base_rate=100 + number, hotel_id=hotel.id) for number in range(room_types)]
+    db.add_all(rooms)
+    db.flush()
+    for number, room in enumerate(rooms):
+        db.add_all([
+            RateAdjustment(room_type_id=room.id, adjustment_amount=10, effective_date=date(2031, 1, 3), reason="Base"),
+            RateAdjustment(room_type_id=room.id, adjustment_amount=-number, effective_date=date(2031, 1, 5),
+                           end_date=date(2031, 1, 6), priority=1, reason="Promo"),
+        ])
+    db.commit()
+    return [room.id for room in rooms]
+
+
+def test_partition():
+    assert partition([1, 2, 3, 5, 8, 9, 10], 3) == [(1, 3), (5, 9), (10, 10)]
+    assert partition([4], 8) == [(4, 4)]
+    assert partition([], 2) == []
+
+
+def test_build_matches_rate_service(db_session):
+    room_type_ids = _seed(db_session)
+    start = date(2031, 1, 1)
+
+    summary = build_portfolio_calendar(db_session, start, 10, workers=1)
+
+    assert summary["room_types"] >= len(room_type_ids)
+    rows = db_session.query(RateCalendar).filter(RateCalendar.room_type_id.in_(room_type_ids)).all()
+    assert len(rows) == len(room_type_ids) * 10
+    expected = rate_service.calculate_effective_rates_batch(
+        db_session, [(row.room_type_id, row.rate_date) for row in rows]
+    )
+    assert [row.effective_rate for row in rows] == [rate["effective_rate"] for rate in expected]
+
+
+def test_build_across_processes(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'calendar.db'}")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        room_type_ids = _seed(db)
+        progress = []
+        summary = build_portfolio_calendar(
+            db, date(2031, 1, 1), 7, workers=2, on_progress=lambda done, total: progress.append((done, total))
+        )
+        db.commit()
+        assert summary["rows"] == len(room_type_ids) * 7
+        assert progress[-1] == (len(room_type_ids), len(room_type_ids)) and len(progress) == 6
+        rates = {
+            (row.room_type_id, row.rate_date): row.effective_rate
+            for row in db.query(RateCalendar)
+        }
+    engine.dispose()
+    last = room_type_ids[-1]
+    assert rates[(last, date(2031, 1, 2))] == Decimal("105.00")
+    assert rates[(last, date(2031, 1, 4))] == Decimal("115.00")
+    assert rates[(last, date(2031, 1, 5))] == Decimal("100.00")
+    assert rates[(last, date(2031, 1, 1) + timedelta(days=6))] == Decimal("115.00")
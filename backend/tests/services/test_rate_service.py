@@ -69,3 +69,223 @@ def test_multiple_adjustments(db_session):
     # Should pick the latest effective one (adj2)
     res = rate_service.calculate_effective_rate(db_session, room.id)
     assert res["effective_rate"] == 130.0
+
+def test_quote_stay_sweeps_adjustments(db_session):
+    # Setup data
+    hotel = Hotel(name="Quote Hotel", location="Loc")
+    db_session.add(hotel)
+    db_session.flush()
+    room = RoomType(name="Quote Room", base_rate=100.0, hotel_id=hotel.id)
+    other = RoomType(name="Quote Other", base_rate=80.0, hotel_id=hotel.id)
+    db_session.add_all([room, other])
+    db_session.flush()
+
+    check_in = date(2030, 6, 1)
+    # Adjustment before the stay applies from the first night, the second one mid-stay
+    db_session.add(RateAdjustment(room_type_id=room.id, adjustment_amount=10, effective_date=check_in - timedelta(days=3), reason="Early"))
+    db_session.add(RateAdjustment(room_type_id=room.id, adjustment_amount=-20, effective_date=check_in + timedelta(days=2), reason="Mid"))
+    db_session.commit()
+
+    res = rate_service.quote_stay(db_session, [room.id, other.id], check_in, check_in + timedelta(days=4))
+    assert res["nights"] == 4
+
+    room_quote, other_quote = res["quotes"]
+    assert [n["effective_rate"] for n in room_quote["nightly_rates"]] == [110.0, 110.0, 80.0, 80.0]
+    assert room_quote["total"] == 380.0
+    assert other_quote["total"] == 320.0
+
+def test_quote_stay_unknown_room_type(db_session):
+    res = rate_service.quote_stay(db_session, [999999], date(2030, 1, 1), date(2030, 1, 3))
+    assert res is None
+
+def test_effective_rates_batch(db_session):
+    # Setup data
+    hotel = Hotel(name="Batch Hotel", location="Loc")
+    db_session.add(hotel)
+    db_session.flush()
+    room = RoomType(name="Batch Room", base_rate=100.0, hotel_id=hotel.id)
+    db_session.add(room)
+    db_session.flush()
+
+    start = date(2030, 3, 1)
+    db_session.add(RateAdjustment(room_type_id=room.id, adjustment_amount=15, effective_date=start, reason="Spring"))
+    db_session.commit()
+
+    items = [
+        (room.id, start + timedelta(days=5)),
+        (999999, start),
+        (room.id, start - timedelta(days=1)),
+    ]
+    results = rate_service.calculate_effective_rates_batch(db_session, items)
+
+    assert results[0]["effective_rate"] == 115.0
+    assert results[1] is None
+    assert results[2]["effective_rate"] == 100.0
+    # Each batch result matches the single-lookup calculation
+    for (room_type_id, target_date), result in zip(items, results):
+        if result is not None:
+            assert result == rate_service.calculate_effective_rate(db_session, room_type_id, target_date)
+
+def test_search_lowest_rates(db_session):
+    target = date(2030, 7, 1)
+    cheap = Hotel(name="Cheap Inn", location="Lowtown")
+    pricey = Hotel(name="Pricey Palace", location="Lowtown")
+    closed = Hotel(name="Closed Lodge", location="Lowtown", is_active=False)
+    elsewhere = Hotel(name="Elsewhere Hotel", location="Hightown")
+    db_session.add_all([cheap, pricey, closed, elsewhere])
+    db_session.flush()
+
+    cheap_room = RoomType(name="Single", base_rate=150.0, hotel_id=cheap.id)
+    db_session.add_all([
+        cheap_room,
+        RoomType(name="Double", base_rate=120.0, hotel_id=cheap.id),
+        RoomType(name="Suite", base_rate=300.0, hotel_id=pricey.id),
+        RoomType(name="Bunk", base_rate=10.0, hotel_id=closed.id),
+        RoomType(name="Bunk", base_rate=10.0, hotel_id=elsewhere.id),
+    ])
+    db_session.flush()
+
+    # Only the latest adjustment effective on the target date counts
+    db_session.add_all([
+        RateAdjustment(room_type_id=cheap_room.id, adjustment_amount=-100, effective_date=target - timedelta(days=10), reason="Old"),
+        RateAdjustment(room_type_id=cheap_room.id, adjustment_amount=-50, effective_date=target, reason="Current"),
+        RateAdjustment(room_type_id=cheap_room.id, adjustment_amount=-140, effective_date=target + timedelta(days=1), reason="Future"),
+    ])
+    db_session.commit()
+
+    results = rate_service.search_lowest_rates(db_session, "Lowtown", target)
+    assert [r["name"] for r in results] == ["Cheap Inn", "Pricey Palace"]
+    assert results[0]["lowest_rate"] == 100.0
+    assert results[0]["room_type_count"] == 2
+    assert results[1]["lowest_rate"] == 300.0
+
+    descending = rate_service.search_lowest_rates(db_session, "Lowtown", target, limit=1, descending=True)
+    assert [r["name"] for r in descending] == ["Pricey Palace"]
+
+def test_effective_rate_cache_follows_writes(db_session):
+    from app.services.hotel_service import room_type as room_type_service
+    from app.schemas.room import RoomTypeUpdate
+
+    hotel = Hotel(name="Cache Hotel", location="Loc")
+    db_session.add(hotel)
+    db_session.flush()
+    room = RoomType(name="Cache Room", base_rate=100.0, hotel_id=hotel.id)
+    db_session.add(room)
+    db_session.commit()
+
+    assert rate_service.calculate_effective_rate(db_session, room.id)["effective_rate"] == 100.0
+
+    # Served from cache until the room type is written
+    room_type_service.update(db_session, db_obj=room, obj_in=RoomTypeUpdate(base_rate=90.0))
+    assert rate_service.calculate_effective_rate(db_session, room.id)["effective_rate"] == 90.0
+
+def test_effective_rate_read_before_a_write_is_not_cached(db_session, monkeypatch):
+    from app.core.cache import get_cache
+    from app.services.hotel_service import room_type as room_type_service
+    from app.schemas.room import RoomTypeUpdate
+
+    hotel = Hotel(name="Race Hotel", location="Loc")
+    db_session.add(hotel)
+    db_session.flush()
+    room = RoomType(name="Race Room", base_rate=100.0, hotel_id=hotel.id)
+    db_session.add(room)
+    db_session.commit()
+
+    # A write commits (and invalidates) after the rate was read but before it is cached
+    cache = get_cache()
+    cache_set = cache.set
+
+    def write_then_set(*args, **kwargs):
+        monkeypatch.setattr(cache, "set", cache_set)
+        room_type_service.update(db_session, db_obj=room, obj_in=RoomTypeUpdate(base_rate=90.0))
+        cache_set(*args, **kwargs)
+
+    monkeypatch.setattr(cache, "set", write_then_set)
+    assert rate_service.calculate_effective_rate(db_session, room.id)["effective_rate"] == 100.0
+    assert rate_service.calculate_effective_rate(db_session, room.id)["effective_rate"] == 90.0
+
+def test_date_range_adjustments(db_session):
+    hotel = Hotel(name="Season Hotel", location="Seasonville")
+    db_session.add(hotel)
+    db_session.flush()
+    room = RoomType(name="Season Room", base_rate=100.0, hotel_id=hotel.id)
+    db_session.add(room)
+    db_session.flush()
+
+    start = date(2031, 6, 1)
+    db_session.add_all([
+        # Open-ended baseline, a 90-day surcharge that ends, and a priority override inside it
+        RateAdjustment(room_type_id=room.id, adjustment_amount=10, effective_date=start, reason="Baseline"),
+        RateAdjustment(room_type_id=room.id, adjustment_amount=40, effective_date=start + timedelta(days=10),
+                       end_date=start + timedelta(days=99), reason="Summer"),
+        RateAdjustment(room_type_id=room.id, adjustment_amount=-20, effective_date=start + timedelta(days=20),
+                       end_date=start + timedelta(days=21), priority=5, reason="Flash sale"),
+        # Starts later but has lower priority than the flash sale
+        RateAdjustment(room_type_id=room.id, adjustment_amount=70, effective_date=start + timedelta(days=21),
+                       end_date=start + timedelta(days=21), reason="Event"),
+    ])
+    db_session.commit()
+
+    expected = {
+        start - timedelta(days=1): 100.0,
+        start: 110.0,
+        start + timedelta(days=10): 140.0,
+        start + timedelta(days=20): 80.0,
+        start + timedelta(days=21): 80.0,
+        start + timedelta(days=22): 140.0,
+        start + timedelta(days=99): 140.0,
+        start + timedelta(days=100): 110.0,
+    }
+    for target_date, rate in expected.items():
+        assert rate_service.calculate_effective_rate(db_session, room.id, target_date)["effective_rate"] == rate
+
+    # Batch, stay quote and lowest-rate search resolve ranges the same way
+    items = [(room.id, target_date) for target_date in expected]
+    results = rate_service.calculate_effective_rates_batch(db_session, items)
+    assert [result["effective_rate"] for result in results] == list(expected.values())
+
+    check_in = start + timedelta(days=8)
+    quote = rate_service.quote_stay(db_session, [room.id], check_in, start + timedelta(days=24))
+    for night in quote["quotes"][0]["nightly_rates"]:
+        single = rate_service.calculate_effective_rate(db_session, room.id, night["date"])
+        assert night["effective_rate"] == single["effective_rate"]
+
+    for target_date, rate in expected.items():
+        lowest = rate_service.search_lowest_rates(db_session, "Seasonville", target_date)
+        assert lowest[0]["lowest_rate"] == rate
+
+def test_build_timeline_segments():
+    from app.services.rate_service import _build_timeline
+
+    d = date(2031, 1, 1)
+    starts, amounts = _build_timeline([
+        (d, None, 0, 1, 500),
+        (d + timedelta(days=2), d + timedelta(days=3), 0, 2, 900),
+        (d + timedelta(days=2), d + timedelta(days=2), 0, 3, 900),
+    ])
+    # Adjacent segments with the same amount are merged
+    assert starts == [d, d + timedelta(days=2), d + timedelta(days=4)]
+    assert list(amounts) == [500, 900, 500]
+
+def test_money_arithmetic_is_exact(db_session):
+    from decimal import Decimal
+
+    hotel = Hotel(name="Cents Hotel", location="Centsville")
+    db_session.add(hotel)
+    db_session.flush()
+    room = RoomType(name="Cents Room", base_rate=100.1, hotel_id=hotel.id)
+    db_session.add(room)
+    db_session.flush()
+    start = date(2032, 1, 1)
+    db_session.add(RateAdjustment(room_type_id=room.id, adjustment_amount=0.2, effective_date=start, reason="Dime"))
+    db_session.commit()
+
+    # 30 nights of 100.30: float summation would drift away from 3009.00
+    quote = rate_service.quote_stay(db_session, [room.id], start, start + timedelta(days=30))
+    assert quote["quotes"][0]["total"] == Decimal("3009.00")
+    assert quote["quotes"][0]["nightly_rates"][0]["effective_rate"] == Decimal("100.30")
+
+    single = rate_service.calculate_effective_rate(db_session, room.id, start)
+    assert single["effective_rate"] == Decimal("100.30")
+    assert rate_service.calculate_effective_rates_batch(db_session, [(room.id, start)])[0] == single
+    assert rate_service.search_lowest_rates(db_session, "Centsville", start)[0]["lowest_rate"] == Decimal("100.30")
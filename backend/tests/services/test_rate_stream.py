@@ -0,0 +1,96 @@
+"""
+Tests for the live rate stream hub.
+"""
+import asyncio
+from datetime import date, timedelta
+import pytest
+from sqlalchemy.orm import sessionmaker
+from app.core.config import settings
+from app.models.hotel import Hotel
+from app.schemas.room import RateAdjustmentCreate, RoomTypeCreate
+from app.services import rate_adjustment, room_type
+from app.services.rate_service import RateService
+from app.services.rate_stream import RateStreamHub, RateSubscription, format_event
+
+
+def test_subscription_drops_oldest_when_full():
+    async def scenario():
+        subscription = RateSubscription(hotel_id=1, queue_size=2)
+        for version in range(4):
+            subscription.push({"version": version})
+        received = [await subscription.get(0.1), await subscription.get(0.1)]
+        return subscription, received, await subscription.get(0.01)
+
+    subscription, received, timed_out = asyncio.run(scenario())
+    assert received == [{"version": 2}, {"version": 3}]
+    assert subscription.dropped == 2
+    assert timed_out is None
+
+
+def test_format_event():
+    assert format_event({"hotel_id": 1}) == 'event: rates\ndata: {"hotel_id":1}\n\n'
+
+
+def test_hub_pushes_snapshot_after_write(db_session):
+    hotel = Hotel(name="Stream Hotel", location="Loc")
+    db_session.add(hotel)
+    db_session.commit()
+    room = room_type.create(db_session, RoomTypeCreate(name="Streamed", base_rate=100, hotel_id=hotel.id))
+    # Read through the test transaction so the hub sees the uncommitted rows
+    hub = RateStreamHub(session_factory=sessionmaker(bind=db_session.connection()))
+    tomorrow = date.today() + timedelta(days=1)
+
+    async def scenario():
+        subscription = await hub.subscribe(hotel.id)
+        initial = await subscription.get(1)
+        await asyncio.to_thread(rate_adjustment.create, db_session, RateAdjustmentCreate(
+            room_type_id=room.id, adjustment_amount=25, effective_date=tomorrow, reason="Surge"
+        ))
+        updated = await subscription.get(2)
+        hub.unsubscribe(subscription)
+        return initial, updated
+
+    initial, updated = asyncio.run(scenario())
+
+    assert hub.subscriber_count() == 0
+    assert initial["hotel_id"] == hotel.id
+    [initial_room] = initial["room_types"]
+    assert len(initial_room["rates"]) == settings.RATE_STREAM_HORIZON_DAYS + 1
+    assert {rate["effective_rate"] for rate in initial_room["rates"]} == {100.0}
+
+    rates = updated["room_types"][0]["rates"]
+    assert rates[0] == {"date": date.today().isoformat(), "effective_rate": 100.0}
+    assert rates[1] == {"date": tomorrow.isoformat(), "effective_rate": 125.0}
+
+
+def test_snapshot_skips_room_types_deleted_while_building(db_session, monkeypatch):
+    hotel = Hotel(name="Vanishing Hotel", location="Loc")
+    db_session.add(hotel)
+    db_session.commit()
+    kept = room_type.create(db_session, RoomTypeCreate(name="Kept", base_rate=100, hotel_id=hotel.id))
+    deleted = room_type.create(db_session, RoomTypeCreate(name="Deleted", base_rate=100, hotel_id=hotel.id))
+    hub = RateStreamHub(session_factory=sessionmaker(bind=db_session.connection()))
+    calculate = RateService.calculate_effective_rates_batch
+
+    def delete_then_calculate(db, items, *args, **kwargs):
+        room_type.remove(db_session, id=deleted.id)
+        return calculate(db, items, *args, **kwargs)
+
+    monkeypatch.setattr(RateService, "calculate_effective_rates_batch", staticmethod(delete_then_calculate))
+    snapshot = hub._build_snapshots([hotel.id])[hotel.id]
+    assert [room["room_type_id"] for room in snapshot["room_types"]] == [kept.id]
+
+
+def test_failed_subscribe_is_removed():
+    def broken_session():
+        raise RuntimeError("database unavailable")
+
+    hub = RateStreamHub(session_factory=broken_session)
+
+    async def scenario():
+        with pytest.raises(RuntimeError):
+            await hub.subscribe(1)
+
+    asyncio.run(scenario())
+    assert hub.subscriber_count() == 0
+    assert hub._task is None
@@ -0,0 +1,193 @@
+"""
+Tests for sharding hotel data across databases.
+"""
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from io import BytesIO
+import pytest
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.orm import sessionmaker
+from app.core.cache import get_cache
+from app.core.database import Base, SessionLocal
+from app.models.change_log import ChangeLog
+from app.models.hotel import Hotel, RoomType
+from app.schemas.hotel import HotelCreate
+from app.schemas.room import RateAdjustmentCreate, RoomTypeCreate, RoomTypeUpdate
+from app.services import batch_service, columnar_export, hotel, job_runner, rate_adjustment, room_type
+from app.services.rate_service import rate_service
+from app.services.rate_stream import RateStreamHub
+from app.services.sharding import (
+    CrossShardWrite, ShardingUnsupported, ShardMoving, _read_bucket, plan_rebalance, shards,
+)
+
+
+@pytest.fixture
+def sharded(tmp_path):
+    """Two empty shards plus a primary holding the bucket map, 4 buckets."""
+    urls = []
+    for name in ("primary", "shard0", "shard1"):
+        url = f"sqlite:///{tmp_path / name}.db"
+        Base.metadata.create_all(create_engine(url))
+        urls.append(url)
+    primary = sessionmaker(bind=create_engine(urls[0]))
+    get_cache().clear()
+    shards.primary, shards.buckets = primary, 4
+    shards.configure(urls[1:])
+    yield primary
+    shards.configure([])
+    shards.primary, shards.buckets = SessionLocal, 256
+    get_cache().clear()
+
+
+def _hotels_on(shard_index):
+    with shards.shards[shard_index].session_factory() as db:
+        return set(db.scalars(select(Hotel.id)))
+
+
+def _seed(db, count=6):
+    hotel_ids, room_type_ids = [], []
+    for number in range(count):
+        db_hotel = hotel.create(db, HotelCreate(name=f"Seaside {number}", location="Coast"))
+        db_room = room_type.create(db, RoomTypeCreate(name="Double", base_rate=100 + number, hotel_id=db_hotel.id))
+        rate_adjustment.create(db, RateAdjustmentCreate(
+            room_type_id=db_room.id, adjustment_amount=-10, effective_date=date(2031, 1, 1), reason="Promo",
+        ))
+        hotel_ids.append(db_hotel.id)
+        room_type_ids.append(db_room.id)
+    return hotel_ids, room_type_ids
+
+
+def test_plan_rebalance():
+    """Test that buckets are spread by weight and moved off removed shards."""
+    moves = plan_rebalance({0: 9, 1: 9, 2: 1, 3: 1}, {}, 2, 4)
+    assert moves == [(0, 0, 1), (2, 0, 1)]
+
+    moves = plan_rebalance({}, {0: 0, 1: 1, 2: 2, 3: 2}, 2, 4)
+    assert sorted(target for _, _, target in moves) == [0, 1]
+    assert {bucket for bucket, _, _ in moves} == {2, 3}
+
+    assert plan_rebalance({0: 5, 1: 5}, {1: 1}, 2, 2) == []
+
+
+def test_ids_are_unique_across_shards(sharded):
+    """Test that new hotels go to their bucket's shard with globally allocated ids."""
+    with sharded() as db:
+        shards.rebalance(settle_seconds=0)
+        hotel_ids, room_type_ids = _seed(db)
+
+    assert len(set(hotel_ids)) == len(hotel_ids)
+    assert _hotels_on(0) | _hotels_on(1) == set(hotel_ids)
+    assert _hotels_on(0) and _hotels_on(1)
+    for hotel_id in hotel_ids:
+        assert hotel_id in _hotels_on(shards.shard_of(hotel_id).index)
+
+
+def test_reads_after_rebalance(sharded):
+    """Test that every read finds data moved to another shard, merged across shards."""
+    with sharded() as db:
+        before = datetime.utcnow()
+        hotel_ids, room_type_ids = _seed(db)
+        assert _hotels_on(0) == set(hotel_ids)
+
+        moved = shards.rebalance(settle_seconds=0)
+        assert moved and sum(move["hotels"] for move in moved) > 0
+        assert _hotels_on(1) and _hotels_on(0) | _hotels_on(1) == set(hotel_ids)
+
+        assert [item.id for item in hotel.get_multi(db, skip=1, limit=4)] == sorted(hotel_ids)[1:5]
+        assert {item.id for item in hotel.search(db, "seaside")} == set(hotel_ids)
+        for hotel_id, room_type_id in zip(hotel_ids, room_type_ids):
+            assert hotel.get(db, hotel_id).id == hotel_id
+            assert [room.id for room in room_type.get_by_hotel(db, hotel_id)] == [room_type_id]
+            assert len(rate_adjustment.get_by_room_type(db, room_type_id)) == 1
+            rate = rate_service.calculate_effective_rate(db, room_type_id, date(2031, 1, 2))
+            assert rate["effective_rate"] == rate["base_rate"] - 10
+
+        items = [(room_type_id, date(2031, 1, 2)) for room_type_id in room_type_ids] + [(10_000, date(2031, 1, 2))]
+        rates = rate_service.calculate_effective_rates_batch(db, items)
+        assert [rate["effective_rate"] for rate in rates[:-1]] == [Decimal(90 + n) for n in range(6)]
+        assert rates[-1] is None
+        # The change log moved along, for point-in-time reads
+        past = rate_service.calculate_effective_rates_batch(db, items[:-1], as_of=before - timedelta(seconds=1))
+        assert past == [None] * len(room_type_ids)
+        now = rate_service.calculate_effective_rates_batch(db, items[:-1], as_of=datetime.utcnow())
+        assert [rate["effective_rate"] for rate in now] == [rate["effective_rate"] for rate in rates[:-1]]
+
+        lowest = rate_service.search_lowest_rates(db, "Coast", date(2031, 1, 2), skip=1, limit=3)
+        assert [row["lowest_rate"] for row in lowest] == [Decimal(91), Decimal(92), Decimal(93)]
+        highest = rate_service.search_lowest_rates(db, "Coast", date(2031, 1, 2), descending=True)
+        assert [row["hotel_id"] for row in highest] == hotel_ids[::-1]
+
+
+def test_writes_stay_on_one_shard(sharded):
+    """Test that writes route to the hotel's shard and cannot cross shards."""
+    with sharded() as db:
+        shards.rebalance(settle_seconds=0)
+        hotel_ids, room_type_ids = _seed(db, count=4)
+        other = next(hotel_id for hotel_id in hotel_ids[1:]
+                     if shards.shard_of(hotel_id) is not shards.shard_of(hotel_ids[0]))
+
+        updated = room_type.update(db, room_type.get(db, room_type_ids[0]), RoomTypeUpdate(name="Suite"))
+        assert updated.name == "Suite"
+        assert room_type.get(db, room_type_ids[0]).name == "Suite"
+        with pytest.raises(CrossShardWrite):
+            room_type.update(db, room_type.get(db, room_type_ids[0]), RoomTypeUpdate(hotel_id=other))
+
+        adjustment_id = rate_adjustment.get_by_room_type(db, room_type_ids[1])[0].id
+        assert rate_adjustment.remove(db, adjustment_id).id == adjustment_id
+        assert rate_adjustment.get(db, adjustment_id) is None
+        assert rate_adjustment.remove(db, adjustment_id) is None
+
+
+def test_writes_refused_while_bucket_moves(sharded):
+    """Test that a bucket flagged as moving rejects writes but serves reads."""
+    with sharded() as db:
+        hotel_ids, _ = _seed(db, count=1)
+        shards._set_owner(hotel_ids[0] % shards.buckets, 0, moving=True)
+
+        assert hotel.get(db, hotel_ids[0]) is not None
+        with pytest.raises(ShardMoving):
+            hotel.update(db, hotel.get(db, hotel_ids[0]), {"location": "Inland"})
+
+
+def test_purge_orphans(sharded):
+    """Test that rows a shard holds for buckets it does not own are deleted."""
+    with sharded() as db:
+        hotel_ids, room_type_ids = _seed(db, count=2)
+        bucket = hotel_ids[0] % shards.buckets
+        # Left on shard 1 by a move interrupted before the map switched
+        with shards.shards[0].session_factory() as source, shards.shards[1].session_factory() as target:
+            for model, rows in _read_bucket(source, bucket, shards.buckets):
+                if rows:
+                    target.execute(insert(model.__table__), rows)
+            target.commit()
+        assert hotel_ids[0] in _hotels_on(1)
+
+        assert shards.purge_orphans() == 1
+        assert _hotels_on(1) == set()
+        assert _hotels_on(0) == set(hotel_ids)
+        with shards.shards[1].session_factory() as shard_db:
+            assert shard_db.scalar(select(func.count()).select_from(ChangeLog)) == 0
+        assert room_type.get(db, room_type_ids[0]) is not None
+
+
+def test_primary_only_features_refused(sharded):
+    """Test that features reading hotel data from the primary only are refused, and streams are routed."""
+    with sharded() as db:
+        shards.rebalance(settle_seconds=0)
+        hotel_ids, room_type_ids = _seed(db, count=4)
+        assert {shards.shard_of(hotel_id).index for hotel_id in hotel_ids} == {0, 1}
+
+        with pytest.raises(ShardingUnsupported):
+            batch_service.apply(db, [])
+        with pytest.raises(ShardingUnsupported):
+            columnar_export.export_table(db, "hotels", BytesIO(), "npz")
+        with pytest.raises(ShardingUnsupported):
+            job_runner.submit(db, "bulk_rate_adjustment", {})
+
+        hub = RateStreamHub(session_factory=sharded)
+        assert hub._hotels_of(room_type_ids) == set(hotel_ids)
+        snapshots = hub._build_snapshots(hotel_ids)
+        for hotel_id, room_type_id in zip(hotel_ids, room_type_ids):
+            [room] = snapshots[hotel_id]["room_types"]
+            assert room["room_type_id"] == room_type_id
+            assert room["rates"][0]["effective_rate"] == float(room["base_rate"])
@@ -83,3 +83,11 @@ def test_get_multi_users(db_session):
     # Get with offset
     users_offset = user.get_multi(db_session, skip=3, limit=3)
     assert len(users_offset) >= 2  # At least 2 more users (plus admin from conftest)
+
+
+def test_get_values_omit_password_hash(db_session):
+    """Test that the plain-dict reads leave out password hashes."""
+    created = user.create(db_session, obj_in=UserCreate(username="values_user", password="password123"))
+
+    assert user.get_values(db_session, id=created.id) == {"id": created.id, "username": "values_user"}
+    assert all(set(row) == {"id", "username"} for row in user.get_multi_values(db_session))
@@ -0,0 +1,41 @@
+"""
+Tests for application cold-start cost.
+"""
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Generous enough for slow CI machines; the app typically starts well under this
+STARTUP_BUDGET_SECONDS = float(os.environ.get("STARTUP_BUDGET_SECONDS", "5.0"))
+
+
+def _run(code: str) -> str:
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    )
+    return result.stdout.strip()
+
+
+def test_heavy_modules_are_loaded_lazily():
+    """Test that importing the app does not pull in password hashing or JWT libraries."""
+    output = _run(
+        "import sys, app.main; "
+        "print(','.join(m for m in ('passlib', 'jwt') if m in sys.modules))"
+    )
+    assert output == ""
+
+
+def test_import_and_first_request_within_budget():
+    """Test that a fresh worker imports the app and serves a first request within budget."""
+    output = _run(
+        "import time\n"
+        "started = time.perf_counter()\n"
+        "import app.main\n"
+        "from fastapi.testclient import TestClient\n"
+        "response = TestClient(app.main.app).get('/users/me', headers={'Authorization': 'Bearer invalid'})\n"
+        "assert response.status_code == 401\n"
+        "print(time.perf_counter() - started)\n"
+    )
+    assert float(output) < STARTUP_BUDGET_SECONDS